@@ -0,0 +1,95 @@
+"""Benchmark per-request agent construction against the tool count.
+
+Compares building each request's agent from the tool list, as the factory
+used to, with creating it from an ``AgentTemplate`` whose tool registry was
+built once. Each measurement includes one ``get_all_tool_specs`` call, the
+work every model call of the agent repeats.
+
+Usage:
+    python benchmarks/bench_agent_construction.py [--tools 10,50,200,500] [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strands import Agent
+from strands.tools.tools import PythonAgentTool
+
+from runtime.agent_template import AgentTemplate
+
+
+class StubModel:
+    """Model placeholder; construction never calls it."""
+
+    def get_config(self) -> dict:
+        return {}
+
+
+def make_tools(count: int) -> list:
+    """Build tools with specs shaped like typical MCP tools."""
+    tools = []
+    for i in range(count):
+        spec = {
+            "name": f"server_{i // 25}_tool_{i}",
+            "description": f"Look up records of kind {i} by query and optional filters.",
+            "inputSchema": {
+                "json": {
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "Search query"},
+                        "limit": {"type": "integer", "description": "Maximum results"},
+                        "filters": {
+                            "type": "object",
+                            "properties": {
+                                "since": {"type": "string"},
+                                "tags": {"type": "array", "items": {"type": "string"}},
+                            },
+                        },
+                    },
+                    "required": ["query"],
+                }
+            },
+        }
+        tools.append(PythonAgentTool(spec["name"], spec, lambda tool_use, **kwargs: None))
+    return tools
+
+
+def time_per_agent(create, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        create().tool_registry.get_all_tool_specs()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", default="10,50,200,500", help="Comma-separated tool counts")
+    parser.add_argument("--repeat", type=int, default=50, help="Agents built per measurement")
+    args = parser.parse_args()
+
+    model = StubModel()
+    print(f"{'tools':>6} {'from list ms':>13} {'template ms':>12} {'speedup':>8} {'build ms':>9}")
+    for count in (int(n) for n in args.tools.split(",")):
+        tools = make_tools(count)
+
+        def from_list(tools=tools):
+            return Agent(model=model, tools=tools, system_prompt="bench", callback_handler=None)
+
+        start = time.perf_counter()
+        template = AgentTemplate.build(model, tools, system_prompt="bench", callback_handler=None)
+        build = time.perf_counter() - start
+
+        legacy = time_per_agent(from_list, args.repeat)
+        templated = time_per_agent(template.create, args.repeat)
+        print(
+            f"{count:>6} {legacy * 1000:>13.2f} {templated * 1000:>12.2f} "
+            f"{legacy / templated:>7.1f}x {build * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Benchmark time to first token with and without hedged model requests.
+
+Starts local stand-in model servers that speak the OpenAI streaming chat API.
+Most responses start after a short delay, but a fraction stall for a long
+time, as overloaded upstreams do. The same request mix is sent through a
+single LiteLLMModel and through a HedgedModel over two stand-in endpoints,
+and the time-to-first-token percentiles are compared.
+
+Usage:
+    python benchmarks/bench_hedging.py [--requests 200] [--concurrency 8]
+        [--stall-rate 0.05] [--stall 2.0] [--hedge-after 0.3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strands.models.litellm import LiteLLMModel
+
+from runtime.metrics import RuntimeMetrics
+from runtime.model_router import HedgedModel
+
+
+def make_server(base_delay: float, stall_rate: float, stall: float, seed: int) -> Starlette:
+    """Build a stand-in OpenAI-compatible chat server with occasional stalls."""
+    rng = random.Random(seed)
+
+    async def completions(request: Request) -> StreamingResponse:
+        body = await request.json()
+        delay = stall if rng.random() < stall_rate else base_delay * (0.5 + rng.random())
+
+        async def chunks():
+            await asyncio.sleep(delay)
+            for word in ("Hello", " from", " the", " stand-in", " model."):
+                chunk = {
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stand-in"),
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": word}}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0.005)
+            done = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stand-in"),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+def serve(app: Starlette) -> str:
+    """Run an app on a free local port in a background thread and return its base URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def stand_in_model(url: str) -> LiteLLMModel:
+    return LiteLLMModel(
+        model_id="openai/stand-in", client_args={"api_base": url, "api_key": "bench"}
+    )
+
+
+async def time_to_first_token(model) -> float:
+    messages = [{"role": "user", "content": [{"text": "hello"}]}]
+    start = time.perf_counter()
+    ttft = None
+    # Read the whole response, as an agent turn would
+    async for event in model.stream(messages):
+        if ttft is None and "contentBlockDelta" in event:
+            ttft = time.perf_counter() - start
+    return ttft if ttft is not None else time.perf_counter() - start
+
+
+async def run(model, requests: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with semaphore:
+            return await time_to_first_token(model)
+
+    return sorted(await asyncio.gather(*(one() for _ in range(requests))))
+
+
+def percentile(values: list, pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per configuration")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--base-delay", type=float, default=0.05, help="Typical time to first token")
+    parser.add_argument("--stall-rate", type=float, default=0.05, help="Fraction of stalled responses")
+    parser.add_argument("--stall", type=float, default=2.0, help="Time to first token of a stall")
+    parser.add_argument("--hedge-after", type=float, default=0.3, help="Hedging deadline in seconds")
+    args = parser.parse_args()
+
+    primary = serve(make_server(args.base_delay, args.stall_rate, args.stall, seed=1))
+    secondary = serve(make_server(args.base_delay, args.stall_rate, args.stall, seed=2))
+
+    metrics = RuntimeMetrics()
+    configs = {
+        "single endpoint": stand_in_model(primary),
+        f"hedged ({args.hedge_after}s)": HedgedModel(
+            [stand_in_model(primary), stand_in_model(secondary)],
+            hedge_after=args.hedge_after,
+            names=["primary", "secondary"],
+            metrics=metrics,
+        ),
+    }
+
+    print(f"{'configuration':<20} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, model in configs.items():
+        ttfts = asyncio.run(run(model, args.requests, args.concurrency))
+        print(
+            f"{name:<20} {percentile(ttfts, 50) * 1000:>8.0f} {percentile(ttfts, 95) * 1000:>8.0f} "
+            f"{percentile(ttfts, 99) * 1000:>8.0f} {ttfts[-1] * 1000:>8.0f}"
+        )
+
+    hedges = metrics.model_requests_total.value("secondary", "hedge")
+    print(f"hedged requests: {hedges:.0f} of {args.requests}")
+
+
+if __name__ == "__main__":
+    main()
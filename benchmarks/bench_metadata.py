@@ -0,0 +1,132 @@
+"""Benchmark metadata extraction on large tool outputs.
+
+Compares the original extraction (``ast.literal_eval`` on every text block and
+``json.dumps`` for dedupe) against ``MetadataCollector`` on multi-MB tool
+results in the shapes tools actually return: JSON documents, ``str(dict)``
+payloads, and large outputs without any metadata.
+
+Usage:
+    python benchmarks/bench_metadata.py [--size-mb 4] [--repeat 5]
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runtime.metadata import MetadataCollector
+
+
+def legacy_extract(messages: list) -> list:
+    """The extraction loop as it was before MetadataCollector."""
+    unique = []
+    seen = set()
+    for item in messages:
+        for item_content in item.get("content", []):
+            tool_result = item_content.get("toolResult")
+            if not tool_result:
+                continue
+            for content_entry in tool_result.get("content", []):
+                text_value = content_entry.get("text")
+                if not text_value:
+                    continue
+                try:
+                    parsed = ast.literal_eval(text_value)
+                except Exception:
+                    continue
+                if not isinstance(parsed, dict):
+                    continue
+                metadata = parsed.get("metadata")
+                if not metadata:
+                    continue
+                for cmd in metadata.get("commands", []):
+                    key = json.dumps(cmd, sort_keys=True)
+                    if key not in seen:
+                        seen.add(key)
+                        unique.append(cmd)
+    return unique
+
+
+def make_rows(size_bytes: int) -> list:
+    row = {
+        "id": 0,
+        "name": "customer record",
+        "active": True,
+        "score": 0.5,
+        "tags": ["alpha", "beta", "gamma"],
+        "address": {"street": "Main St", "city": "Springfield", "zip": "12345"},
+    }
+    row_size = len(json.dumps(row))
+    return [dict(row, id=i) for i in range(max(1, size_bytes // row_size))]
+
+
+def make_commands(count: int) -> list:
+    # Half of the commands are duplicates, as tools often repeat navigation commands
+    return [{"type": "open", "target": f"doc-{i % (count // 2 or 1)}", "focus": True} for i in range(count)]
+
+
+def tool_message(text: str) -> dict:
+    return {
+        "role": "user",
+        "content": [{"toolResult": {"toolUseId": "t1", "status": "success", "content": [{"text": text}]}}],
+    }
+
+
+def build_cases(size_mb: float) -> dict:
+    size_bytes = int(size_mb * 1024 * 1024)
+    rows = make_rows(size_bytes)
+    commands = make_commands(200)
+    payload = {"rows": rows, "metadata": {"commands": commands}}
+    return {
+        "json_with_metadata": [tool_message(json.dumps(payload))],
+        "pydict_with_metadata": [tool_message(str(payload))],
+        "json_without_metadata": [tool_message(json.dumps({"rows": rows}))],
+        "plain_text": [tool_message("lorem ipsum dolor sit amet " * (size_bytes // 27))],
+    }
+
+
+def timeit(func, messages: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(messages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_collector(messages: list) -> list:
+    collector = MetadataCollector()
+    collector.add_messages(messages)
+    return collector.commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Approximate tool output size")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    cases = build_cases(args.size_mb)
+    print(
+        f"{'case':<24} {'size':>9} {'legacy ms':>11} {'collector ms':>13} {'speedup':>8} "
+        f"{'found (legacy/collector)':>25}"
+    )
+    for name, messages in cases.items():
+        text = messages[0]["content"][0]["toolResult"]["content"][0]["text"]
+        # The legacy parser cannot read JSON literals such as true/null, so counts may differ
+        found = f"{len(legacy_extract(messages))}/{len(run_collector(messages))}"
+
+        legacy = timeit(legacy_extract, messages, args.repeat)
+        fast = timeit(run_collector, messages, args.repeat)
+        print(
+            f"{name:<24} {len(text) / 1024 / 1024:>7.2f}MB {legacy * 1000:>11.1f} "
+            f"{fast * 1000:>13.1f} {legacy / fast:>7.1f}x {found:>25}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Replay invocation payloads at a target rate and report latency, throughput and memory.
+
+Sends payloads to ``/invocations`` on an open-loop schedule: request ``i`` is
+sent at ``i / qps`` seconds whatever happened to the earlier ones, and its
+latency is measured from that scheduled time, so a server falling behind
+shows up as growing latency instead of a lower send rate.
+
+By default the script starts the app in a subprocess over the stand-ins in
+``harness.py``, with model, tool and memory latencies that can be set, and
+reports the server's peak RSS. With ``--url`` it replays against a running
+server instead, e.g. one started from ``main.py`` with real services.
+
+Payloads are read from a JSONL file of ``/invocations`` bodies
+(``{"input": {"actor_id", "session_id", "message"}}``, or the fields alone)
+and reused in order until ``--requests`` have been sent. Without a file, a
+mix of new sessions and follow-up turns is generated.
+
+Save a run with ``--output`` and compare later runs to it with ``--baseline``;
+the script exits with status 1 if any result regressed beyond
+``--max-regression``.
+
+Usage:
+    python benchmarks/bench_replay.py [--payloads recorded.jsonl] [--qps 20] [--requests 400]
+        [--first-token-delay 0.2] [--tool-delay 0.05] [--memory-latency 0.01] [--workers 1]
+        [--url http://127.0.0.1:8080] [--output results.json] [--baseline results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import check_baseline, percentile
+
+
+def load_payloads(path: Optional[str], sessions: int, turns: int) -> list:
+    """Read recorded payloads, or generate ``sessions`` conversations of ``turns`` turns."""
+    if path:
+        payloads = []
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    payload = json.loads(line)
+                    payloads.append(payload if "input" in payload else {"input": payload})
+        return payloads
+    # Interleave the sessions so follow-up turns hit the warm agent pool between other traffic
+    return [
+        {"input": {"actor_id": f"actor-{s % 10}", "session_id": f"replay-{s}", "message": f"hi {t}"}}
+        for t in range(turns)
+        for s in range(sessions)
+    ]
+
+
+async def invoke(client: httpx.AsyncClient, url: str, payload: dict, scheduled: float) -> dict:
+    first_byte = None
+    error = None
+    try:
+        async with client.stream("POST", f"{url}/invocations", json=payload) as response:
+            async for line in response.aiter_lines():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - scheduled
+                if line.startswith("data: ") and '"error"' in line:
+                    error = line[6:]
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        error = f"{type(e).__name__}: {e}"
+    return {"latency": time.perf_counter() - scheduled, "first_byte": first_byte, "error": error}
+
+
+async def replay(url: str, payloads: list, requests: int, qps: float, timeout: float) -> tuple:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        tasks = []
+        for index in range(requests):
+            scheduled = start + index / qps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            payload = payloads[index % len(payloads)]
+            tasks.append(asyncio.ensure_future(invoke(client, url, payload, scheduled)))
+        results = await asyncio.gather(*tasks)
+        return results, time.perf_counter() - start
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args) -> tuple:
+    """Start the app over the stand-ins in a subprocess and wait until it is ready."""
+    port = free_port()
+    command = [
+        sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+        "--workers", str(args.workers),
+        "--first-token-delay", str(args.first_token_delay),
+        "--token-delay", str(args.token_delay),
+        "--tool-rate", str(args.tool_rate),
+        "--tool-delay", str(args.tool_delay),
+        "--memory-latency", str(args.memory_latency),
+    ]
+    # Agents print streamed text to stdout by default
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with {server.returncode}")
+        try:
+            if httpx.get(f"{url}/ping", timeout=1).json().get("status") == "Healthy":
+                return server, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Server did not become ready")
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Sum the peak RSS of a process and its children, from /proc (Linux only)."""
+    total_kb = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+        for each in pids:
+            with open(f"/proc/{each}/status") as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        return None
+    return total_kb / 1024
+
+
+def serve(args) -> None:
+    """Run the app over the stand-ins; the ``--serve`` mode of this script."""
+    from bench_hedging import serve as serve_in_thread
+    from harness import build_app, install_fakes, make_mcp_server
+
+    install_fakes(
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        tool_rate=args.tool_rate,
+        memory_latency=args.memory_latency,
+    )
+    mcp_url = serve_in_thread(make_mcp_server(tool_delay=args.tool_delay, extra_tools=20))
+    _, app = build_app(mcp_url.rsplit("/v1")[0] + "/mcp", WORKERS=args.workers)
+    app.run(port=args.port, host="127.0.0.1", workers=args.workers, log_level="warning")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", help="JSONL file of recorded /invocations payloads")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions to generate")
+    parser.add_argument("--turns", type=int, default=4, help="Turns per generated session")
+    parser.add_argument("--qps", type=float, default=20.0, help="Target requests per second")
+    parser.add_argument("--requests", type=int, default=400, help="Requests to send")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout")
+    parser.add_argument("--url", help="Replay against this running server")
+    parser.add_argument("--workers", type=int, default=1, help="Local server worker processes")
+    parser.add_argument("--first-token-delay", type=float, default=0.2, help="Model first token delay")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Model delay per token")
+    parser.add_argument("--tool-rate", type=float, default=0.5, help="Turns calling a tool")
+    parser.add_argument("--tool-delay", type=float, default=0.05, help="MCP tool latency")
+    parser.add_argument("--memory-latency", type=float, default=0.01, help="Memory call latency")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results to this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8080, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    payloads = load_payloads(args.payloads, args.sessions, args.turns)
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args)
+    try:
+        results, elapsed = asyncio.run(replay(url, payloads, args.requests, args.qps, args.timeout))
+        rss = peak_rss_mb(server.pid) if server else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ok = [r for r in results if r["error"] is None]
+    errors = [r for r in results if r["error"] is not None]
+    latencies = [r["latency"] for r in ok] or [float("nan")]
+    first_bytes = [r["first_byte"] for r in ok if r["first_byte"] is not None] or [float("nan")]
+    summary = {
+        "p50_latency_ms": percentile(latencies, 50) * 1000,
+        "p99_latency_ms": percentile(latencies, 99) * 1000,
+        "p50_first_byte_ms": percentile(first_bytes, 50) * 1000,
+        "p99_first_byte_ms": percentile(first_bytes, 99) * 1000,
+        "error_rate": len(errors) / len(results),
+    }
+    if rss is not None:
+        summary["peak_rss_mb"] = rss
+
+    print(f"target {args.qps:.1f} req/s, sent {len(results)} in {elapsed:.1f}s")
+    print(f"throughput     {len(ok) / elapsed:>8.1f} req/s ({len(errors)} errors)")
+    for name, key in (("latency", "latency_ms"), ("first byte", "first_byte_ms")):
+        p50, p99 = summary[f"p50_{key}"], summary[f"p99_{key}"]
+        print(f"{name:<14} p50 {p50:>8.1f} ms   p99 {p99:>8.1f} ms")
+    if rss is not None:
+        print(f"peak RSS       {rss:>8.1f} MB (server)")
+    for error in sorted({r["error"] for r in errors})[:5]:
+        print(f"error: {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        regressions = check_baseline(summary, args.baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
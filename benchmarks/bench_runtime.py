@@ -0,0 +1,162 @@
+"""Microbenchmarks of the runtime's own request path, without any external service.
+
+Runs against the stand-ins in ``harness.py``: an in-process model with no
+latency, a local MCP server and an in-memory session store, so the timings
+are the runtime's own overhead:
+
+- ``extract_unique_metadata`` on a conversation with tool results
+- ``AgentFactory.create_agent`` for a new session (memory hydration) and for
+  a follow-up turn served from the warm agent pool
+- A whole turn through the ``agent_entrypoint`` wrapper, with and without a
+  tool call, and the streamed events per second
+
+Save a run with ``--output`` and compare later runs to it with ``--baseline``;
+the script exits with status 1 if any timing regressed beyond
+``--max-regression``.
+
+Usage:
+    python benchmarks/bench_runtime.py [--repeat 200] [--history 20]
+        [--output results.json] [--baseline results.json] [--max-regression 0.2]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_metadata import make_commands, tool_message
+from bench_hedging import serve
+from harness import (
+    build_app, check_baseline, install_fakes, make_mcp_server, percentile,
+)
+
+
+def conversation(turns: int) -> list:
+    """A conversation whose turns each call a tool returning rows and metadata commands."""
+    messages = []
+    for turn in range(turns):
+        payload = {
+            "rows": [{"id": i, "name": f"record {i}"} for i in range(50)],
+            "metadata": {"commands": make_commands(8)},
+        }
+        tool_use = {"toolUseId": f"t{turn}", "name": "lookup", "input": {}}
+        messages += [
+            {"role": "user", "content": [{"text": f"question {turn}"}]},
+            {"role": "assistant", "content": [{"toolUse": tool_use}]},
+            tool_message(json.dumps(payload)),
+            {"role": "assistant", "content": [{"text": f"answer {turn}"}]},
+        ]
+    return messages
+
+
+def time_sync(func, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+async def time_async(func, repeat: int) -> list:
+    times = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        await func(index)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+async def run_turns(handler, repeat: int, prefix: str) -> tuple:
+    """Time whole turns through the entrypoint and count the streamed chunks."""
+    chunks = 0
+
+    async def turn(index: int) -> None:
+        nonlocal chunks
+        fields = {"actor_id": "bench", "session_id": f"{prefix}-{index}", "message": "hello"}
+        async for _ in handler({"input": fields}):
+            chunks += 1
+
+    times = await time_async(turn, repeat)
+    return times, chunks
+
+
+async def bench(args, factory, app) -> dict:
+    await factory.initialize()
+    results = {}
+
+    messages = conversation(args.history)
+    results["extract_unique_metadata"] = time_sync(
+        lambda: app.extract_unique_metadata({"messages": messages}), args.repeat
+    )
+
+    results["create_agent (new session)"] = await time_async(
+        lambda index: factory.create_agent(actor_id="bench", session_id=f"new-{index}"),
+        args.repeat,
+    )
+    async def pooled(index: int) -> None:
+        agent = await factory.create_agent(actor_id="bench", session_id="warm")
+        # Check the agent back in, as the end of its invocation would
+        factory.release_agent("bench", "warm", agent)
+
+    await pooled(0)
+    results["create_agent (pooled)"] = await time_async(pooled, args.repeat)
+
+    handler = app.handlers["main"]
+    model = factory.model
+    rates = {}
+    for name, tool_rate in (("turn (text only)", 0.0), ("turn (one tool call)", 1.0)):
+        model.behaviour.tool_rate = tool_rate
+        # Warm up the tool call path, including the MCP session
+        await run_turns(handler, 2, f"warmup-{tool_rate}")
+        start = time.perf_counter()
+        results[name], chunks = await run_turns(handler, args.repeat, f"{name}-{tool_rate}")
+        rates[name] = chunks / (time.perf_counter() - start)
+    return results, rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per benchmark")
+    parser.add_argument("--history", type=int, default=20, help="Turns of the conversation")
+    parser.add_argument("--mcp-tools", type=int, default=20, help="Filler tools on the MCP server")
+    parser.add_argument("--output", help="Write the p50 timings to this JSON file")
+    parser.add_argument("--baseline", help="Compare the p50 timings to this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown")
+    args = parser.parse_args()
+
+    install_fakes(tool_rate=0.0)
+    mcp_url = serve(make_mcp_server(extra_tools=args.mcp_tools)).rsplit("/v1")[0] + "/mcp"
+    factory, app = build_app(mcp_url)
+    try:
+        # Agents print streamed text to stdout by default; keep it out of the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results, rates = asyncio.run(bench(args, factory, app))
+    finally:
+        factory.close()
+
+    print(f"{'benchmark':<30} {'p50 us':>9} {'p99 us':>9} {'chunks/s':>10}")
+    summary = {}
+    for name, times in results.items():
+        summary[name] = percentile(times, 50) * 1e6
+        rate = f"{rates[name]:>10.0f}" if name in rates else ""
+        print(f"{name:<30} {summary[name]:>9.0f} {percentile(times, 99) * 1e6:>9.0f} {rate}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        regressions = check_baseline(summary, args.baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
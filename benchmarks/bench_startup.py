@@ -0,0 +1,78 @@
+"""Benchmark startup import cost per module.
+
+Imports each module in a fresh interpreter, as a new container does, and
+reports the median import time, which of the heavy dependencies it loaded,
+and the top-level packages that account for most of its import time
+according to ``python -X importtime``.
+
+Usage:
+    python benchmarks/bench_startup.py [--modules config,runtime.factory] [--repeat 5] [--top 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = "config,runtime,runtime.factory,runtime.app,strands,litellm,mcp,bedrock_agentcore"
+
+# Dependencies the runtime loads on first use rather than at startup
+HEAVY = ("litellm", "mcp", "boto3")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def import_once(module: str) -> tuple:
+    """Import a module in a fresh interpreter and return its time, heavy modules and trace."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, _, loaded = result.stdout.strip().splitlines()[-1].partition(" ")
+    return float(elapsed), loaded, result.stderr
+
+
+def by_package(trace: str) -> dict:
+    """Sum the self time of every imported module per top-level package, in seconds."""
+    totals = defaultdict(float)
+    for line in trace.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if self_us.isdigit():
+            totals[name.split(".")[0]] += int(self_us) / 1e6
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=DEFAULT_MODULES, help="Comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=5, help="Packages listed per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<20} {'median ms':>10}  {'heavy deps loaded':<20} top packages (ms)")
+    for module in args.modules.split(","):
+        runs = [import_once(module) for _ in range(args.repeat)]
+        median = statistics.median(elapsed for elapsed, _, _ in runs)
+        loaded = runs[-1][1] or "-"
+        packages = sorted(by_package(runs[-1][2]).items(), key=lambda item: -item[1])
+        top = ", ".join(f"{name} {seconds * 1000:.0f}" for name, seconds in packages[: args.top])
+        print(f"{module:<20} {median * 1000:>10.0f}  {loaded:<20} {top}")
+
+
+if __name__ == "__main__":
+    main()
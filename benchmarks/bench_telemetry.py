@@ -0,0 +1,146 @@
+"""Benchmark the effect of telemetry export on response latency.
+
+Streams model responses from a local stand-in model server through
+LiteLLMModel, first without telemetry and then with the runtime's litellm
+callback exporting to a local stub Langfuse collector that is healthy, slow
+or unreachable. Response latency should be the same in every configuration;
+only the exporter counters change.
+
+Usage:
+    python benchmarks/bench_telemetry.py [--requests 200] [--concurrency 8]
+        [--slow 5.0] [--queue-size 100]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import litellm
+from bench_hedging import make_server, percentile, serve, stand_in_model
+
+from runtime.telemetry import LangfuseSender, TelemetryExporter, litellm_logger
+
+
+def make_collector(delay: float, received: list) -> Starlette:
+    """Build a stub Langfuse ingestion endpoint that answers after ``delay`` seconds."""
+
+    async def ingestion(request: Request) -> JSONResponse:
+        body = await request.json()
+        await asyncio.sleep(delay)
+        received.extend(body["batch"])
+        return JSONResponse({"successes": [], "errors": []}, status_code=207)
+
+    return Starlette(routes=[Route("/api/public/ingestion", ingestion, methods=["POST"])])
+
+
+class ExporterSwitch:
+    """Forwards records to the exporter under test.
+
+    litellm keeps the callbacks it has seen after its first call, so the
+    benchmark registers one callback and switches exporters behind it.
+    """
+
+    exporter = None
+
+    def submit(self, record: dict) -> None:
+        if self.exporter is not None:
+            self.exporter.submit(record)
+
+
+def unreachable_url() -> str:
+    """A local URL nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+async def response_time(model) -> float:
+    messages = [{"role": "user", "content": [{"text": "hello"}]}]
+    start = time.perf_counter()
+    async for _ in model.stream(messages):
+        pass
+    return time.perf_counter() - start
+
+
+async def run(model, requests: int, concurrency: int, exporter=None) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with semaphore:
+            return await response_time(model)
+
+    if exporter is not None:
+        exporter.start()
+    times = sorted(await asyncio.gather(*(one() for _ in range(requests))))
+    if exporter is not None:
+        await exporter.close(timeout=1.0)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per configuration")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--slow", type=float, default=5.0, help="Delay of the slow collector")
+    parser.add_argument("--queue-size", type=int, default=100, help="Exporter queue size")
+    parser.add_argument("--batch-size", type=int, default=20, help="Exporter batch size")
+    args = parser.parse_args()
+
+    model = stand_in_model(serve(make_server(0.02, 0.0, 0.0, seed=1)))
+    healthy, slow = [], []
+    collectors = {
+        "healthy collector": serve(make_collector(0.0, healthy)).rsplit("/v1")[0],
+        f"slow collector ({args.slow}s)": serve(make_collector(args.slow, slow)).rsplit("/v1")[0],
+        "unreachable collector": unreachable_url(),
+    }
+
+    switch = ExporterSwitch()
+    litellm.callbacks.append(litellm_logger(switch))
+
+    # Warm up litellm and the connections so the first configuration is not penalized
+    asyncio.run(run(model, args.concurrency * 2, args.concurrency))
+
+    print(
+        f"{'configuration':<28} {'p50 ms':>7} {'p99 ms':>7} "
+        f"{'exported':>9} {'dropped':>8} {'failed':>7}"
+    )
+    times = asyncio.run(run(model, args.requests, args.concurrency))
+    print(
+        f"{'no telemetry':<28} {percentile(times, 50) * 1000:>7.1f} "
+        f"{percentile(times, 99) * 1000:>7.1f}"
+    )
+
+    for name, url in collectors.items():
+        exporter = TelemetryExporter(
+            LangfuseSender(url, "pk-bench", "sk-bench", timeout=args.slow * 2),
+            max_queue_size=args.queue_size,
+            batch_size=args.batch_size,
+            flush_interval=0.2,
+            send_timeout=args.slow * 2,
+        )
+        switch.exporter = exporter
+        times = asyncio.run(run(model, args.requests, args.concurrency, exporter))
+        switch.exporter = None
+        stats = exporter.stats()
+        print(
+            f"{name:<28} {percentile(times, 50) * 1000:>7.1f} {percentile(times, 99) * 1000:>7.1f} "
+            f"{stats['exported']:>9} {stats['dropped']:>8} {stats['failed']:>7}"
+        )
+
+    print(f"events received: healthy {len(healthy)}, slow {len(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""Offline stand-ins for the runtime's external services, shared by the benchmarks.
+
+The agent factory normally talks to a LiteLLM model endpoint, AgentCore
+Memory and MCP servers. This module replaces each with a local stand-in so
+the runtime's own overhead can be measured without any of them:
+
+- ``FakeLiteLLMModel``: a LiteLLMModel that generates its streamed response
+  in-process, optionally calling a tool first, with configurable latency
+- ``make_mcp_server``: a real MCP server (streamable HTTP) whose tools return
+  rows and metadata commands after a configurable delay
+- ``InMemorySessionManager``: a session manager over an in-memory repository
+  that serializes like a remote store, with configurable latency
+
+``install_fakes`` patches the model and session manager classes the factory
+uses, and ``build_app`` wires a factory and app the way ``main.py`` does.
+"""
+
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strands.session.repository_session_manager import RepositorySessionManager
+from strands.session.session_repository import SessionRepository
+from strands.types.session import Session, SessionAgent, SessionMessage
+
+from config import BaseSettings, GlobalConfig
+from runtime.session_writer import WriteBehindSessionMixin
+
+
+class FakeModelBehaviour:
+    """How FakeLiteLLMModel responds; set on the class, since the factory builds the model."""
+
+    first_token_delay: float = 0.0
+    token_delay: float = 0.0
+    response_tokens: int = 20
+    # Fraction of turns whose first model call requests a tool
+    tool_rate: float = 0.5
+    seed: int = 1
+
+
+def _fake_model_class():
+    # litellm takes seconds to import, so the class is only defined when needed
+    from strands.models.litellm import LiteLLMModel
+
+    class FakeLiteLLMModel(LiteLLMModel):
+        """LiteLLMModel whose streamed responses are generated in-process."""
+
+        behaviour = FakeModelBehaviour()
+        _rng = random.Random(FakeModelBehaviour.seed)
+
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            behaviour = self.behaviour
+            start = time.perf_counter()
+            if behaviour.first_token_delay:
+                await asyncio.sleep(behaviour.first_token_delay)
+            yield {"messageStart": {"role": "assistant"}}
+
+            last = messages[-1] if messages else {}
+            answered_tool = any("toolResult" in block for block in last.get("content", []))
+            if tool_specs and not answered_tool and self._rng.random() < behaviour.tool_rate:
+                spec = tool_specs[0]
+                text = next((b["text"] for b in last.get("content", []) if "text" in b), "")
+                tool_use = {"toolUseId": f"tool-{self._rng.getrandbits(32)}", "name": spec["name"]}
+                yield {"contentBlockStart": {"start": {"toolUse": tool_use}}}
+                tool_input = json.dumps({"query": text[:40]})
+                yield {"contentBlockDelta": {"delta": {"toolUse": {"input": tool_input}}}}
+                yield {"contentBlockStop": {}}
+                stop_reason = "tool_use"
+            else:
+                yield {"contentBlockStart": {"start": {}}}
+                for index in range(behaviour.response_tokens):
+                    if behaviour.token_delay:
+                        await asyncio.sleep(behaviour.token_delay)
+                    yield {"contentBlockDelta": {"delta": {"text": f"token{index} "}}}
+                yield {"contentBlockStop": {}}
+                stop_reason = "end_turn"
+
+            yield {"messageStop": {"stopReason": stop_reason}}
+            yield {
+                "metadata": {
+                    "usage": {
+                        "inputTokens": len(messages) * 50,
+                        "outputTokens": behaviour.response_tokens,
+                        "totalTokens": len(messages) * 50 + behaviour.response_tokens,
+                    },
+                    "metrics": {"latencyMs": int((time.perf_counter() - start) * 1000)},
+                }
+            }
+
+    return FakeLiteLLMModel
+
+
+def make_mcp_server(
+    tool_delay: float = 0.0, rows: int = 20, commands: int = 4, extra_tools: int = 0
+) -> Starlette:
+    """Build a stand-in MCP server speaking streamable HTTP at ``/mcp``.
+
+    Its ``lookup_records`` tool returns JSON rows with metadata commands after
+    ``tool_delay`` seconds; ``extra_tools`` filler tools make the catalog the
+    size of a real one.
+    """
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("bench", log_level="WARNING", stateless_http=True)
+
+    async def lookup_records(query: str, limit: int = 10) -> str:
+        """Look up records matching a query."""
+        if tool_delay:
+            await asyncio.sleep(tool_delay)
+        found = [{"id": i, "query": query, "name": f"record {i}"} for i in range(rows)]
+        opened = [{"type": "open", "target": f"record-{i}"} for i in range(commands)]
+        return json.dumps({"rows": found, "metadata": {"commands": opened}})
+
+    server.add_tool(lookup_records)
+    for index in range(extra_tools):
+
+        async def filler(value: str) -> str:
+            return value
+
+        server.add_tool(filler, name=f"filler_tool_{index}", description=f"Filler tool {index}.")
+    return server.streamable_http_app()
+
+
+class InMemorySessionRepository(SessionRepository):
+    """Session repository kept in memory, shared by every session manager.
+
+    Objects are stored as dicts and rebuilt on every read, like a remote store
+    returns them, and each call can sleep to stand in for its round trip.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.agents: Dict[tuple, Dict[str, Any]] = {}
+        self.messages: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        self._round_trip()
+        with self._lock:
+            self.sessions[session.session_id] = session.to_dict()
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Optional[Session]:
+        self._round_trip()
+        data = self.sessions.get(session_id)
+        return Session.from_dict(data) if data else None
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        self._round_trip()
+        with self._lock:
+            self.agents[(session_id, session_agent.agent_id)] = session_agent.to_dict()
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> Optional[SessionAgent]:
+        self._round_trip()
+        data = self.agents.get((session_id, agent_id))
+        return SessionAgent.from_dict(data) if data else None
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        self.create_agent(session_id, session_agent)
+
+    def create_message(
+        self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any
+    ) -> None:
+        self._round_trip()
+        with self._lock:
+            self.messages.setdefault((session_id, agent_id), []).append(session_message.to_dict())
+
+    def read_message(
+        self, session_id: str, agent_id: str, message_id: int, **kwargs: Any
+    ) -> Optional[SessionMessage]:
+        self._round_trip()
+        for data in self.messages.get((session_id, agent_id), []):
+            if data["message_id"] == message_id:
+                return SessionMessage.from_dict(data)
+        return None
+
+    def update_message(
+        self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any
+    ) -> None:
+        self._round_trip()
+        with self._lock:
+            stored = self.messages.get((session_id, agent_id), [])
+            for index, data in enumerate(stored):
+                if data["message_id"] == session_message.message_id:
+                    stored[index] = session_message.to_dict()
+
+    def list_messages(
+        self,
+        session_id: str,
+        agent_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        **kwargs: Any,
+    ) -> List[SessionMessage]:
+        self._round_trip()
+        stored = list(self.messages.get((session_id, agent_id), []))
+        end = None if limit is None else offset + limit
+        return [SessionMessage.from_dict(data) for data in stored[offset:end]]
+
+
+REPOSITORY = InMemorySessionRepository()
+
+
+class InMemorySessionManager(RepositorySessionManager):
+    """Stand-in for AgentCoreMemorySessionManager over the shared in-memory repository."""
+
+    def __init__(
+        self, agentcore_memory_config: Any, region_name: Optional[str] = None, **kwargs: Any
+    ):
+        self.config = agentcore_memory_config
+        # Keyed by session ID like the real manager, so the factory's write-behind checks match
+        super().__init__(
+            session_id=agentcore_memory_config.session_id,
+            session_repository=REPOSITORY,
+            **kwargs,
+        )
+
+
+class WriteBehindInMemorySessionManager(WriteBehindSessionMixin, InMemorySessionManager):
+    """Stand-in for WriteBehindMemorySessionManager."""
+
+
+class DiscardingStream(io.TextIOBase):
+    """Text stream that drops what is written to it, without holding a file open."""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def install_fakes(
+    first_token_delay: float = 0.0,
+    token_delay: float = 0.0,
+    response_tokens: int = 20,
+    tool_rate: float = 0.5,
+    memory_latency: float = 0.0,
+) -> None:
+    """Make the agent factory use the stand-in model and session managers.
+
+    Args:
+        first_token_delay: Seconds before the model's first event
+        token_delay: Seconds between streamed tokens
+        response_tokens: Tokens per text response
+        tool_rate: Fraction of turns that call a tool first
+        memory_latency: Seconds per session repository call
+    """
+    import bedrock_agentcore.memory.integrations.strands.session_manager as memory_session
+    import strands.models.litellm
+
+    import runtime.session_writer
+
+    model_class = _fake_model_class()
+    behaviour = model_class.behaviour
+    behaviour.first_token_delay = first_token_delay
+    behaviour.token_delay = token_delay
+    behaviour.response_tokens = response_tokens
+    behaviour.tool_rate = tool_rate
+    # The factory imports LiteLLMModel from this module when it builds the model
+    strands.models.litellm.LiteLLMModel = model_class
+
+    REPOSITORY.latency = memory_latency
+    # The factory imports the session managers from these modules when it creates an agent
+    memory_session.AgentCoreMemorySessionManager = InMemorySessionManager
+    runtime.session_writer.WriteBehindMemorySessionManager = WriteBehindInMemorySessionManager
+
+
+class BenchSettings(BaseSettings):
+    MODEL_ID: str = "openai/stand-in"
+    MEMORY_ID: str = "bench-memory"
+    BEDROCK_REGION: str = "us-east-1"
+    # Catalogs are keyed by URL and the stand-in MCP server gets a new port every run
+    MCP_TOOL_CACHE_DIR: Optional[str] = None
+
+
+def build_app(mcp_url: Optional[str], **settings: Any) -> tuple:
+    """Build an agent factory and app wired like ``main.py``, over the stand-ins.
+
+    Call :func:`install_fakes` first. Logging stays at INFO, as deployed, but is
+    discarded so the benchmark output stays readable.
+
+    Args:
+        mcp_url: URL of the stand-in MCP server, None for local tools only
+        **settings: BenchSettings overrides
+
+    Returns:
+        Tuple of the factory and the app
+    """
+    from strands import tool
+
+    from runtime.app import StitchLabAgentApp
+    from runtime.factory import AgentFactory
+    from runtime.session_lock import SessionSerializer
+    from runtime.structured_logging import configure_logging
+
+    @tool
+    def multiply(a: int, b: int) -> int:
+        """Calculate the product of two numbers"""
+        return a * b
+
+    config = GlobalConfig(BenchSettings(MCP_URL=mcp_url, **settings))
+    configure_logging(level="INFO", stream=DiscardingStream())
+    factory = AgentFactory(
+        config=config, system_prompt="You are a benchmark agent.", local_tools=[multiply]
+    )
+    # Turns of a session can only be serialized within one worker
+    session_policy = None if config.settings.WORKERS > 1 else SessionSerializer.POLICY_QUEUE
+    app = StitchLabAgentApp(telemetry=config.telemetry, session_policy=session_policy).initialize()
+    app.preload(factory.preload)
+    app.warm_up(factory.initialize)
+    app.on_shutdown(factory.close)
+
+    async def create_agent(actor_id: str, session_id: str):
+        return await factory.create_agent(actor_id=actor_id, session_id=session_id)
+
+    @app.agent_entrypoint(create_agent)
+    async def agent_invocation(payload):
+        pass
+
+    return factory, app
+
+
+def percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def check_baseline(
+    results: Dict[str, float], baseline_path: str, max_regression: float
+) -> List[str]:
+    """Compare lower-is-better results against a saved run.
+
+    Args:
+        results: Metric name -> value of this run
+        baseline_path: JSON file written by an earlier run with ``--output``
+        max_regression: Allowed relative increase, e.g. 0.2 for 20%
+
+    Returns:
+        One line per metric that regressed beyond the allowance
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before and value > before * (1 + max_regression):
+            change = (value / before - 1) * 100
+            regressions.append(f"{name}: {before:.3f} -> {value:.3f} (+{change:.0f}%)")
+    return regressions
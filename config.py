@@ -1,10 +1,14 @@
-from typing import Generic, TypeVar, Optional, Literal
+from typing import Any, Generic, TypeVar, Optional, Literal, Union
 from pydantic import BaseModel
-import litellm
+import atexit
+import hashlib
 import logging
 import os
 import pathlib
-import shutil
+import tempfile
+
+# Download URL of the bundled encoding; tiktoken names its cache files after its SHA-1
+CL100K_BASE_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
 
 
 class BaseSettings(BaseModel):
@@ -20,9 +24,56 @@ class BaseSettings(BaseModel):
     BEDROCK_GUARDRAIL_VER: Optional[str] = None
     MCP_URL: Optional[str] = None
     MCP_TOOLS: Optional[list[str]] = None
+    MCP_SERVER_URLS: Optional[list[str]] = None
+    MCP_POOL_SIZE: int = 2
+    MCP_STARTUP_TIMEOUT: int = 30
+    MCP_HEALTH_CHECK_INTERVAL: Optional[float] = 30.0
+    MCP_RECONNECT_MAX_BACKOFF: float = 30.0
+    MCP_TOOL_CACHE_DIR: Optional[str] = os.path.join(tempfile.gettempdir(), "stitchlab-agentcore", "mcp-tools")
+    MCP_CACHED_TOOLS: Optional[list[str]] = None
+    TOOL_CACHE_TTL: Optional[float] = 300.0
+    TOOL_CACHE_MAX_ENTRIES: int = 1024
+    TOOL_CACHE_DIR: Optional[str] = None
+    MODEL_FALLBACKS: Optional[list[Union[str, dict[str, Any]]]] = None
+    MODEL_HEDGE_AFTER: Optional[float] = None
+    MODEL_CIRCUIT_FAILURES: int = 5
+    MODEL_CIRCUIT_RESET: float = 30.0
+    MODEL_CACHE: bool = False
+    MODEL_CACHE_TTL: Optional[float] = 3600.0
+    MODEL_CACHE_MAX_ENTRIES: int = 256
+    MODEL_CACHE_DIR: Optional[str] = None
+    TOOL_WORKERS: int = 32
+    TOOL_TIMEOUT: Optional[float] = None
+    TOOL_MAX_CONCURRENCY: Optional[int] = None
+    TOOL_LIMITS: Optional[dict[str, dict[str, float]]] = None
+    WORKERS: int = 1
+    WORKER_MAX_REQUESTS: Optional[int] = None
+    WORKER_MAX_REQUESTS_JITTER: int = 0
+    WORKER_GRACEFUL_TIMEOUT: float = 30.0
+    WORKER_PORT: Optional[int] = None
+    TELEMETRY_QUEUE_SIZE: int = 10000
+    TELEMETRY_BATCH_SIZE: int = 100
+    TELEMETRY_FLUSH_INTERVAL: float = 1.0
+    TELEMETRY_SEND_TIMEOUT: float = 10.0
+    BATCH_CONCURRENCY: int = 8
     LANGFUSE_PUBLIC_KEY: Optional[str] = None
     LANGFUSE_SECRET_KEY: Optional[str] = None
     LANGFUSE_HOST: Optional[str] = None
+    AGENT_POOL_SIZE: int = 128
+    AGENT_POOL_TTL: Optional[float] = 900.0
+    AGENT_POOL_MAX_BYTES: Optional[int] = None
+    CONTEXT_TOKEN_BUDGET: Optional[int] = None
+    CONTEXT_WINDOW_MESSAGES: int = 40
+    SESSION_WRITE_BEHIND: bool = False
+    SESSION_WRITE_WORKERS: int = 4
+    SESSION_WRITE_QUEUE_SIZE: int = 1000
+    SESSION_WRITE_BATCH_SIZE: int = 32
+    SESSION_WRITE_FLUSH_TIMEOUT: float = 30.0
+    LOG_LEVEL: Optional[str] = None
+    LOG_STRUCTURED: bool = False
+    LOG_SAMPLE_RATES: Optional[dict[str, float]] = None
+    LOG_PREVIEW_CHARS: int = 512
+    LOG_QUEUE_SIZE: int = 10000
 
 
 TSettings = TypeVar("TSettings", bound=BaseModel)
@@ -33,6 +84,8 @@ class GlobalConfig(Generic[TSettings]):
 
     settings: TSettings
     logger: logging.Logger
+    # runtime.telemetry.TelemetryExporter when Langfuse keys are set
+    telemetry: Any
     
 
     def __new__(cls, *args, **kwargs):
@@ -55,24 +108,67 @@ class GlobalConfig(Generic[TSettings]):
 
         self.settings = settings
 
+        self._setup_logging()
+
         # Configure tiktoken to use local cache file before any imports that might use it
         self._setup_tiktoken_cache()
 
-        logging.basicConfig(
-            level=logging.DEBUG if settings.DEBUG else logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-        )
-
         self.logger = logging.getLogger(settings.APP_NAME)
 
+        self.telemetry = None
         if settings.LANGFUSE_PUBLIC_KEY and settings.LANGFUSE_SECRET_KEY:
-            litellm.success_callback = ["langfuse"]
-            litellm.failure_callback = ["langfuse"]
+            self.telemetry = self._setup_telemetry()
         
         self._initialized = True
 
         return
     
+    def _setup_telemetry(self):
+        """Export model call traces to Langfuse in batches, off the request path.
+
+        Model calls are recorded by a litellm callback into a bounded queue that a
+        background task exports. Pass the exporter to the app, e.g.
+        ``StitchLabAgentApp(telemetry=config.telemetry)``, to flush it on shutdown.
+        """
+        # litellm takes seconds to import; it is only needed here to register the callback
+        import litellm
+        from runtime.telemetry import LangfuseSender, TelemetryExporter, litellm_logger
+
+        settings = self.settings
+        exporter = TelemetryExporter(
+            LangfuseSender(
+                settings.LANGFUSE_HOST or "https://cloud.langfuse.com",
+                settings.LANGFUSE_PUBLIC_KEY,
+                settings.LANGFUSE_SECRET_KEY,
+                timeout=settings.TELEMETRY_SEND_TIMEOUT,
+            ),
+            max_queue_size=settings.TELEMETRY_QUEUE_SIZE,
+            batch_size=settings.TELEMETRY_BATCH_SIZE,
+            flush_interval=settings.TELEMETRY_FLUSH_INTERVAL,
+            send_timeout=settings.TELEMETRY_SEND_TIMEOUT,
+        )
+        litellm.callbacks.append(litellm_logger(exporter))
+        return exporter
+
+    def _setup_logging(self):
+        """Route logging through the runtime's non-blocking queue handler.
+
+        The level defaults to DEBUG only when the DEBUG setting is on. The queue is
+        flushed when the interpreter exits.
+        """
+        from runtime.structured_logging import configure_logging, flush_logging
+
+        settings = self.settings
+        level = settings.LOG_LEVEL or ("DEBUG" if settings.DEBUG else "INFO")
+        configure_logging(
+            level=level.upper(),
+            structured=settings.LOG_STRUCTURED,
+            sample_rates=settings.LOG_SAMPLE_RATES,
+            preview_chars=settings.LOG_PREVIEW_CHARS,
+            queue_size=settings.LOG_QUEUE_SIZE,
+        )
+        atexit.register(flush_logging)
+
     def _setup_tiktoken_cache(self):
         """Configure tiktoken to use local cache file to avoid SSL certificate issues.
         
@@ -81,7 +177,9 @@ class GlobalConfig(Generic[TSettings]):
         attempting to download it over the network (which can fail in corporate environments
         with SSL certificate verification issues).
         
-        Tiktoken expects files to be in TIKTOKEN_CACHE_DIR/encodings/ directory.
+        Tiktoken looks up TIKTOKEN_CACHE_DIR/<sha1 of the encoding URL>, so that name is
+        linked to the shipped file in a directory under the system temp dir. Nothing is
+        copied and nothing is written to the project directory, which may be read-only.
         """
         # Only set if not already configured
         if os.environ.get("TIKTOKEN_CACHE_DIR"):
@@ -92,24 +190,49 @@ class GlobalConfig(Generic[TSettings]):
         project_root = pathlib.Path(__file__).parent.absolute()
         source_tiktoken_file = project_root / "cl100k_base.tiktoken"
         
-        if source_tiktoken_file.exists():
-            # Create a cache directory structure: .tiktoken_cache/encodings/
-            cache_dir = project_root / ".tiktoken_cache"
-            encodings_dir = cache_dir / "encodings"
-            encodings_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Copy the file to the encodings directory if it doesn't exist there
-            target_tiktoken_file = encodings_dir / "cl100k_base.tiktoken"
-            if not target_tiktoken_file.exists():
-                shutil.copy2(source_tiktoken_file, target_tiktoken_file)
-                logging.info(f"Copied cl100k_base.tiktoken to cache directory: {target_tiktoken_file}")
-            
-            # Set TIKTOKEN_CACHE_DIR to the cache directory
-            os.environ["TIKTOKEN_CACHE_DIR"] = str(cache_dir)
-            logging.info(f"Configured tiktoken cache directory to: {cache_dir}")
-        else:
+        if not source_tiktoken_file.exists():
             # If file doesn't exist, log a warning
             logging.warning(
                 f"cl100k_base.tiktoken file not found at {source_tiktoken_file}. "
                 "Tiktoken will attempt to download it, which may fail in corporate networks."
-            )
\ No newline at end of file
+            )
+            return
+
+        cache_dir = pathlib.Path(tempfile.gettempdir()) / "stitchlab-agentcore" / "tiktoken"
+        cache_key = hashlib.sha1(CL100K_BASE_URL.encode()).hexdigest()
+        target_tiktoken_file = cache_dir / cache_key
+        try:
+            linked = target_tiktoken_file.exists() and target_tiktoken_file.samefile(
+                source_tiktoken_file
+            )
+            if not linked:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                _link_file(source_tiktoken_file, target_tiktoken_file)
+                logging.info(f"Linked cl100k_base.tiktoken into cache: {target_tiktoken_file}")
+        except OSError as e:
+            logging.warning(
+                f"Could not link cl100k_base.tiktoken into {cache_dir}: {e}. "
+                "Tiktoken will attempt to download it, which may fail in corporate networks."
+            )
+            return
+
+        # Set TIKTOKEN_CACHE_DIR to the cache directory
+        os.environ["TIKTOKEN_CACHE_DIR"] = str(cache_dir)
+        logging.info(f"Configured tiktoken cache directory to: {cache_dir}")
+
+
+def _link_file(source: pathlib.Path, target: pathlib.Path):
+    """Atomically point ``target`` at ``source`` with a symlink, or a hard link where
+    symlinks are not supported."""
+    temp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        try:
+            os.symlink(source, temp)
+        except OSError:
+            os.link(source, temp)
+        # Replacing in one step keeps concurrent workers from seeing a missing file
+        os.replace(temp, target)
+    except OSError:
+        if os.path.lexists(temp):
+            os.unlink(temp)
+        raise
@@ -1,5 +1,6 @@
 from runtime.factory import AgentFactory
 from runtime.app import StitchLabAgentApp
+from runtime.session_lock import SessionSerializer
 from typing import Optional
 from strands import Agent
 import logging
@@ -17,7 +18,16 @@ async def create_agent(actor_id: str, session_id: str) -> Optional[Agent]:
     return await AGENT_FACTORY.create_agent(actor_id=actor_id, session_id=session_id)
 
 
-app = StitchLabAgentApp(debug=True).initialize()
+app = StitchLabAgentApp(
+    debug=True,
+    # Turns of a session can only be serialized within one worker
+    session_policy=None if CONFIG.settings.WORKERS > 1 else SessionSerializer.POLICY_QUEUE,
+    telemetry=CONFIG.telemetry,
+    batch_concurrency=CONFIG.settings.BATCH_CONCURRENCY,
+).initialize()
+app.preload(AGENT_FACTORY.preload)
+app.warm_up(AGENT_FACTORY.initialize)
+app.on_shutdown(AGENT_FACTORY.close)
 
 @app.agent_entrypoint(create_agent)
 async def agent_invocation(payload):
@@ -26,4 +36,10 @@ async def agent_invocation(payload):
 
 if __name__ == "__main__":
     CONFIG.logger.info(f"Starting {CONFIG.settings.APP_NAME} on FastAPI server...")
-    app.run()
\ No newline at end of file
+    app.run(
+        workers=CONFIG.settings.WORKERS,
+        max_requests=CONFIG.settings.WORKER_MAX_REQUESTS,
+        max_requests_jitter=CONFIG.settings.WORKER_MAX_REQUESTS_JITTER,
+        graceful_timeout=CONFIG.settings.WORKER_GRACEFUL_TIMEOUT,
+        worker_port=CONFIG.settings.WORKER_PORT,
+    )
\ No newline at end of file
@@ -4,10 +4,86 @@ This package provides reusable components for building agents:
 - AgentFactory: Optimized agent creation with caching
 - AgentFactoryConfig: Configuration for agent factories
 - StitchLabAgentApp: Custom application wrapper
+- AgentPool: Warm per-session agent pool with LRU/TTL eviction
+- MCPConnectionPool: Persistent pooled MCP server sessions
+- ToolCatalogCache: On-disk cache of discovered MCP tool specs
+- MetadataCollector: Incremental extraction of tool-result metadata commands
+- RuntimeMetrics: Per-phase latency histograms exposed in Prometheus format
+- RequestProfiler: Sampled cProfile capture of whole requests
+- configure_logging: Non-blocking, sampled, structured log output
+- StreamCoalescer: Batching of streamed text chunks by size and deadline
+- SessionWriteQueue: Write-behind, per-session ordered session persistence
+- TokenBudgetConversationManager: Token-budgeted conversation window
+- ToolCachePolicy: Result caching policy for pure or idempotent tools
+- CachedModel: Replayed response streams for repeated model requests
+- HedgedModel: Hedged and fallback model requests with circuit breakers
+- AdmissionController: Global and per-actor request caps with a bounded wait queue
+- SessionSerializer: One-at-a-time turns per session with queue or reject policy
+- DisconnectWatcher: Cancellation of agent turns whose client disconnected
+- ToolExecutionEngine: Bounded, ordered concurrent tool execution with per-tool limits
+- AgentTemplate: Tool registry built once and cloned into each request's agent
+- PreforkServer: Multi-worker serving from a preloaded, pre-forked supervisor
+- TelemetryExporter: Bounded, batched background export of model call traces
+- run_batch: Bulk agent invocation with bounded concurrency, in completion order
+
+Submodules are imported on first attribute access, so importing one component
+does not load the dependencies of all the others.
 """
 
-from .factory import AgentFactory
-from .app import StitchLabAgentApp
+import importlib
+from typing import Any, List
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    'AgentFactory': 'factory',
+    'StitchLabAgentApp': 'app',
+    'AgentPool': 'pool',
+    'MCPConnectionPool': 'mcp_pool',
+    'ToolCatalogCache': 'tool_catalog',
+    'MetadataCollector': 'metadata',
+    'RuntimeMetrics': 'metrics',
+    'RequestProfiler': 'metrics',
+    'ToolMetricsHook': 'metrics',
+    'configure_logging': 'structured_logging',
+    'preview': 'structured_logging',
+    'StreamCoalescer': 'streaming',
+    'SessionWriteQueue': 'session_writer',
+    'WriteBehindMemorySessionManager': 'session_writer',
+    'TokenBudgetConversationManager': 'conversation',
+    'CachedTool': 'tool_cache',
+    'ToolCachePolicy': 'tool_cache',
+    'CachedModel': 'model_cache',
+    'HedgedModel': 'model_router',
+    'CircuitBreaker': 'model_router',
+    'AdmissionController': 'admission',
+    'Overloaded': 'admission',
+    'SessionSerializer': 'session_lock',
+    'SessionBusy': 'session_lock',
+    'DisconnectWatcher': 'cancellation',
+    'close_interrupted_turn': 'cancellation',
+    'LimitedTool': 'tool_engine',
+    'ToolExecutionEngine': 'tool_engine',
+    'ToolLimits': 'tool_engine',
+    'AgentTemplate': 'agent_template',
+    'PrecompiledToolRegistry': 'agent_template',
+    'PreforkServer': 'workers',
+    'TelemetryExporter': 'telemetry',
+    'LangfuseSender': 'telemetry',
+    'run_batch': 'batch',
+    'BatchResponse': 'batch',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = ['AgentFactory', 'StitchLabAgentApp']
 
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,211 @@
+"""Admission control for agent requests.
+
+Every accepted request starts a model stream, so during a traffic spike the
+latency of all in-flight sessions degrades together. This module caps how
+many requests run at once, globally and per actor, holds the excess in a
+bounded wait queue with a deadline, and rejects the rest immediately so
+clients can back off and retry.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted.
+
+    Attributes:
+        reason: "queue_full" when the wait queue is full, "timeout" when the
+            request waited longer than the queue timeout
+    """
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass
+class _Waiter:
+    actor_id: str
+    future: asyncio.Future = field(repr=False)
+
+
+class AdmissionController:
+    """Concurrency caps with a bounded, deadline-limited FIFO wait queue.
+
+    A request runs when fewer than ``max_concurrent`` requests are running and
+    its actor has fewer than ``max_per_actor`` running. Otherwise it waits in
+    the queue, in arrival order, for at most ``queue_timeout`` seconds. Requests
+    of an actor at its cap do not block later requests of other actors. When
+    ``max_queue`` requests are already waiting, new requests are rejected
+    without waiting.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        max_per_actor: Optional[int] = None,
+        max_queue: int = 128,
+        queue_timeout: Optional[float] = 10.0,
+    ):
+        """Initialize the controller.
+
+        Args:
+            max_concurrent: Requests that may run at once
+            max_per_actor: Requests one actor may run at once (default: no limit).
+                Requests without an actor ID are only subject to the global cap.
+            max_queue: Requests that may wait for a slot; 0 rejects as soon as
+                the caps are reached
+            queue_timeout: Maximum seconds a request waits (default: 10, None waits
+                without a deadline)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_per_actor = max_per_actor
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._active = 0
+        self._active_per_actor: Dict[str, int] = {}
+        self._waiters: Deque[_Waiter] = deque()
+
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+
+    @property
+    def active(self) -> int:
+        """Number of admitted requests still running."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def stats(self) -> Dict[str, int]:
+        """Report running and waiting requests and admission counters.
+
+        Returns:
+            Dictionary with active, queued, admitted and rejected counts
+            (rejected_queue_full, rejected_timeout)
+        """
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected["queue_full"],
+            "rejected_timeout": self.rejected["timeout"],
+        }
+
+    @contextlib.asynccontextmanager
+    async def admit(self, actor_id: str = "") -> AsyncIterator[float]:
+        """Hold an admission slot for the duration of a request.
+
+        Args:
+            actor_id: Actor the request belongs to
+
+        Yields:
+            Seconds the request waited in the queue
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeded the queue timeout
+        """
+        waited = await self.acquire(actor_id)
+        try:
+            yield waited
+        finally:
+            self.release(actor_id)
+
+    async def acquire(self, actor_id: str = "") -> float:
+        """Take an admission slot, waiting in the queue if needed.
+
+        Every successful call must be paired with :meth:`release`.
+
+        Args:
+            actor_id: Actor the request belongs to
+
+        Returns:
+            Seconds the request waited in the queue
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeded the queue timeout
+        """
+        # Waiters are woken as soon as they can run, so any still queued are blocked by
+        # their actor's cap and a request that can run now does not overtake them unfairly
+        if self._can_run(actor_id):
+            self._start(actor_id)
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise Overloaded(
+                "queue_full", f"Server is overloaded: {len(self._waiters)} requests already waiting"
+            )
+
+        start = time.perf_counter()
+        waiter = _Waiter(actor_id, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted while timing out or being cancelled: hand the slot on
+                self.release(actor_id)
+            else:
+                waiter.future.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected["timeout"] += 1
+            raise Overloaded(
+                "timeout", f"Server is overloaded: no capacity within {self.queue_timeout}s"
+            ) from None
+        return time.perf_counter() - start
+
+    def release(self, actor_id: str = "") -> None:
+        """Return an admission slot and admit waiting requests that can now run.
+
+        Args:
+            actor_id: Actor the slot was taken for
+        """
+        self._active -= 1
+        if actor_id:
+            remaining = self._active_per_actor.get(actor_id, 1) - 1
+            if remaining > 0:
+                self._active_per_actor[actor_id] = remaining
+            else:
+                self._active_per_actor.pop(actor_id, None)
+        self._wake_waiters()
+
+    def _can_run(self, actor_id: str) -> bool:
+        if self._active >= self.max_concurrent:
+            return False
+        if self.max_per_actor is None or not actor_id:
+            return True
+        return self._active_per_actor.get(actor_id, 0) < self.max_per_actor
+
+    def _start(self, actor_id: str) -> None:
+        self._active += 1
+        self.admitted += 1
+        if actor_id:
+            self._active_per_actor[actor_id] = self._active_per_actor.get(actor_id, 0) + 1
+
+    def _wake_waiters(self) -> None:
+        # FIFO, skipping waiters whose actor is still at its cap
+        for waiter in list(self._waiters):
+            if self._active >= self.max_concurrent:
+                return
+            if waiter.future.done() or not self._can_run(waiter.actor_id):
+                continue
+            self._waiters.remove(waiter)
+            self._start(waiter.actor_id)
+            waiter.future.set_result(None)
@@ -0,0 +1,170 @@
+"""Precompiled tool registry and agent template.
+
+Constructing an Agent registers every tool one by one, checking each name
+against all tools registered before it, and every model call normalizes and
+validates every tool spec again. With a large MCP catalog this cost is paid
+on every request. This module does that work once: the tool registry is built
+and its tool config computed when the factory is initialized, and each
+request's agent gets a cheap copy of it.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands import Agent
+from strands.tools.registry import ToolRegistry
+from strands.tools.tools import normalize_tool_spec
+from strands.types.tools import AgentTool
+
+
+logger = logging.getLogger(__name__)
+
+
+class PrecompiledToolRegistry(ToolRegistry):
+    """Tool registry that computes its tool config once and clones cheaply.
+
+    The normalized and validated specs of the registered tools are cached
+    until a tool is registered, so model calls no longer revalidate every
+    spec; only dynamic tools are still validated per call. Clones share
+    the tool objects and cached specs but have their own registry dicts, so a
+    tool added to one agent at runtime does not leak into the others.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tool_config_cache: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_tools(cls, tools: List[Any]) -> "PrecompiledToolRegistry":
+        """Build a registry from an agent tool list and precompute its tool config.
+
+        Args:
+            tools: Tools in any form accepted by ``Agent(tools=...)``
+
+        Returns:
+            The registry
+        """
+        registry = cls()
+        registry.process_tools(tools)
+        registry.get_all_tools_config()
+        return registry
+
+    def clone(self) -> "PrecompiledToolRegistry":
+        """Copy the registry for another agent without re-registering its tools.
+
+        Returns:
+            A registry with the same tools and cached tool config
+        """
+        clone = type(self)()
+        clone.registry = dict(self.registry)
+        clone.dynamic_tools = dict(self.dynamic_tools)
+        clone.tool_config = self.tool_config
+        clone._tool_config_cache = self._tool_config_cache
+        return clone
+
+    def get_all_tools_config(self) -> Dict[str, Any]:
+        if self._tool_config_cache is None or len(self._tool_config_cache) != len(self.registry):
+            dynamic_tools, self.dynamic_tools = self.dynamic_tools, {}
+            try:
+                self._tool_config_cache = super().get_all_tools_config()
+            finally:
+                self.dynamic_tools = dynamic_tools
+        tool_config = dict(self._tool_config_cache)
+        # Dynamic tools, such as the structured output tool, come and go per call
+        for tool_name, tool in self.dynamic_tools.items():
+            if tool_name not in tool_config:
+                try:
+                    spec = normalize_tool_spec(tool.tool_spec.copy())
+                    self.validate_tool_spec(spec)
+                    tool_config[tool_name] = spec
+                except ValueError as e:
+                    logger.warning(f"Dynamic tool {tool_name} has an invalid spec: {e}")
+        return tool_config
+
+    def register_tool(self, tool: AgentTool) -> None:
+        super().register_tool(tool)
+        self._tool_config_cache = None
+
+
+@dataclass(frozen=True)
+class AgentTemplate:
+    """Immutable agent configuration shared by every agent of a factory.
+
+    Agents created from the template share the model, tool executor, hooks and
+    a precompiled tool registry, and differ only by their per-request
+    arguments such as the session and conversation managers.
+
+    Attributes:
+        model: Model shared by every agent
+        tool_registry: Precompiled registry cloned into each agent
+        system_prompt: System prompt
+        tool_executor: Tool executor shared by every agent
+        hooks: Hook providers added to each agent
+        agent_kwargs: Other Agent constructor arguments
+    """
+
+    model: Any
+    tool_registry: PrecompiledToolRegistry
+    system_prompt: Optional[str] = None
+    tool_executor: Any = None
+    hooks: Tuple[Any, ...] = ()
+    agent_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        model: Any,
+        tools: List[Any],
+        system_prompt: Optional[str] = None,
+        tool_executor: Any = None,
+        hooks: Optional[List[Any]] = None,
+        **agent_kwargs: Any,
+    ) -> "AgentTemplate":
+        """Build a template, registering and validating the tools once.
+
+        Args:
+            model: Model shared by every agent
+            tools: Tools in any form accepted by ``Agent(tools=...)``
+            system_prompt: System prompt
+            tool_executor: Tool executor shared by every agent
+            hooks: Hook providers added to each agent
+            **agent_kwargs: Other Agent constructor arguments
+
+        Returns:
+            The template
+        """
+        return cls(
+            model=model,
+            tool_registry=PrecompiledToolRegistry.from_tools(tools),
+            system_prompt=system_prompt,
+            tool_executor=tool_executor,
+            hooks=tuple(hooks or ()),
+            agent_kwargs=dict(agent_kwargs),
+        )
+
+    @property
+    def tool_count(self) -> int:
+        """Number of tools in the template."""
+        return len(self.tool_registry.registry)
+
+    def create(self, **kwargs: Any) -> Agent:
+        """Create an agent from the template.
+
+        Args:
+            **kwargs: Per-agent Agent arguments, e.g. session_manager and
+                conversation_manager; they override the template's arguments
+
+        Returns:
+            A new agent with its own copy of the tool registry
+        """
+        agent = Agent(
+            model=self.model,
+            system_prompt=self.system_prompt,
+            tool_executor=self.tool_executor,
+            hooks=list(self.hooks),
+            **{**self.agent_kwargs, **kwargs},
+        )
+        # Agent() only takes a tool list, so the precompiled registry is swapped in afterwards
+        agent.tool_registry = self.tool_registry.clone()
+        return agent
@@ -4,13 +4,41 @@ This module provides a reusable wrapper around BedrockAgentCoreApp with
 custom functionality for agent projects.
 """
 
-import ast
-import json
-from typing import Any, AsyncGenerator, Callable, Dict, Optional, Sequence
+import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import time
+import uuid
+from functools import partial
+from typing import (
+    Any, AsyncGenerator, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable,
+    Optional, Sequence,
+)
 from bedrock_agentcore import BedrockAgentCoreApp
+from bedrock_agentcore.runtime.context import BedrockAgentCoreContext, RequestContext
+from bedrock_agentcore.runtime.models import PingStatus
+from strands import tool as strands_tool
+from strands.agent import AgentResult
+from strands.types.tools import AgentTool
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
 from starlette.types import Lifespan
+from .admission import AdmissionController, Overloaded
+from .batch import BatchInput, BatchResponse, run_batch
+from .cancellation import DisconnectWatcher, close_interrupted_turn
+from .metadata import MetadataCollector
+from .metrics import RUNTIME_METRICS, RequestProfiler, RuntimeMetrics
+from .session_lock import SessionBusy, SessionSerializer
+from .streaming import StreamCoalescer
+from .structured_logging import preview, route_to_queue
+from .telemetry import TelemetryExporter
+from .tool_cache import CachedTool, ToolCachePolicy
+from .tool_engine import LimitedTool, ToolLimits
 
 
 class StitchLabAgentApp(BedrockAgentCoreApp):
@@ -22,6 +50,9 @@ class StitchLabAgentApp(BedrockAgentCoreApp):
     - Metadata extraction from agent responses
     - Agent caching and optimization
     - Simplified entrypoint creation
+    - Startup/shutdown hooks and non-blocking warm-up
+    - Multi-worker serving from a pre-forked, preloaded supervisor
+    - Bulk invocation with bounded concurrency and NDJSON results
     """
     
     def __init__(
@@ -34,6 +65,19 @@ class StitchLabAgentApp(BedrockAgentCoreApp):
         cors_credentials: bool = True,
         cors_methods: list[str] | str = "*",
         cors_headers: list[str] | str = "*",
+        stream_metadata: bool = False,
+        metrics: Optional[RuntimeMetrics] = None,
+        metrics_path: Optional[str] = "/metrics",
+        profile_every_n: int = 0,
+        profiler: Optional[RequestProfiler] = None,
+        stream_coalescer: Optional[StreamCoalescer] = None,
+        admission: Optional[AdmissionController] = None,
+        session_policy: Optional[str] = SessionSerializer.POLICY_QUEUE,
+        session_serializer: Optional[SessionSerializer] = None,
+        cancel_on_disconnect: bool = True,
+        telemetry: Optional[TelemetryExporter] = None,
+        batch_path: Optional[str] = "/invocations/batch",
+        batch_concurrency: int = 8,
         **kwargs
     ):
         """Initialize the custom agent application.
@@ -47,12 +91,86 @@ class StitchLabAgentApp(BedrockAgentCoreApp):
             cors_credentials: Allow credentials in CORS (default: True)
             cors_methods: CORS allowed methods (default: "*")
             cors_headers: CORS allowed headers (default: "*")
+            stream_metadata: Yield metadata commands as soon as the tool that produced
+                them finishes instead of once at the end of the turn (default: False)
+            metrics: Runtime metrics to record into (default: the process-wide metrics)
+            metrics_path: Path of the Prometheus metrics endpoint, None to disable
+                (default: "/metrics")
+            profile_every_n: Profile one request in N with cProfile, 0 to disable (default: 0)
+            profiler: Custom request profiler, overrides profile_every_n
+            stream_coalescer: Batch streamed text chunks into fewer, larger frames
+                (default: None, every chunk is sent on its own)
+            admission: Cap concurrent requests and queue or reject the excess with an
+                "overloaded" error (default: None, every request is accepted)
+            session_policy: What a request does while another request of the same
+                session is running: "queue" to wait for it, "reject" to fail with a
+                "session_busy" error, None to run concurrently (default: "queue")
+            session_serializer: Custom session serializer, overrides session_policy
+            cancel_on_disconnect: Cancel the turn of a streaming request, including its
+                model and tool calls, when the client disconnects (default: True)
+            telemetry: Telemetry exporter to start with the app and flush at shutdown
+            batch_path: Path of the bulk invocation endpoint, None to disable
+                (default: "/invocations/batch")
+            batch_concurrency: Maximum inputs of one batch running at once; a request
+                may ask for fewer with ``?concurrency=`` (default: 8)
             **kwargs: Additional arguments passed to BedrockAgentCoreApp
         """
-        super().__init__(debug=debug, lifespan=lifespan, middleware=middleware)
+        # Hooks must exist before Starlette builds the lifespan that runs them
+        self._startup_hooks: list[Callable[[], Any]] = []
+        self._shutdown_hooks: list[Callable[[], Any]] = []
+        self._warmup_funcs: list[Callable[[], Awaitable[Any]]] = []
+        self._warmup_tasks: list[asyncio.Task] = []
+        self._preload_funcs: list[Callable[[], Any]] = []
+
+        # Write the base app's logs through the log queue instead of its own stream handler
+        for app_logger in route_to_queue("bedrock_agentcore.app"):
+            app_logger.setLevel(logging.DEBUG if debug else logging.INFO)
+
+        super().__init__(debug=debug, lifespan=self._build_lifespan(lifespan), middleware=middleware)
         self._custom_config: Dict[str, Any] = {}
         self._initialized = False
         self._create_agent_factory: Optional[Callable] = None
+        self._agent_handler: Optional[Callable] = None
+        self.batch_concurrency = max(1, batch_concurrency)
+        self.stream_metadata = stream_metadata
+        self.metrics = metrics or RUNTIME_METRICS
+        self.profiler = profiler or RequestProfiler(every_n=profile_every_n)
+        self.stream_coalescer = stream_coalescer
+        self.admission = admission
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.session_serializer = session_serializer
+        if self.session_serializer is None and session_policy is not None:
+            self.session_serializer = SessionSerializer(policy=session_policy)
+
+        if self.session_serializer is not None:
+            serializer = self.session_serializer
+            session_gauge = self.metrics.registry.gauge(
+                "stitchlab_session_turns", "Per-session turn serialization state", ["stat"]
+            )
+            for stat in serializer.stats():
+                session_gauge.set_function(lambda stat=stat: serializer.stats()[stat], stat)
+
+        self.telemetry = telemetry
+        if telemetry is not None:
+            self._startup_hooks.append(telemetry.start)
+            self._shutdown_hooks.append(telemetry.close)
+            telemetry_gauge = self.metrics.registry.gauge(
+                "stitchlab_telemetry", "Telemetry export queue depth and counters", ["stat"]
+            )
+            for stat in telemetry.stats():
+                telemetry_gauge.set_function(lambda stat=stat: telemetry.stats()[stat], stat)
+
+        if admission is not None:
+            admission_gauge = self.metrics.registry.gauge(
+                "stitchlab_admission", "Admission queue depth and counters", ["stat"]
+            )
+            for stat in admission.stats():
+                admission_gauge.set_function(lambda stat=stat: admission.stats()[stat], stat)
+
+        if metrics_path:
+            self.router.routes.append(Route(metrics_path, self._handle_metrics, methods=["GET"]))
+        if batch_path:
+            self.router.routes.append(Route(batch_path, self._handle_batch, methods=["POST"]))
         
         # Setup CORS middleware if enabled
         if enable_cors:
@@ -108,11 +226,272 @@ class StitchLabAgentApp(BedrockAgentCoreApp):
             self.logger.info("StitchLabAgentApp initialized")
         return self
     
+    def _build_lifespan(self, lifespan: Optional[Lifespan]) -> Lifespan:
+        """Wrap the user lifespan so registered startup/shutdown hooks run around it."""
+
+        @contextlib.asynccontextmanager
+        async def _lifespan(app):
+            for hook in self._startup_hooks:
+                await self._call_hook(hook)
+            self._start_warmup()
+            try:
+                if lifespan is None:
+                    yield
+                else:
+                    async with lifespan(app) as state:
+                        yield state
+            finally:
+                for task in self._warmup_tasks:
+                    task.cancel()
+                for hook in reversed(self._shutdown_hooks):
+                    try:
+                        await self._call_hook(hook)
+                    except Exception as e:
+                        self.logger.error(f"Shutdown hook failed: {e}")
+
+        return _lifespan
+
+    @staticmethod
+    async def _call_hook(hook: Callable[[], Any]) -> None:
+        result = hook()
+        if inspect.isawaitable(result):
+            await result
+
+    def on_startup(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Decorator to register a sync or async function to run at app startup.
+
+        Startup hooks run before the server accepts traffic, in registration order.
+
+        Args:
+            func: The function to run
+
+        Returns:
+            The function unchanged
+        """
+        self._startup_hooks.append(func)
+        return func
+
+    def on_shutdown(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Decorator to register a sync or async function to run at app shutdown.
+
+        Shutdown hooks run in reverse registration order; failures are logged
+        so that every hook gets a chance to run.
+
+        Args:
+            func: The function to run
+
+        Returns:
+            The function unchanged
+        """
+        self._shutdown_hooks.append(func)
+        return func
+
+    def warm_up(self, func: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        """Register an async warm-up function started eagerly in the background at startup.
+
+        Unlike startup hooks, warm-up does not delay serving: the server starts
+        immediately and the ping status reports HealthyBusy until every warm-up
+        function has completed. Warm-up functions should be single-flight so that
+        requests arriving early can await the same work.
+
+        Args:
+            func: Async function to run, e.g. AgentFactory.initialize
+
+        Returns:
+            The function unchanged
+
+        Example:
+            app.warm_up(factory.initialize)
+        """
+        self._warmup_funcs.append(func)
+        return func
+
+    def preload(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Register a sync function that loads read-only state before serving.
+
+        With several workers, preload functions run once in the supervisor before
+        the workers are forked, so the state they load is shared copy-on-write.
+        They must not open connections or start threads, which do not survive the
+        fork; those belong in warm-up or startup hooks, which run in every worker.
+
+        Args:
+            func: The function to run, e.g. AgentFactory.preload
+
+        Returns:
+            The function unchanged
+        """
+        self._preload_funcs.append(func)
+        return func
+
+    def run(
+        self,
+        port: int = 8080,
+        host: Optional[str] = None,
+        workers: int = 1,
+        max_requests: Optional[int] = None,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+        worker_port: Optional[int] = None,
+        **kwargs,
+    ):
+        """Start the server, in one process or in several pre-forked workers.
+
+        Connections reach any worker, and a session serializer only sees its own
+        worker, so several workers need an app built with ``session_policy=None``
+        to accept that the turns of a session may overlap. The agent factory
+        likewise keeps no session state between turns when ``WORKERS`` is above one. Each worker's
+        ``/metrics`` only covers that worker; set ``worker_port`` to scrape
+        them one by one.
+
+        Args:
+            port: Port to serve on, defaults to 8080
+            host: Host to bind to, auto-detected if None
+            workers: Number of worker processes (default: 1, serve in this process)
+            max_requests: Requests after which a worker is gracefully replaced
+                (default: None, never; multi-worker mode only)
+            max_requests_jitter: Random extra requests per worker so that workers
+                are not replaced all at once
+            graceful_timeout: Seconds a stopping worker gets to finish its requests
+            worker_port: First of the per-worker ports; worker ``i`` also serves on
+                ``worker_port + i`` (default: None; multi-worker mode only)
+            **kwargs: Additional arguments passed to uvicorn
+
+        Raises:
+            RuntimeError: If several workers are requested while a session serializer is set
+        """
+        if workers <= 1 or not hasattr(os, "fork"):
+            if workers > 1:
+                self.logger.warning("Multiple workers need fork support, serving in one process")
+            for func in self._preload_funcs:
+                func()
+            return super().run(port=port, host=host, **kwargs)
+
+        from .workers import PreforkServer
+
+        if self.session_serializer is not None:
+            raise RuntimeError(
+                f"Session turns can only be serialized within a worker; build the app with "
+                f"session_policy=None to serve with {workers} workers"
+            )
+
+        if host is None:
+            if os.path.exists("/.dockerenv") or os.environ.get("DOCKER_CONTAINER"):
+                host = "0.0.0.0"  # nosec B104 - Docker needs this to expose the port
+            else:
+                host = "127.0.0.1"
+        uvicorn_kwargs = {"access_log": self.debug, "log_level": "info" if self.debug else "warning"}
+        uvicorn_kwargs.update(kwargs)
+        server = PreforkServer(
+            self,
+            workers=workers,
+            host=host,
+            port=port,
+            preload=self._preload_funcs,
+            max_requests=max_requests,
+            max_requests_jitter=max_requests_jitter,
+            graceful_timeout=graceful_timeout,
+            worker_port=worker_port,
+            **uvicorn_kwargs,
+        )
+        return server.run()
+
+    def _start_warmup(self) -> None:
+        for func in self._warmup_funcs:
+            self._warmup_tasks.append(asyncio.create_task(self._run_warmup(func)))
+
+    async def _run_warmup(self, func: Callable[[], Awaitable[Any]]) -> None:
+        name = getattr(func, "__qualname__", "warm_up")
+        task_id = self.add_async_task(f"warm_up:{name}")
+        try:
+            await func()
+        except Exception as e:
+            self.logger.error(f"Warm-up {name} failed: {e}")
+        finally:
+            self.complete_async_task(task_id)
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether every registered warm-up function has finished."""
+        if len(self._warmup_tasks) < len(self._warmup_funcs):
+            return False
+        return all(task.done() for task in self._warmup_tasks)
+
+    def get_current_ping_status(self) -> PingStatus:
+        """Get current ping status, reporting HealthyBusy while warm-up is running."""
+        if self._forced_ping_status is None and not self.is_ready:
+            return PingStatus.HEALTHY_BUSY
+        return super().get_current_ping_status()
+
+    async def _handle_invocation(self, request: Request) -> Any:
+        response = await super()._handle_invocation(request)
+        if self.cancel_on_disconnect and isinstance(response, StreamingResponse):
+            # The entrypoint finds the watcher through the request of its context
+            watcher = DisconnectWatcher(response)
+            request.state.disconnect_watcher = watcher
+            return watcher
+        return response
+
+    def _handle_metrics(self, request) -> Response:
+        return Response(self.metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    async def _handle_batch(self, request: Request) -> Any:
+        if self._agent_handler is None:
+            return JSONResponse({"error": "No agent entrypoint defined"}, status_code=500)
+        concurrency = self.batch_concurrency
+        if "concurrency" in request.query_params:
+            try:
+                concurrency = min(concurrency, max(1, int(request.query_params["concurrency"])))
+            except ValueError:
+                return JSONResponse({"error": "concurrency must be an integer"}, status_code=400)
+        self.logger.info("Starting batch with concurrency %d", concurrency)
+        return BatchResponse(partial(self.invoke_batch, concurrency=concurrency))
+
+    def invoke_batch(
+        self,
+        inputs: AsyncIterable[BatchInput] | Iterable[BatchInput],
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run many inputs through the agent entrypoint with bounded concurrency.
+
+        Every input is a regular turn: it goes through session serialization,
+        admission control and the agent factory, and is recorded in the metrics,
+        like a request to the invocation endpoint. Inputs of the same session
+        therefore run one at a time, or fail with "session_busy" under the
+        "reject" session policy. The bulk endpoint streams these records as NDJSON.
+
+        Args:
+            inputs: ``{"actor_id", "session_id", "message"}`` objects, as an
+                iterable or an async stream
+            concurrency: Maximum inputs running at once (default: batch_concurrency)
+
+        Returns:
+            Async iterator of result records in completion order, see
+            :func:`runtime.batch.run_batch`
+
+        Example:
+            async for record in app.invoke_batch(inputs, concurrency=4):
+                print(record["index"], record["status"], record["output"])
+        """
+        if self._agent_handler is None:
+            raise RuntimeError("invoke_batch needs an agent_entrypoint")
+        handler = self._agent_handler
+
+        async def invoke(payload: Dict[str, Any]) -> AsyncIterator[Any]:
+            # Each input gets its own request ID, seen by logs and telemetry
+            BedrockAgentCoreContext.set_request_context(
+                str(uuid.uuid4()), payload["input"].get("session_id")
+            )
+            async for chunk in handler(payload):
+                yield chunk
+
+        return run_batch(invoke, inputs, concurrency or self.batch_concurrency)
+
     def extract_unique_metadata(self, data: Dict[str, Any]) -> list:
         """Extract unique metadata from agent response data.
         
         This method extracts unique commands/metadata from the agent's
-        tool results, removing duplicates.
+        tool results, removing duplicates. The streaming entrypoint collects
+        metadata incrementally with a MetadataCollector instead.
         
         Args:
             data: The event data from agent response
@@ -120,56 +499,21 @@ class StitchLabAgentApp(BedrockAgentCoreApp):
         Returns:
             List of unique metadata/commands
         """
-        unique = []
-        seen = set()
-
-        # Step 1: Navigate to message.content (list)
-        content_list = data.get("messages", [])
-
-        for item in content_list:
-            item_contents = item.get('content', [])
-            for item_content in item_contents:
-                tool_result = item_content.get("toolResult")
-
-                if not tool_result:
-                    continue
-
-                for content_entry in tool_result.get("content", []):
-                    text_value = content_entry.get("text")
-                    if not text_value:
-                        continue
-
-                    # Step 2: text_value is string containing Python dict -> convert using ast.literal_eval
-                    try:
-                        parsed = ast.literal_eval(text_value)
-                    except Exception:
-                        continue
-
-                    # Step 3: check if metadata exists
-                    metadata = parsed.get("metadata")
-                    if not metadata:
-                        continue
-
-                    # Convert metadata list into each dict item
-                    # metadata = {'commands': [...]}
-                    commands = metadata.get("commands", [])
-
-                    for cmd in commands:
-                        # Make dict hashable for uniqueness
-                        key = json.dumps(cmd, sort_keys=True)
-                        if key not in seen:
-                            seen.add(key)
-                            unique.append(cmd)
-
-        return unique
+        collector = MetadataCollector()
+        collector.add_messages(data.get("messages", []))
+        return collector.commands
     
     def agent_entrypoint(self, create_agent_func: Callable) -> Callable:
         """Decorator to create an agent entrypoint with automatic session handling.
         
         This decorator handles:
         - Extracting actor_id and session_id from payload
+        - Running the turns of a session one at a time
+        - Admission control, when configured
         - Creating/getting agent instance
         - Streaming agent responses
+        - Cancelling the turn, including running model and tool calls, when the
+          client disconnects
         - Extracting metadata from final results
         - Error handling
         
@@ -186,67 +530,185 @@ class StitchLabAgentApp(BedrockAgentCoreApp):
                 # You can override this if you need custom logic
                 pass
         """
-        async def entrypoint_wrapper(payload: Dict[str, Any]) -> AsyncGenerator[Any, None]:
+        async def entrypoint_wrapper(
+            payload: Dict[str, Any], context: Optional[RequestContext] = None
+        ) -> AsyncGenerator[Any, None]:
             """Wrapper that handles agent invocation with session management."""
-            self.logger.info(f"PAYLOAD : {payload}")
+            self.logger.info("PAYLOAD : %s", preview(payload))
             input_data = payload.get("input", {})
             actor_id = input_data.get('actor_id', '')
             session_id = input_data.get('session_id', '')
             message = input_data.get('message', '')
+
+            metrics = self.metrics
+            request_start = time.perf_counter()
+            metrics.session_started(session_id)
+            profile = self.profiler.start()
+            # Stays "cancelled" if the server closes the generator early; a disconnect
+            # noticed by the watcher is recorded as "client_disconnected"
+            outcome = "cancelled"
+            serialized = False
+            admitted = False
+            agent = None
+            events = None
+            request = getattr(context, "request", None)
+            watcher = getattr(request.state, "disconnect_watcher", None) if request else None
             
             try:
+                # Queue behind a running turn of the same session before taking a global slot
+                if self.session_serializer is not None:
+                    await self.session_serializer.acquire(actor_id, session_id)
+                    serialized = True
+
+                if self.admission is not None:
+                    waited = await self.admission.acquire(actor_id)
+                    admitted = True
+                    metrics.observe_phase(RuntimeMetrics.PHASE_ADMISSION_WAIT, waited)
+
                 # Get or create agent for this session
-                agent = await create_agent_func(actor_id=actor_id, session_id=session_id)
+                with metrics.time_phase(RuntimeMetrics.PHASE_AGENT_CREATION):
+                    agent = await create_agent_func(actor_id=actor_id, session_id=session_id)
                 
                 if agent is None:
+                    outcome = "agent_creation_error"
                     error_response = {"error": "Failed to create agent", "type": "agent_creation_error"}
                     self.logger.error(f"Agent creation failed: {error_response}")
                     yield error_response
                     return
 
-                prev_event = None
-                async for event in agent.stream_async(message):
+                collector = MetadataCollector()
+                stream_start = time.perf_counter()
+                first_token = True
+                events = agent.stream_async(message)
+                if self.stream_coalescer is not None:
+                    events = self.stream_coalescer.coalesce(events)
+                async for event in events:
                     if "data" in event:
+                        if first_token:
+                            first_token = False
+                            metrics.observe_phase(
+                                RuntimeMetrics.PHASE_TIME_TO_FIRST_TOKEN, time.perf_counter() - request_start
+                            )
                         yield event["data"]
-                        prev_event = event
-                    
-                    # Check for end of turn to extract metadata
-                    if "AgentResult(stop_reason='end_turn'" in str(event):
-                        self.logger.info(f"FINAL RESULT : {event}")
-                        if prev_event is not None:
-                            metadata = self.extract_unique_metadata(prev_event)
-                            if metadata:
-                                yield metadata
+
+                    elif "message" in event:
+                        # Tool result messages arrive as soon as their tools finish
+                        new_commands = collector.add_message(event["message"])
+                        if new_commands and self.stream_metadata:
+                            yield new_commands
+
+                    elif "result" in event:
+                        # Check for end of turn to emit the collected metadata
+                        result = event["result"]
+                        if isinstance(result, AgentResult) and result.stop_reason == "end_turn":
+                            self.logger.info("FINAL RESULT : %s", preview(result.message))
+                            if collector.commands and not self.stream_metadata:
+                                yield collector.commands
+
+                metrics.observe_phase(RuntimeMetrics.PHASE_STREAM_COMPLETION, time.perf_counter() - stream_start)
+                outcome = "success"
+
+            except Overloaded as e:
+                # Fail fast so the client can back off instead of piling onto a saturated server
+                outcome = "overloaded"
+                error_response = {"error": str(e), "type": "overloaded"}
+                self.logger.warning(f"Request rejected ({e.reason}): {error_response}")
+                yield error_response
+
+            except SessionBusy as e:
+                outcome = "session_busy"
+                error_response = {"error": str(e), "type": "session_busy"}
+                self.logger.warning(f"Request rejected: {error_response}")
+                yield error_response
+                            
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if watcher is None or not watcher.caused(task):
+                    raise
+                # Only the watcher cancelled: nobody is left to read the stream, so end it quietly
+                task.uncancel()
+                outcome = "client_disconnected"
                             
             except Exception as e:
                 # Handle errors gracefully in streaming context
+                outcome = "stream_error"
                 error_response = {"error": str(e), "type": "stream_error"}
                 self.logger.error(f"Agent invocation error: {error_response}")
                 yield error_response
+
+            finally:
+                if outcome in ("cancelled", "client_disconnected") and agent is not None:
+                    # Stop model and tool calls, then leave the history ready for the next turn
+                    if events is not None:
+                        await events.aclose()
+                    await close_interrupted_turn(agent)
+                if admitted:
+                    self.admission.release(actor_id)
+                if serialized:
+                    self.session_serializer.release(actor_id, session_id)
+                metrics.observe_phase(RuntimeMetrics.PHASE_REQUEST, time.perf_counter() - request_start)
+                metrics.requests_total.inc(outcome)
+                metrics.session_finished(session_id)
+                self.profiler.finish(profile, {"session_id": session_id, "outcome": outcome})
         
         # Register as entrypoint
+        self._agent_handler = entrypoint_wrapper
         return self.entrypoint(entrypoint_wrapper)
     
-    def tool(self, func: Callable) -> Callable:
+    def tool(
+        self,
+        func: Optional[Callable] = None,
+        *,
+        cache: Optional[ToolCachePolicy] = None,
+        limits: Optional[ToolLimits] = None,
+    ) -> Callable:
         """Decorator to register a function as a tool.
         
-        This is a convenience method that can be extended with custom
-        tool registration logic.
+        With a cache policy the tool's results are memoized per argument set, so
+        mark only pure or idempotent tools this way. Cache hits and misses are
+        counted per tool in the app's metrics.
+        
+        Limits give the tool its own timeout and concurrency limit, overriding
+        the factory's TOOL_TIMEOUT, TOOL_MAX_CONCURRENCY and TOOL_LIMITS. Cache
+        hits are answered without waiting for a concurrency slot.
         
         Args:
-            func: The function to register as a tool
+            func: The function or Strands tool to register
+            cache: Optional result cache policy
+            limits: Optional timeout and concurrency limit
             
         Returns:
-            The decorated function
+            The decorated function, wrapped as a CachedTool or LimitedTool when a
+            cache policy or limits are given
+            
+        Example:
+            @app.tool(cache=ToolCachePolicy(ttl=600), limits=ToolLimits(timeout=10))
+            @tool
+            def multiply(a: int, b: int) -> int:
+                ...
         """
-        # Add custom tool registration logic here if needed
-        # For now, this is a placeholder for future functionality
-        return func
+        if func is None:
+            # Used as @app.tool(...)
+            def decorator(f: Callable) -> Callable:
+                return self.tool(f, cache=cache, limits=limits)
+            return decorator
+
+        if cache is None and limits is None:
+            return func
+
+        agent_tool = func if isinstance(func, AgentTool) else strands_tool(func)
+        if limits is not None:
+            agent_tool = LimitedTool(agent_tool, limits)
+        if cache is not None:
+            agent_tool = CachedTool(agent_tool, cache, metrics=self.metrics)
+        return agent_tool
     
     def health_check(self, func: Optional[Callable] = None) -> Callable:
         """Decorator to register a custom health check handler.
         
-        This wraps the ping decorator with additional custom logic.
+        This wraps the ping decorator with additional custom logic. While
+        warm-up is still running the app reports HealthyBusy without calling
+        the handler.
         
         Args:
             func: Optional function to register
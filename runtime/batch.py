@@ -0,0 +1,259 @@
+"""Bulk agent invocation with bounded concurrency.
+
+Offline evaluation and backfills otherwise pay one HTTP request, and its
+setup, per message. This module runs a stream of inputs through the regular
+agent entrypoint with at most ``concurrency`` turns in flight, and produces
+one result record per input, in completion order, as soon as it finishes.
+Inputs are consumed as they arrive, so a large upload starts running before
+it has been fully received.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Optional, Union,
+)
+
+from starlette.types import Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+BatchInput = Union[Dict[str, Any], Exception]
+Invoke = Callable[[Dict[str, Any]], AsyncIterator[Any]]
+
+_END = object()
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[BatchInput]:
+    """Parse newline-delimited JSON objects from a byte stream.
+
+    Args:
+        chunks: Byte chunks, e.g. a request body stream
+
+    Yields:
+        One dict per non-empty line, or the exception for a line that is not a
+        JSON object, so the caller can report it with the line's index
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> BatchInput:
+    try:
+        value = json.loads(line)
+    except ValueError as e:
+        return e
+    if not isinstance(value, dict):
+        return ValueError("Batch input must be a JSON object")
+    return value
+
+
+async def _aiter(
+    inputs: Union[AsyncIterable[BatchInput], Iterable[BatchInput]],
+) -> AsyncIterator[BatchInput]:
+    if hasattr(inputs, "__aiter__"):
+        async for item in inputs:
+            yield item
+    else:
+        for item in inputs:
+            yield item
+
+
+async def run_batch(
+    invoke: Invoke,
+    inputs: Union[AsyncIterable[BatchInput], Iterable[BatchInput]],
+    concurrency: int = 8,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run every input through an agent entrypoint and yield results as they complete.
+
+    Inputs are ``{"actor_id", "session_id", "message"}`` objects, or entrypoint
+    payloads with those fields under ``"input"``. Each result record holds:
+
+    - ``index``: Position of the input in the stream
+    - ``actor_id``, ``session_id``: From the input
+    - ``status``: "success", or "error" with ``error`` and ``error_type``
+    - ``output``: Streamed text
+    - ``metadata``: Metadata commands collected from tool results
+    - ``timing``: ``queued_ms`` from reading the input to starting it,
+      ``first_token_ms`` and ``total_ms`` from starting it
+
+    Args:
+        invoke: Agent entrypoint taking a payload and streaming its response
+        inputs: Inputs, or exceptions for inputs that could not be parsed
+        concurrency: Maximum inputs running at once
+
+    Yields:
+        Result records, in completion order
+    """
+    concurrency = max(1, concurrency)
+    # Bounded, so a fast producer waits for free workers instead of buffering the whole batch
+    pending: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def read() -> None:
+        try:
+            index = 0
+            async for item in _aiter(inputs):
+                await pending.put((index, item, time.perf_counter()))
+                index += 1
+        except Exception as e:
+            logger.error(f"Reading batch inputs failed: {e}")
+            await results.put(
+                {"index": None, "status": "error", "error": str(e), "error_type": "input_error"}
+            )
+        finally:
+            for _ in range(concurrency):
+                await pending.put(_END)
+
+    async def work() -> None:
+        while True:
+            entry = await pending.get()
+            if entry is _END:
+                await results.put(_END)
+                return
+            await results.put(await _run_one(invoke, *entry))
+
+    tasks = [asyncio.ensure_future(read())]
+    tasks.extend(asyncio.ensure_future(work()) for _ in range(concurrency))
+    try:
+        running = concurrency
+        while running:
+            record = await results.get()
+            if record is _END:
+                running -= 1
+                continue
+            yield record
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_one(invoke: Invoke, index: int, item: BatchInput, read_at: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    fields = item.get("input", item) if isinstance(item, dict) else {}
+    record: Dict[str, Any] = {
+        "index": index,
+        "actor_id": fields.get("actor_id", ""),
+        "session_id": fields.get("session_id", ""),
+        "status": "success",
+        "output": "",
+        "metadata": [],
+    }
+    first_token: Optional[float] = None
+
+    if isinstance(item, Exception):
+        record.update(status="error", error=f"Invalid input: {item}", error_type="input_error")
+    elif not isinstance(fields, dict) or not fields.get("message"):
+        record.update(status="error", error="Input has no message", error_type="input_error")
+    else:
+        text = []
+        try:
+            async for chunk in invoke({"input": fields}):
+                if isinstance(chunk, str):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    text.append(chunk)
+                elif isinstance(chunk, list):
+                    record["metadata"].extend(chunk)
+                elif isinstance(chunk, dict) and "error" in chunk:
+                    record.update(
+                        status="error", error=chunk["error"], error_type=chunk.get("type")
+                    )
+        except Exception as e:
+            record.update(status="error", error=str(e), error_type="stream_error")
+        record["output"] = "".join(text)
+
+    end = time.perf_counter()
+    record["timing"] = {
+        "queued_ms": round((start - read_at) * 1000, 1),
+        "first_token_ms": round((first_token - start) * 1000, 1) if first_token else None,
+        "total_ms": round((end - start) * 1000, 1),
+    }
+    return record
+
+
+class BatchResponse:
+    """ASGI response running the NDJSON inputs of a request body as a batch.
+
+    Starlette's StreamingResponse reads from ``receive`` to notice a
+    disconnect, which would consume the request body this response is still
+    reading. This response is the only reader instead: body chunks feed the
+    batch and a disconnect cancels it, including the running turns.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, run: Callable[[AsyncIterable[BatchInput]], AsyncIterator[Dict[str, Any]]]):
+        """Initialize the response.
+
+        Args:
+            run: Function running parsed inputs and yielding result records,
+                e.g. a partial of :func:`run_batch`
+        """
+        self.run = run
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+
+        async def listen() -> None:
+            more_body = True
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+                if more_body and message["type"] == "http.request":
+                    body.put_nowait(message.get("body", b""))
+                    more_body = message.get("more_body", False)
+                    if not more_body:
+                        body.put_nowait(None)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            while (chunk := await body.get()) is not None:
+                yield chunk
+
+        async def respond() -> None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", self.media_type.encode())],
+                }
+            )
+            results = self.run(parse_ndjson(chunks()))
+            try:
+                async for record in results:
+                    line = json.dumps(record, default=str).encode() + b"\n"
+                    await send({"type": "http.response.body", "body": line, "more_body": True})
+            finally:
+                await results.aclose()
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        listener = asyncio.ensure_future(listen())
+        responder = asyncio.ensure_future(respond())
+        waiter = asyncio.ensure_future(disconnected.wait())
+        try:
+            await asyncio.wait([responder, waiter], return_when=asyncio.FIRST_COMPLETED)
+            if not responder.done():
+                logger.info("Batch client disconnected, cancelling the remaining inputs")
+        finally:
+            for task in (responder, listener, waiter):
+                task.cancel()
+            await asyncio.gather(listener, waiter, return_exceptions=True)
+            try:
+                await responder
+            except asyncio.CancelledError:
+                if not disconnected.is_set():
+                    raise
@@ -0,0 +1,148 @@
+"""Cancellation of agent turns whose client has disconnected.
+
+A streaming response only notices a dropped connection when it next writes,
+and the agent keeps calling the model and tools until then. This module
+listens for the disconnect on the response itself, cancels the task streaming
+the turn as soon as it happens, and closes the interrupted turn in the
+conversation history so the session can continue with the next request.
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Optional
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from strands.hooks import MessageAddedEvent
+from strands.types.content import Message
+
+
+logger = logging.getLogger(__name__)
+
+INTERRUPTED_TURN_TEXT = "The response was interrupted because the client disconnected."
+
+
+class DisconnectWatcher:
+    """ASGI wrapper of a streaming response that cancels it when the client disconnects.
+
+    Starlette's StreamingResponse stops on a disconnect through an anyio cancel
+    scope, which keeps cancelling the stream while it closes the turn, or, on
+    ASGI 2.4 servers, only at its next write. This wrapper is the only reader of
+    ``receive`` instead: on ``http.disconnect`` it sets :attr:`disconnected` and
+    cancels the task streaming the response once, so code running in the stream
+    can tell this cancellation apart from others with :meth:`caused`.
+    """
+
+    def __init__(self, response: StreamingResponse):
+        """Wrap a response.
+
+        Args:
+            response: Streaming response of the agent turn
+        """
+        self.response = response
+        self.disconnected = False
+        self._cancelled: Optional[asyncio.Task] = None
+
+    def caused(self, task: Optional[asyncio.Task]) -> bool:
+        """Whether the watcher's cancellation is the only one requested of a task.
+
+        Args:
+            task: Task that was cancelled, usually the current task
+
+        Returns:
+            False if the watcher did not cancel the task, or something else,
+            e.g. server shutdown, cancelled it too
+        """
+        return task is not None and task is self._cancelled and task.cancelling() == 1
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def listen() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        async def stream() -> None:
+            try:
+                await self.response.stream_response(send)
+            except OSError:
+                raise ClientDisconnect()
+
+        streamer = asyncio.ensure_future(stream())
+        listener = asyncio.ensure_future(listen())
+        try:
+            await asyncio.wait([streamer, listener], return_when=asyncio.FIRST_COMPLETED)
+            if listener.done() and not listener.cancelled() and listener.exception() is None:
+                if not streamer.done():
+                    logger.info("Client disconnected, cancelling the agent turn")
+                    self.disconnected = True
+                    self._cancelled = streamer
+                    streamer.cancel()
+        finally:
+            listener.cancel()
+            if not self.disconnected:
+                # Cancelled from outside, e.g. at shutdown: stop the stream as well
+                streamer.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+            try:
+                await streamer
+            except asyncio.CancelledError:
+                if not self.disconnected or asyncio.current_task().cancelling():
+                    raise
+
+        if self.response.background is not None:
+            await self.response.background()
+
+
+async def close_interrupted_turn(agent: Any, text: str = INTERRUPTED_TURN_TEXT) -> List[Message]:
+    """Complete the conversation history of a turn that was cancelled midway.
+
+    A cancelled turn can leave the history ending with the user prompt, or with
+    tool calls that never got results, which the model rejects on the next
+    turn. Tool calls without results get error results, and an assistant
+    message saying the turn was interrupted closes the turn. The added messages
+    are persisted through the agent's session manager like any other message,
+    including its async hooks.
+
+    Args:
+        agent: The agent whose turn was cancelled
+        text: Text of the error results and the closing assistant message
+
+    Returns:
+        The messages added to the history
+    """
+    messages = agent.messages
+    if not messages:
+        return []
+
+    added: List[Message] = []
+    last = messages[-1]
+    if last.get("role") == "assistant":
+        tool_uses = [block["toolUse"] for block in last.get("content", []) if "toolUse" in block]
+        if not tool_uses:
+            # The turn finished before it was cancelled
+            return []
+        added.append(
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "toolResult": {
+                            "toolUseId": tool_use["toolUseId"],
+                            "status": "error",
+                            "content": [{"text": text}],
+                        }
+                    }
+                    for tool_use in tool_uses
+                ],
+            }
+        )
+    added.append({"role": "assistant", "content": [{"text": text}]})
+
+    for message in added:
+        messages.append(message)
+        try:
+            event = MessageAddedEvent(agent=agent, message=message)
+            await agent.hooks.invoke_callbacks_async(event)
+        except Exception as e:
+            logger.error(f"Could not persist the close of an interrupted turn: {e}")
+    return added
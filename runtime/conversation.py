@@ -0,0 +1,252 @@
+"""Token-budgeted conversation windowing.
+
+Without a limit, every turn of a long session sends the whole history to the
+model, so prompt size and time to first token grow with the session. This
+module trims the oldest turns once the conversation exceeds a token budget,
+counting tokens with the bundled ``cl100k_base`` encoding. Each message is only
+tokenized once, no matter how many turns it stays in the window. Trimmed turns
+are dropped, not summarized.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import tiktoken
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.types.content import Message, Messages
+
+if TYPE_CHECKING:
+    from strands import Agent
+
+
+logger = logging.getLogger(__name__)
+
+# Rough per-message framing overhead (role and separators) added by chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Images, documents and other binary blocks are not tokenized; count a flat estimate
+BINARY_BLOCK_TOKENS = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name: str = "cl100k_base") -> "tiktoken.Encoding":
+    """Load a tiktoken encoding once per process.
+
+    Uses the local file configured by ``GlobalConfig._setup_tiktoken_cache``.
+
+    Args:
+        name: Encoding name
+
+    Returns:
+        The shared encoding
+    """
+    return tiktoken.get_encoding(name)
+
+
+def count_text_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """Count the tokens of a text.
+
+    Args:
+        text: Text to count
+        encoding_name: tiktoken encoding name
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+    return len(get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message: Message, encoding_name: str = "cl100k_base") -> int:
+    """Approximate the tokens a message adds to the prompt.
+
+    Text, tool inputs and tool results are tokenized; binary content such as
+    images counts a flat estimate.
+
+    Args:
+        message: A conversation message
+        encoding_name: tiktoken encoding name
+
+    Returns:
+        Approximate number of tokens
+    """
+    parts = []
+    binary_blocks = 0
+    for block in message.get("content", []):
+        if "text" in block:
+            parts.append(block["text"])
+        elif "toolUse" in block:
+            tool_use = block["toolUse"]
+            parts.append(tool_use.get("name", ""))
+            parts.append(json.dumps(tool_use.get("input"), default=str))
+        elif "toolResult" in block:
+            for item in block["toolResult"].get("content", []):
+                if "text" in item:
+                    parts.append(item["text"])
+                elif "json" in item:
+                    parts.append(json.dumps(item["json"], default=str))
+                else:
+                    binary_blocks += 1
+        elif "reasoningContent" in block:
+            parts.append(block["reasoningContent"].get("reasoningText", {}).get("text", ""))
+        else:
+            binary_blocks += 1
+
+    return (
+        MESSAGE_OVERHEAD_TOKENS
+        + count_text_tokens("\n".join(parts), encoding_name)
+        + binary_blocks * BINARY_BLOCK_TOKENS
+    )
+
+
+class TokenBudgetConversationManager(SlidingWindowConversationManager):
+    """Sliding window that also keeps the conversation within a token budget.
+
+    After every invocation the oldest messages are dropped until the history,
+    plus the reserved tokens for the system prompt and tool specs, fits in
+    ``max_tokens``. The most recent ``min_messages`` are always kept where
+    possible, and the window always starts with a user prompt rather than an
+    assistant reply or an orphaned tool result. The message-count limit
+    and overflow handling of the sliding window still apply.
+
+    Dropped messages are not summarized; the model only sees the window.
+
+    Token counts are memoized by message content, so a message is tokenized
+    once when it enters the window and again only if its content changes,
+    e.g. when a tool result is truncated.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        reserved_tokens: int = 0,
+        min_messages: int = 2,
+        window_size: int = 40,
+        should_truncate_results: bool = True,
+        encoding_name: str = "cl100k_base",
+    ):
+        """Initialize the conversation manager.
+
+        Args:
+            max_tokens: Token budget for the prompt
+            reserved_tokens: Tokens always used by the system prompt and tool specs
+            min_messages: Number of most recent messages that are never dropped
+            window_size: Maximum number of messages to keep
+            should_truncate_results: Truncate tool results on context overflow
+            encoding_name: tiktoken encoding used for counting
+        """
+        super().__init__(window_size=window_size, should_truncate_results=should_truncate_results)
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.min_messages = min_messages
+        self.encoding_name = encoding_name
+        # Content digest -> tokens, for the messages of the current window
+        self._token_counts: Dict[bytes, int] = {}
+
+    def count_tokens(self, messages: Messages) -> int:
+        """Count the tokens of messages, reusing memoized counts.
+
+        Args:
+            messages: Conversation messages
+
+        Returns:
+            Total tokens including the reserved tokens
+        """
+        return self.reserved_tokens + sum(self._message_tokens(messages))
+
+    def _message_tokens(self, messages: Messages) -> List[int]:
+        """Count the tokens of each message, reusing memoized counts.
+
+        Serializing a message to key the memo is much cheaper than tokenizing it.
+        Only the counts of the given messages are kept, so dropped messages are
+        released.
+        """
+        counts: Dict[bytes, int] = {}
+        tokens = []
+        for message in messages:
+            key = hashlib.blake2b(
+                json.dumps(message, sort_keys=True, default=str).encode(), digest_size=16
+            ).digest()
+            count = counts.get(key)
+            if count is None:
+                count = self._token_counts.get(key)
+                if count is None:
+                    count = count_message_tokens(message, self.encoding_name)
+                counts[key] = count
+            tokens.append(count)
+        self._token_counts = counts
+        return tokens
+
+    def apply_management(self, agent: "Agent", **kwargs: Any) -> None:
+        """Drop the oldest messages that do not fit in the token budget.
+
+        Args:
+            agent: The agent whose messages will be managed in place
+            **kwargs: Additional keyword arguments for future extensibility
+        """
+        super().apply_management(agent, **kwargs)
+        self.fit_to_budget(agent)
+
+    def fit_to_budget(self, agent: "Agent") -> None:
+        """Drop the oldest messages until the conversation fits the token budget.
+
+        Unlike :meth:`apply_management`, this does not apply the message-count
+        window, so it never truncates tool results.
+
+        Args:
+            agent: The agent whose messages will be trimmed in place
+        """
+        messages = agent.messages
+        tokens = self._message_tokens(messages)
+        total = self.reserved_tokens + sum(tokens)
+        if total <= self.max_tokens:
+            return
+
+        keep_from = max(0, len(messages) - self.min_messages)
+        trim_index = 0
+        while total > self.max_tokens and trim_index < keep_from:
+            total -= tokens[trim_index]
+            trim_index += 1
+
+        trim_index = self._next_valid_trim_index(messages, trim_index)
+        if trim_index == 0:
+            return
+        if trim_index >= len(messages):
+            logger.warning(
+                f"Conversation needs {total} tokens, over the {self.max_tokens} token budget, "
+                "but cannot be trimmed further"
+            )
+            return
+
+        logger.debug("Dropping %d messages to fit the %d token budget", trim_index, self.max_tokens)
+        self.removed_message_count += trim_index
+        messages[:] = messages[trim_index:]
+        self._message_tokens(messages)
+
+    def restore_from_session(self, state: Dict[str, Any]) -> Optional[Messages]:
+        # Sessions written before the budget was enabled carry the sliding window's state
+        if state.get("__name__") == SlidingWindowConversationManager.__name__:
+            state = {**state, "__name__": self.__class__.__name__}
+        return super().restore_from_session(state)
+
+    @staticmethod
+    def _next_valid_trim_index(messages: Messages, trim_index: int) -> int:
+        """Move a trim index forward until the window starts with a user prompt.
+
+        A window must not start with an assistant message or a tool result whose
+        tool use was dropped.
+        """
+        if trim_index == 0:
+            return 0
+        while trim_index < len(messages):
+            message = messages[trim_index]
+            if message.get("role") == "user" and not any(
+                "toolResult" in block for block in message.get("content", [])
+            ):
+                return trim_index
+            trim_index += 1
+        return trim_index
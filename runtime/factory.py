@@ -5,15 +5,27 @@ components (model, tools, system prompt) and only creates session-specific
 parts per invocation.
 """
 
+import asyncio
+import json
 import logging
-from typing import List, Optional, Any, Literal
-from strands import Agent
-from strands.tools.mcp import MCPClient
-from strands.models.litellm import LiteLLMModel
-from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
-from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
-from mcp.client.streamable_http import streamable_http_client
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from config import GlobalConfig, BaseSettings
+from .pool import AgentPool
+
+if TYPE_CHECKING:
+    # Strands, litellm and the AgentCore memory client take about a second to import,
+    # so they are loaded by the factory methods that need them rather than on import
+    from strands import Agent
+    from strands.models.model import Model
+    from .agent_template import AgentTemplate
+    from .conversation import TokenBudgetConversationManager
+    from .mcp_pool import MCPConnectionPool
+    from .metrics import RuntimeMetrics
+    from .session_writer import SessionWriteQueue
+    from .tool_cache import ToolResultCache
+    from .tool_catalog import ToolCatalogCache
 
 
 logger = logging.getLogger(__name__)
@@ -29,71 +41,452 @@ class AgentFactory:
         config: GlobalConfig[BaseSettings],
         system_prompt: str,
         local_tools: Optional[List[Any]] = None,
+        metrics: Optional["RuntimeMetrics"] = None,
     ):
         """Initialize the factory with configuration.
         
         Args:
             config: AgentFactoryConfig instance with project-specific settings
+            metrics: Runtime metrics to record into (default: the process-wide metrics)
         """
+        from .metrics import RUNTIME_METRICS, ToolMetricsHook
+        from .tool_engine import ToolExecutionEngine, ToolLimits
+
         self.config = config
         self.local_tools = local_tools or []
         self.system_prompt = system_prompt
 
-        self.model: Optional[LiteLLMModel] = None
+        self.model: Optional["Model"] = None
         self._cached_tools: Optional[List[Any]] = None
+        self._agent_template: Optional["AgentTemplate"] = None
+        self.mcp_pools: List["MCPConnectionPool"] = []
+        self._mcp_server_tools: List[Optional[List[Any]]] = []
         self._initialized = False
+        self._init_lock = threading.Lock()
+        self._init_task: Optional[asyncio.Future] = None
+        self._reserved_tokens = 0
+        # Kept across MCP catalog refreshes so cached results survive a tool reload
+        self._tool_caches: Dict[str, "ToolResultCache"] = {}
+        # MCP tool catalogs read by preload(), keyed by server URL
+        self._preloaded_catalogs: Dict[str, List[Any]] = {}
+
+        settings = self.config.settings
+        # Workers share no memory and a session's turns may reach any of them, so with
+        # several workers every turn must read the session from, and write it to, memory
+        self.multi_worker = settings.WORKERS > 1
+        if self.multi_worker:
+            logger.info(
+                f"Running with {settings.WORKERS} workers: the warm agent pool and "
+                "write-behind session persistence are disabled"
+            )
+
+        # Warm agents kept between turns so follow-ups skip the memory reload
+        self.agent_pool = AgentPool(
+            max_size=0 if self.multi_worker else settings.AGENT_POOL_SIZE,
+            idle_ttl=settings.AGENT_POOL_TTL,
+            max_bytes=settings.AGENT_POOL_MAX_BYTES,
+        )
+
+        self.metrics = metrics or RUNTIME_METRICS
+        self._tool_metrics_hook = ToolMetricsHook(self.metrics)
+        pool_gauge = self.metrics.registry.gauge(
+            "stitchlab_agent_pool", "Warm agent pool occupancy and counters", ["stat"]
+        )
+        for stat in ("size", "bytes", "hits", "misses", "evictions"):
+            pool_gauge.set_function(lambda stat=stat: self.agent_pool.stats()[stat], stat)
+
+        # Tool calls of a turn run concurrently on a bounded pool, within per-tool limits
+        self.tool_engine = ToolExecutionEngine(
+            max_workers=settings.TOOL_WORKERS,
+            limits={
+                name: ToolLimits(**limits) for name, limits in (settings.TOOL_LIMITS or {}).items()
+            },
+            default_limits=ToolLimits(
+                timeout=settings.TOOL_TIMEOUT, max_concurrency=settings.TOOL_MAX_CONCURRENCY
+            ),
+        )
+
+        # Session messages are persisted in the background instead of on the request path
+        self.session_writer: Optional["SessionWriteQueue"] = None
+        if settings.SESSION_WRITE_BEHIND and not self.multi_worker:
+            from .session_writer import SessionWriteQueue
+
+            self.session_writer = SessionWriteQueue(
+                workers=settings.SESSION_WRITE_WORKERS,
+                max_queue_size=settings.SESSION_WRITE_QUEUE_SIZE,
+                batch_size=settings.SESSION_WRITE_BATCH_SIZE,
+            )
+            writer_gauge = self.metrics.registry.gauge(
+                "stitchlab_session_writes", "Write-behind session queue depth and counters", ["stat"]
+            )
+            for stat in ("depth", "written", "collapsed", "failed"):
+                writer_gauge.set_function(lambda stat=stat: self.session_writer.stats()[stat], stat)
     
+    def preload(self) -> None:
+        """Load the read-only parts of the factory without opening connections or threads.
+
+        Imports the model and MCP client libraries, loads the tokenizer and reads the
+        cached MCP tool catalogs. In multi-worker mode the app runs this once before
+        forking, so the workers share the result copy-on-write and only open their own
+        clients in :meth:`initialize`. Register it with ``app.preload(factory.preload)``.
+        """
+        start = time.perf_counter()
+        import strands.models.litellm
+        import strands.tools.mcp  # noqa: F401
+
+        from . import agent_template, mcp_pool  # noqa: F401
+        from .conversation import get_encoding
+
+        if self.config.settings.CONTEXT_TOKEN_BUDGET:
+            get_encoding()
+        for url in self._mcp_urls():
+            catalog = self._tool_catalog(url)
+            cached = catalog.load() if catalog else None
+            if cached is not None:
+                self._preloaded_catalogs[url] = cached
+        logger.info(
+            f"Agent factory preloaded in {(time.perf_counter() - start) * 1000:.0f}ms, "
+            f"{len(self._preloaded_catalogs)} cached MCP catalogs"
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the expensive components have been initialized."""
+        return self._initialized
+
+    async def initialize(self) -> None:
+        """Initialize the cached components without blocking the event loop.
+
+        The blocking work (model construction, MCP tool discovery) runs in a worker
+        thread. Initialization is single-flight: concurrent callers, including requests
+        arriving while an eager warm-up is in progress, await the same future. A failed
+        initialization is retried by the next caller.
+
+        Example:
+            app.warm_up(factory.initialize)
+        """
+        if self._initialized:
+            return
+
+        if self._init_task is None:
+            self._init_task = asyncio.ensure_future(asyncio.to_thread(self._initialize_components))
+
+        init_task = self._init_task
+        try:
+            # Shield so one cancelled waiter does not abort the shared warm-up
+            await asyncio.shield(init_task)
+        except Exception:
+            if self._init_task is init_task and init_task.done():
+                self._init_task = None
+            raise
+
     def _initialize_components(self):
         """Initialize and cache expensive components (model, tools, system_prompt)."""
         if self._initialized:
             return
-        
+
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._build_components()
+
+    def _build_components(self):
+        """Build the model and tool list; callers must hold the init lock."""
         logger.info("Initializing agent factory components (this happens once)...")
         
+        # litellm takes seconds to import, so it is loaded here rather than at startup
+        from strands.models.litellm import LiteLLMModel
+
+        from .model_cache import CachedModel
+        from .tool_cache import ToolCachePolicy
+
         # Use the litellm model with the configured model_id
         self.model = LiteLLMModel(
             model_id=self.config.settings.MODEL_ID
         )
         logger.info(f"Using LiteLLM model with model_id: {self.config.settings.MODEL_ID}")
+        self.model = self._with_model_routing(self.model)
+        if self.config.settings.MODEL_CACHE:
+            self.model = CachedModel(
+                self.model,
+                ToolCachePolicy(
+                    ttl=self.config.settings.MODEL_CACHE_TTL,
+                    max_entries=self.config.settings.MODEL_CACHE_MAX_ENTRIES,
+                    disk_dir=self.config.settings.MODEL_CACHE_DIR,
+                ),
+                metrics=self.metrics,
+            )
+            logger.info("Model response cache enabled")
         
-        # Fetch and cache MCP tools if configured (expensive operation)
-        mcp_tools = []
-        if self.config.settings.MCP_URL:
-            try:
-                logger.info("Initializing MCP client...")
-                # MCPClient must be used within a context manager
-                with MCPClient(lambda: streamable_http_client(self.config.settings.MCP_URL)) as mcp_client:
-                    # List all available tools from the MCP server
-                    all_mcp_tools = mcp_client.list_tools_sync()
-                    logger.info(f"MCP TOOLS discovered: {[tool.tool_name for tool in all_mcp_tools]}")
-                        
-                    if self.config.settings.MCP_TOOLS:
-                        # Filter tools by allowed names
-                        mcp_tools = [
-                            tool for tool in all_mcp_tools
-                            if tool.tool_name in self.config.settings.MCP_TOOLS
-                        ]
-                        logger.info(f"FILTERED MCP TOOLS: {[tool.tool_name for tool in mcp_tools]}")
-                    else:
-                        # Use all MCP tools if no filter specified
-                        mcp_tools = list(all_mcp_tools)
-
-            except Exception as e:
-                logger.error(f"Error initializing MCP tools: {str(e)}", exc_info=True)
-                mcp_tools = []
+        # The MCP client is loaded with the first pool rather than at startup
+        from .mcp_pool import MCPConnectionPool
+
+        # Open long-lived MCP sessions and discover tools on every server in parallel
+        self.mcp_pools = [
+            MCPConnectionPool(
+                url,
+                size=self.config.settings.MCP_POOL_SIZE,
+                startup_timeout=self.config.settings.MCP_STARTUP_TIMEOUT,
+                health_check_interval=self.config.settings.MCP_HEALTH_CHECK_INTERVAL,
+                max_backoff=self.config.settings.MCP_RECONNECT_MAX_BACKOFF,
+            )
+            for url in self._mcp_urls()
+        ]
+        if self.mcp_pools:
+            logger.info("Initializing MCP connection pools...")
+        mcp_tools = self._with_tool_cache(self.tool_engine.wrap(self._load_mcp_tools()))
         
         # Combine MCP tools with local tools
-        self._cached_tools = mcp_tools + (self.local_tools or [])
+        self._cached_tools = mcp_tools + self.tool_engine.wrap(self.local_tools or [])
         logger.info(f"TOTAL TOOLS: {len(self._cached_tools)}")
+        self._agent_template = self._build_agent_template()
+        self._reserved_tokens = self._count_reserved_tokens()
         
         self._initialized = True
         logger.info("Agent factory components initialized and cached")
     
-    async def create_agent(self, actor_id: str, session_id: str) -> Optional[Agent]:
+    def _build_agent_template(self) -> "AgentTemplate":
+        """Register and validate the cached tools once for all agents to share."""
+        from .agent_template import AgentTemplate
+
+        start = time.perf_counter()
+        template = AgentTemplate.build(
+            model=self.model,
+            tools=self._cached_tools or [],
+            system_prompt=self.system_prompt,
+            tool_executor=self.tool_engine.executor,
+            hooks=[self._tool_metrics_hook],
+        )
+        logger.info(
+            f"Agent template with {template.tool_count} tools built in "
+            f"{(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        return template
+
+    def _mcp_urls(self) -> List[str]:
+        """Get the configured MCP server URLs, primary server first."""
+        urls = [self.config.settings.MCP_URL] + list(self.config.settings.MCP_SERVER_URLS or [])
+        return list(dict.fromkeys(url for url in urls if url))
+
+    def _tool_catalog(self, url: str) -> Optional["ToolCatalogCache"]:
+        from .tool_catalog import ToolCatalogCache
+
+        cache_dir = self.config.settings.MCP_TOOL_CACHE_DIR
+        if not cache_dir:
+            return None
+        return ToolCatalogCache(cache_dir, url, allowed=self.config.settings.MCP_TOOLS)
+
+    def _load_mcp_tools(self) -> List[Any]:
+        """Get MCP tools for every server, booting from the on-disk catalog when possible.
+
+        Servers with a cached catalog are served from it immediately and revalidated
+        in a background thread; the others are discovered over the network now.
+        """
+        from strands.tools.mcp import MCPAgentTool
+
+        from .mcp_pool import discover_server_tools, merge_tools
+
+        allowed = self.config.settings.MCP_TOOLS
+        self._mcp_server_tools = [None] * len(self.mcp_pools)
+
+        cached_indexes = []
+        for index, pool in enumerate(self.mcp_pools):
+            cached = self._preloaded_catalogs.pop(pool.url, None)
+            if cached is None:
+                catalog = self._tool_catalog(pool.url)
+                cached = catalog.load() if catalog else None
+            if cached is not None:
+                # Bound to the pool, which connects lazily on the first tool call
+                self._mcp_server_tools[index] = [MCPAgentTool(tool, pool) for tool in cached]
+                cached_indexes.append(index)
+
+        missing = [index for index in range(len(self.mcp_pools)) if index not in cached_indexes]
+        discovered = discover_server_tools([self.mcp_pools[index] for index in missing], allowed)
+        for index, tools in zip(missing, discovered):
+            self._mcp_server_tools[index] = tools
+            catalog = self._tool_catalog(self.mcp_pools[index].url)
+            if catalog and tools is not None:
+                catalog.save([tool.mcp_tool for tool in tools])
+
+        if cached_indexes:
+            threading.Thread(
+                target=self._refresh_mcp_tools, args=(cached_indexes,), name="mcp-tool-refresh", daemon=True
+            ).start()
+
+        return merge_tools(self._mcp_server_tools)
+
+    def _refresh_mcp_tools(self, indexes: List[int]):
+        """Revalidate cached MCP catalogs against their servers and swap in changes.
+
+        Changes are detected against the catalog this process serves, not the cache
+        file, which another process sharing the cache directory may already have updated.
+        """
+        from .mcp_pool import discover_server_tools, merge_tools
+        from .tool_catalog import dump_specs
+
+        pools = [self.mcp_pools[index] for index in indexes]
+        discovered = discover_server_tools(pools, self.config.settings.MCP_TOOLS)
+
+        changed = False
+        for index, pool, tools in zip(indexes, pools, discovered):
+            if tools is None:
+                continue
+            specs = [tool.mcp_tool for tool in tools]
+            catalog = self._tool_catalog(pool.url)
+            if catalog is not None:
+                catalog.save(specs)
+            served = [tool.mcp_tool for tool in self._mcp_server_tools[index] or []]
+            if dump_specs(specs) != dump_specs(served):
+                self._mcp_server_tools[index] = tools
+                changed = True
+
+        if not changed:
+            logger.info("Cached MCP tool catalogs are up to date")
+            return
+
+        # Swap the whole list at once; running agents keep the list they were built with
+        mcp_tools = merge_tools(self._mcp_server_tools)
+        mcp_tools = self._with_tool_cache(self.tool_engine.wrap(mcp_tools))
+        self._cached_tools = mcp_tools + self.tool_engine.wrap(self.local_tools or [])
+        self._agent_template = self._build_agent_template()
+        self._reserved_tokens = self._count_reserved_tokens()
+        # Agents checked out now are not returned, see create_agent
+        self.agent_pool.clear()
+        logger.info(f"MCP tool catalog changed, TOTAL TOOLS: {len(self._cached_tools)}")
+
+    def close(self):
+        """Flush queued session writes, close the pooled MCP sessions and stop the tool workers.
+
+        Register it as a shutdown hook, e.g. ``app.on_shutdown(factory.close)``.
+        """
+        if self.session_writer is not None:
+            self.session_writer.close(timeout=self.config.settings.SESSION_WRITE_FLUSH_TIMEOUT)
+
+        for pool in self.mcp_pools:
+            pool.stop()
+        self.mcp_pools = []
+        self.tool_engine.shutdown()
+
+    def _with_model_routing(self, model: "Model") -> "Model":
+        """Add the MODEL_FALLBACKS endpoints behind the primary model, with hedging if configured.
+
+        Each fallback is a model ID or a dict of LiteLLMModel arguments, e.g. with
+        ``client_args`` pointing at another deployment.
+        """
+        settings = self.config.settings
+        fallbacks = settings.MODEL_FALLBACKS or []
+        if not fallbacks and settings.MODEL_HEDGE_AFTER is None:
+            return model
+
+        from strands.models.litellm import LiteLLMModel
+
+        from .model_router import CircuitBreaker, HedgedModel
+
+        models: List["Model"] = [model]
+        for fallback in fallbacks:
+            kwargs = {"model_id": fallback} if isinstance(fallback, str) else dict(fallback)
+            models.append(LiteLLMModel(**kwargs))
+        logger.info(
+            f"Model endpoints: {[m.get_config().get('model_id') for m in models]}, "
+            f"hedge after: {settings.MODEL_HEDGE_AFTER}s"
+        )
+        return HedgedModel(
+            models,
+            hedge_after=settings.MODEL_HEDGE_AFTER,
+            breaker_factory=lambda: CircuitBreaker(
+                failure_threshold=settings.MODEL_CIRCUIT_FAILURES,
+                reset_timeout=settings.MODEL_CIRCUIT_RESET,
+            ),
+            metrics=self.metrics,
+        )
+
+    def _with_tool_cache(self, tools: List[Any]) -> List[Any]:
+        """Wrap the MCP tools listed in MCP_CACHED_TOOLS with a result cache."""
+        settings = self.config.settings
+        cached_names = set(settings.MCP_CACHED_TOOLS or [])
+        if not cached_names:
+            return tools
+
+        from .tool_cache import CachedTool, ToolCachePolicy, ToolResultCache
+
+        wrapped = []
+        for tool in tools:
+            if tool.tool_name not in cached_names:
+                wrapped.append(tool)
+                continue
+            cache = self._tool_caches.get(tool.tool_name)
+            if cache is None:
+                policy = ToolCachePolicy(
+                    ttl=settings.TOOL_CACHE_TTL,
+                    max_entries=settings.TOOL_CACHE_MAX_ENTRIES,
+                    disk_dir=settings.TOOL_CACHE_DIR,
+                )
+                cache = self._tool_caches[tool.tool_name] = ToolResultCache(tool.tool_name, policy)
+            wrapped.append(CachedTool(tool, cache=cache, metrics=self.metrics))
+        return wrapped
+
+    def _count_reserved_tokens(self) -> int:
+        """Count the prompt tokens every request spends on the system prompt and tool specs."""
+        if not self.config.settings.CONTEXT_TOKEN_BUDGET:
+            return 0
+
+        from .conversation import count_text_tokens
+
+        specs = [getattr(tool, "tool_spec", None) for tool in self._cached_tools or []]
+        return count_text_tokens(self.system_prompt or "") + count_text_tokens(
+            json.dumps([spec for spec in specs if spec], default=str)
+        )
+
+    def _conversation_manager(self) -> Optional["TokenBudgetConversationManager"]:
+        """Build the per-agent conversation manager, or None for the Strands default."""
+        budget = self.config.settings.CONTEXT_TOKEN_BUDGET
+        if not budget:
+            return None
+
+        from .conversation import TokenBudgetConversationManager
+
+        return TokenBudgetConversationManager(
+            max_tokens=budget,
+            reserved_tokens=self._reserved_tokens,
+            window_size=self.config.settings.CONTEXT_WINDOW_MESSAGES,
+        )
+
+    @staticmethod
+    def _is_reusable(agent: "Agent") -> bool:
+        """Check that a pooled agent ended its last turn in a consistent state.
+
+        A turn that failed mid-stream can leave a trailing user message or an
+        unanswered tool use; such agents are rebuilt from memory instead.
+        """
+        if not agent.messages:
+            return True
+
+        last_message = agent.messages[-1]
+        if last_message.get("role") != "assistant":
+            return False
+        return not any("toolUse" in block for block in last_message.get("content", []))
+
+    def release_agent(self, actor_id: str, session_id: str, agent: "Agent") -> None:
+        """Return an agent checked out by :meth:`create_agent` to the pool.
+
+        Agents from :meth:`create_agent` are returned automatically when an
+        invocation ends; call this for an agent that is not invoked.
+
+        Args:
+            actor_id: The actor ID for the session
+            session_id: The session ID
+            agent: The agent whose turn is over
+        """
+        self.agent_pool.put(actor_id, session_id, agent)
+
+    async def create_agent(self, actor_id: str, session_id: str) -> Optional["Agent"]:
         """Create an agent instance with session-specific configuration.
         
-        This method only creates a new session_manager per invocation,
+        Warm agents are reused from the pool for follow-up turns of the same
+        session. On a miss this method only creates a new session_manager,
         reusing all other expensive components (model, tools, system_prompt).
+        The agent is checked out of the pool until its invocation ends, so
+        concurrent turns of a session never share an agent.
         
         Args:
             actor_id: The actor ID for the session
@@ -103,7 +496,29 @@ class AgentFactory:
             Agent instance or None if creation fails
         """
         # Initialize components on first call (lazy initialization)
-        self._initialize_components()
+        await self.initialize()
+
+        from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
+        from bedrock_agentcore.memory.integrations.strands.session_manager import (
+            AgentCoreMemorySessionManager,
+        )
+        from strands.hooks import AfterInvocationEvent
+
+        from .conversation import TokenBudgetConversationManager
+        from .metrics import RuntimeMetrics
+
+        if self.session_writer is not None and self.session_writer.has_failed(session_id):
+            # Writes of this session were dropped; reload what the store actually holds
+            self.session_writer.clear_failed(session_id)
+            self.agent_pool.discard(actor_id, session_id)
+            logger.warning(f"Reloading session {session_id} after failed session writes")
+
+        agent = self.agent_pool.get(actor_id, session_id)
+        if agent is not None:
+            if self._is_reusable(agent):
+                return agent
+            self.agent_pool.discard(actor_id, session_id)
+            logger.info(f"Discarding inconsistent pooled agent for session {session_id}")
         
         # Only create session-specific parts (cheap operation)
         agentcore_memory_config = AgentCoreMemoryConfig(
@@ -112,18 +527,44 @@ class AgentFactory:
             actor_id=actor_id
         )
         
-        session_manager = AgentCoreMemorySessionManager(
-            agentcore_memory_config=agentcore_memory_config,
-            region_name=self.config.settings.BEDROCK_REGION
-        )
+        # Reading the session and restoring its history is the memory hydration phase
+        hydration_start = time.perf_counter()
+        if self.session_writer is not None:
+            # History is read back from memory, so earlier turns must be written first
+            if self.session_writer.has_pending(session_id):
+                await asyncio.to_thread(self.session_writer.flush, session_id)
+            from .session_writer import WriteBehindMemorySessionManager
+
+            session_manager = WriteBehindMemorySessionManager(
+                agentcore_memory_config=agentcore_memory_config,
+                region_name=self.config.settings.BEDROCK_REGION,
+                write_queue=self.session_writer,
+            )
+        else:
+            session_manager = AgentCoreMemorySessionManager(
+                agentcore_memory_config=agentcore_memory_config,
+                region_name=self.config.settings.BEDROCK_REGION
+            )
         
         # Create agent using cached components
         try:
-            agent = Agent(
-                model=self.model,
-                tools=self._cached_tools,
-                system_prompt=self.system_prompt,
-                session_manager=session_manager
+            template = self._agent_template
+            agent = template.create(
+                session_manager=session_manager,
+                conversation_manager=self._conversation_manager(),
+            )
+
+            def return_to_pool(event: AfterInvocationEvent) -> None:
+                # Agents built before an MCP tool catalog change are not kept
+                if self._agent_template is template:
+                    self.release_agent(actor_id, session_id, event.agent)
+
+            agent.hooks.add_callback(AfterInvocationEvent, return_to_pool)
+            # Sessions restored from memory may predate the budget; fit them before the first call
+            if isinstance(agent.conversation_manager, TokenBudgetConversationManager):
+                agent.conversation_manager.fit_to_budget(agent)
+            self.metrics.observe_phase(
+                RuntimeMetrics.PHASE_MEMORY_HYDRATION, time.perf_counter() - hydration_start
             )
             return agent
 
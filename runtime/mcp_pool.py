@@ -0,0 +1,339 @@
+"""Persistent, pooled MCP server connections.
+
+This module keeps long-lived MCP client sessions open for the lifetime of the
+process instead of opening a connection only to list tools. Tools discovered
+through a pool are bound to it, so every tool call reuses an already initialized
+session and only pays the request round trip.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from mcp.client.streamable_http import streamable_http_client
+from strands.tools.mcp import MCPAgentTool, MCPClient
+from strands.types.exceptions import MCPClientInitializationError
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Connection:
+    client: MCPClient
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    in_flight: int = 0
+    failures: int = 0
+    retry_at: float = 0.0
+    connected: bool = False
+    opened: int = 0
+
+
+class MCPConnectionPool:
+    """Pool of long-lived sessions to a single MCP server.
+
+    The pool opens ``size`` sessions up front and spreads tool calls over them,
+    picking the least busy live session. A background keep-alive thread pings every
+    session and reconnects broken ones with exponential backoff; calls that find no
+    live session trigger the same reconnect path.
+
+    The pool implements the ``call_tool_async`` method used by ``MCPAgentTool``, so
+    tools returned by :meth:`list_tools` call through the pool.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        size: int = 2,
+        startup_timeout: int = 30,
+        health_check_interval: Optional[float] = 30.0,
+        ping_timeout: float = 5.0,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        transport_factory: Optional[Callable[[str], Any]] = None,
+    ):
+        """Initialize the pool without connecting.
+
+        Args:
+            url: MCP server URL
+            size: Number of concurrent sessions to keep open
+            startup_timeout: Seconds to wait for a session to initialize
+            health_check_interval: Seconds between keep-alive pings (None disables)
+            ping_timeout: Seconds to wait for a ping response
+            base_backoff: First reconnect delay in seconds
+            max_backoff: Upper bound for the reconnect delay in seconds
+            transport_factory: Callable building an MCP transport for a URL
+                (default: streamable HTTP)
+        """
+        self.url = url
+        self.size = max(1, size)
+        self.startup_timeout = startup_timeout
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._transport_factory = transport_factory or streamable_http_client
+
+        self._connections: List[_Connection] = [
+            _Connection(client=self._new_client()) for _ in range(self.size)
+        ]
+        self._stop_event = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        self.reconnects = 0
+
+    def _new_client(self) -> MCPClient:
+        return MCPClient(
+            lambda: self._transport_factory(self.url),
+            startup_timeout=self.startup_timeout,
+        )
+
+    def start(self) -> "MCPConnectionPool":
+        """Open every session and start the keep-alive thread.
+
+        Sessions are opened in parallel. The pool starts as long as one session
+        connects; the others are retried by the keep-alive loop.
+
+        Returns:
+            Self for method chaining
+
+        Raises:
+            MCPClientInitializationError: If no session could be opened
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            results = list(executor.map(self._reconnect, self._connections))
+
+        if not any(results):
+            raise MCPClientInitializationError(f"could not open any MCP session to {self.url}")
+
+        logger.info(f"MCP pool for {self.url} started with {sum(results)}/{self.size} sessions")
+
+        if self.health_check_interval and self._keepalive_thread is None:
+            self._stop_event.clear()
+            self._keepalive_thread = threading.Thread(
+                target=self._keepalive_loop, name=f"mcp-keepalive-{self.url}", daemon=True
+            )
+            self._keepalive_thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the keep-alive thread and close every session."""
+        self._stop_event.set()
+        if self._keepalive_thread is not None:
+            self._keepalive_thread.join(timeout=self.ping_timeout + 1)
+            self._keepalive_thread = None
+
+        for conn in self._connections:
+            with conn.lock:
+                self._close(conn)
+
+    def list_tools(self) -> List[MCPAgentTool]:
+        """List every tool exposed by the server, bound to this pool.
+
+        Returns:
+            MCPAgentTool instances whose calls are routed through the pool
+        """
+        conn = self._pick_live()
+        if conn is None:
+            raise MCPClientInitializationError(f"no live MCP session to {self.url}")
+
+        tools: List[MCPAgentTool] = []
+        pagination_token = None
+        while True:
+            page = conn.client.list_tools_sync(pagination_token)
+            tools.extend(MCPAgentTool(tool.mcp_tool, self) for tool in page)
+            pagination_token = page.pagination_token
+            if pagination_token is None:
+                break
+        return tools
+
+    async def call_tool_async(
+        self,
+        tool_use_id: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        read_timeout_seconds: Optional[timedelta] = None,
+    ) -> Any:
+        """Call a tool on the least busy live session.
+
+        Args:
+            tool_use_id: Unique identifier for this tool use
+            name: Name of the tool on the MCP server
+            arguments: Optional arguments to pass to the tool
+            read_timeout_seconds: Optional timeout for the tool call
+
+        Returns:
+            MCPToolResult from the server
+
+        Raises:
+            MCPClientInitializationError: If no session is live and reconnecting failed
+        """
+        conn = self._pick_live()
+        if conn is None:
+            conn = await self._reconnect_any()
+
+        conn.in_flight += 1
+        try:
+            return await conn.client.call_tool_async(
+                tool_use_id=tool_use_id,
+                name=name,
+                arguments=arguments,
+                read_timeout_seconds=read_timeout_seconds,
+            )
+        finally:
+            conn.in_flight -= 1
+
+    def health_check(self) -> Dict[str, Any]:
+        """Report the state of the pool's sessions.
+
+        Returns:
+            Dictionary with URL, session counts, in-flight calls and reconnects
+        """
+        return {
+            "url": self.url,
+            "size": self.size,
+            "live": sum(1 for conn in self._connections if self._is_live(conn)),
+            "in_flight": sum(conn.in_flight for conn in self._connections),
+            "reconnects": self.reconnects,
+        }
+
+    @staticmethod
+    def _is_live(conn: _Connection) -> bool:
+        # MCPClient has no public liveness check; the session thread dies with the connection
+        return conn.connected and conn.client._is_session_active()
+
+    def _pick_live(self) -> Optional[_Connection]:
+        live = [conn for conn in self._connections if self._is_live(conn)]
+        if not live:
+            return None
+        return min(live, key=lambda conn: conn.in_flight)
+
+    async def _reconnect_any(self) -> _Connection:
+        for conn in self._connections:
+            if await asyncio.to_thread(self._reconnect, conn):
+                return conn
+        raise MCPClientInitializationError(f"no live MCP session to {self.url}")
+
+    def _reconnect(self, conn: _Connection, force: bool = False) -> bool:
+        """(Re)open a session unless it is live or still backing off.
+
+        Args:
+            conn: The connection to reopen
+            force: Reopen even if the session thread is still alive
+
+        Returns:
+            True if the session is live afterwards
+        """
+        with conn.lock:
+            if not force and self._is_live(conn):
+                return True
+            if time.monotonic() < conn.retry_at:
+                return False
+
+            self._close(conn)
+            try:
+                conn.client.start()
+            except Exception as e:
+                conn.failures += 1
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (conn.failures - 1))
+                conn.retry_at = time.monotonic() + delay
+                logger.warning(f"MCP session to {self.url} failed to connect, retrying in {delay:.1f}s: {e}")
+                return False
+
+            if conn.opened:
+                self.reconnects += 1
+            conn.opened += 1
+            conn.connected = True
+            conn.failures = 0
+            conn.retry_at = 0.0
+            return True
+
+    @staticmethod
+    def _close(conn: _Connection) -> None:
+        if not conn.connected:
+            return
+        conn.connected = False
+        try:
+            conn.client.stop(None, None, None)
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing MCP session: {e}")
+
+    def _ping(self, conn: _Connection) -> bool:
+        if not self._is_live(conn):
+            return False
+        try:
+            # Strands does not expose ping, so send it on the client's own session loop
+            session = conn.client._background_thread_session
+            conn.client._invoke_on_background_thread(session.send_ping()).result(timeout=self.ping_timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"MCP keep-alive ping to {self.url} failed: {e}")
+            return False
+
+    def _keepalive_loop(self) -> None:
+        while not self._stop_event.wait(self.health_check_interval):
+            for conn in self._connections:
+                if self._stop_event.is_set():
+                    return
+                # A session with calls in flight is in use and needs no keep-alive
+                if conn.in_flight or self._ping(conn):
+                    continue
+                self._reconnect(conn, force=True)
+
+
+def discover_server_tools(
+    pools: Sequence[MCPConnectionPool],
+    allowed: Optional[Sequence[str]] = None,
+) -> List[Optional[List[MCPAgentTool]]]:
+    """Start several pools and list their tools in parallel.
+
+    Args:
+        pools: Connection pools to start
+        allowed: Optional allow-list of tool names
+
+    Returns:
+        One tool list per pool, in the same order; None for servers that failed
+    """
+    if not pools:
+        return []
+
+    def _discover(pool: MCPConnectionPool) -> Optional[List[MCPAgentTool]]:
+        try:
+            tools = pool.start().list_tools()
+        except Exception as e:
+            logger.error(f"Error initializing MCP tools from {pool.url}: {str(e)}", exc_info=True)
+            return None
+
+        logger.info(f"MCP TOOLS discovered on {pool.url}: {[tool.tool_name for tool in tools]}")
+        if allowed:
+            tools = [tool for tool in tools if tool.tool_name in allowed]
+            logger.info(f"FILTERED MCP TOOLS: {[tool.tool_name for tool in tools]}")
+        return tools
+
+    with ThreadPoolExecutor(max_workers=len(pools)) as executor:
+        return list(executor.map(_discover, pools))
+
+
+def merge_tools(per_server: Sequence[Optional[Sequence[MCPAgentTool]]]) -> List[MCPAgentTool]:
+    """Combine per-server tool lists, keeping the first tool of each name.
+
+    Args:
+        per_server: Tool lists in server priority order (None entries are skipped)
+
+    Returns:
+        Combined list of pooled MCP tools
+    """
+    tools: List[MCPAgentTool] = []
+    seen = set()
+    for server_tools in per_server:
+        for tool in server_tools or []:
+            if tool.tool_name in seen:
+                logger.warning(f"Skipping duplicate MCP tool name: {tool.tool_name}")
+                continue
+            seen.add(tool.tool_name)
+            tools.append(tool)
+    return tools
@@ -0,0 +1,142 @@
+"""Incremental extraction of metadata commands from tool results.
+
+Tools can return a ``metadata`` entry with a list of ``commands`` next to their
+regular output. This module collects those commands as tool results arrive in
+the agent stream, removing duplicates, so the app does not need to rescan the
+whole conversation at the end of a turn.
+"""
+
+import ast
+import json
+import re
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+# Matches the opening brace of a dict literal without copying large payloads
+_DICT_START = re.compile(r"\s*\{")
+
+
+def parse_tool_payload(text: str) -> Optional[Dict[str, Any]]:
+    """Parse a tool-result text block that may carry metadata.
+
+    Blocks that cannot contain a metadata mapping are skipped without parsing:
+    the text must mention ``metadata`` and look like a dict literal. JSON is
+    tried first because it is much faster than ``ast.literal_eval``; the Python
+    literal parser is only used for payloads produced with ``str(dict)``.
+
+    Args:
+        text: Text content of a tool result
+
+    Returns:
+        The parsed dict, or None if the text is not a dict payload with metadata
+    """
+    if "metadata" not in text:
+        return None
+
+    if not _DICT_START.match(text):
+        return None
+
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        try:
+            parsed = ast.literal_eval(text.strip())
+        except Exception:
+            return None
+
+    return parsed if isinstance(parsed, dict) else None
+
+
+def command_key(cmd: Any) -> Hashable:
+    """Build a canonical hashable key for deduplicating a command.
+
+    Flat dicts of scalars, the common case, are keyed by their items without
+    serialization. Types are part of the key so ``1`` and ``True`` stay distinct.
+    Nested commands fall back to canonical JSON.
+
+    Args:
+        cmd: A metadata command
+
+    Returns:
+        A hashable key equal for equal commands
+    """
+    try:
+        if isinstance(cmd, dict):
+            key: Hashable = frozenset((k, type(v), v) for k, v in cmd.items())
+        else:
+            key = (type(cmd), cmd)
+        hash(key)
+        return key
+    except TypeError:
+        return json.dumps(cmd, sort_keys=True, default=str)
+
+
+class MetadataCollector:
+    """Collects unique metadata commands from tool results, one message at a time."""
+
+    def __init__(self):
+        self._seen: set = set()
+        self.commands: List[Any] = []
+
+    def add_messages(self, messages: Iterable[Dict[str, Any]]) -> List[Any]:
+        """Collect commands from several messages.
+
+        Args:
+            messages: Conversation messages
+
+        Returns:
+            Commands that were not seen before, in order of appearance
+        """
+        new_commands = []
+        for message in messages:
+            new_commands.extend(self.add_message(message))
+        return new_commands
+
+    def add_message(self, message: Dict[str, Any]) -> List[Any]:
+        """Collect commands from the tool results of a single message.
+
+        Args:
+            message: A conversation message, e.g. the tool result message
+                emitted after a tool finished
+
+        Returns:
+            Commands that were not seen before, in order of appearance
+        """
+        new_commands = []
+        for item_content in message.get("content", []):
+            tool_result = item_content.get("toolResult")
+            if tool_result:
+                new_commands.extend(self.add_tool_result(tool_result))
+        return new_commands
+
+    def add_tool_result(self, tool_result: Dict[str, Any]) -> List[Any]:
+        """Collect commands from a single tool result.
+
+        Args:
+            tool_result: A toolResult content block
+
+        Returns:
+            Commands that were not seen before, in order of appearance
+        """
+        new_commands = []
+        for content_entry in tool_result.get("content", []):
+            text_value = content_entry.get("text")
+            if not text_value:
+                continue
+
+            # text_value is a JSON or Python dict literal string
+            parsed = parse_tool_payload(text_value)
+            if parsed is None:
+                continue
+
+            # metadata = {'commands': [...]}
+            metadata = parsed.get("metadata")
+            if not metadata or not isinstance(metadata, dict):
+                continue
+
+            for cmd in metadata.get("commands", []):
+                key = command_key(cmd)
+                if key not in self._seen:
+                    self._seen.add(key)
+                    self.commands.append(cmd)
+                    new_commands.append(cmd)
+        return new_commands
@@ -0,0 +1,443 @@
+"""Low-overhead runtime metrics with Prometheus text exposition.
+
+This module provides the counters, gauges and histograms used to break down
+request latency into phases (agent creation, memory hydration, time to first
+token, tool execution, stream completion), a hook provider that times tool
+calls per tool name, and a sampling cProfile hook for individual requests.
+"""
+
+import abc
+import bisect
+import cProfile
+import io
+import itertools
+import logging
+import os
+import pstats
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from strands.hooks import AfterToolCallEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond parsing up to long agent turns
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric(abc.ABC):
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    @abc.abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Render the sample lines of the metric, without HELP and TYPE."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increment the counter for the given label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Get the current value for the given label values."""
+        return self._values.get(label_values, 0.0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {value}" for labels, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. in-flight requests."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increase the gauge for the given label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        """Decrease the gauge for the given label values."""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the gauge for the given label values."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def set_function(self, func: Callable[[], float], *label_values: str) -> None:
+        """Compute the gauge lazily at scrape time, e.g. from a queue size."""
+        with self._lock:
+            self._functions[label_values] = func
+
+    def value(self, *label_values: str) -> float:
+        """Get the current value for the given label values."""
+        func = self._functions.get(label_values)
+        return func() if func else self._values.get(label_values, 0.0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+            functions = list(self._functions.items())
+        for labels, func in functions:
+            try:
+                items.append((labels, float(func())))
+            except Exception as e:
+                logger.debug(f"Gauge function for {self.name} failed: {e}")
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {value}" for labels, value in items]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observations cost one bisect and two additions."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record an observation for the given label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *label_values: str) -> int:
+        """Get the number of observations for the given label values."""
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket that contains it."""
+        series = self._series.get(label_values)
+        if not series:
+            return None
+        counts = series[0]
+        target = q * sum(counts)
+        for bound, cumulative in zip(self.buckets + (float("inf"),), itertools.accumulate(counts)):
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+
+        lines = []
+        for labels, counts, total in items:
+            cumulative = list(itertools.accumulate(counts))
+            for bound, value in zip(self.buckets, cumulative):
+                le = _format_labels(self.label_names, labels, extra=f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {value}")
+            le = _format_labels(self.label_names, labels, extra='le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.metric_type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RuntimeMetrics:
+    """The agent runtime's metrics, registered on a MetricsRegistry.
+
+    Attributes:
+        phase_seconds: Latency per request phase
+        tool_seconds: Latency per tool name
+        requests_total: Finished requests per outcome
+        requests_in_flight: Requests currently being streamed
+        sessions_in_flight: Distinct sessions with a request in flight
+        tool_cache_total: Tool result cache lookups per tool and result (hit/miss)
+        model_cache_total: Model response cache lookups per result (hit/miss)
+        model_requests_total: Model endpoint requests per model and outcome
+            (success/error/cancelled), plus hedged and fallback starts
+    """
+
+    PHASE_ADMISSION_WAIT = "admission_wait"
+    PHASE_AGENT_CREATION = "agent_creation"
+    PHASE_MEMORY_HYDRATION = "memory_hydration"
+    PHASE_TIME_TO_FIRST_TOKEN = "time_to_first_token"
+    PHASE_TOOL_EXECUTION = "tool_execution"
+    PHASE_STREAM_COMPLETION = "stream_completion"
+    PHASE_REQUEST = "request"
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, prefix: str = "stitchlab"):
+        """Register the runtime metrics.
+
+        Args:
+            registry: Registry to register on (default: a new registry)
+            prefix: Metric name prefix
+        """
+        self.registry = registry or MetricsRegistry()
+        self.phase_seconds = self.registry.histogram(
+            f"{prefix}_agent_phase_seconds", "Agent request latency per phase", ["phase"]
+        )
+        self.tool_seconds = self.registry.histogram(
+            f"{prefix}_tool_seconds", "Tool execution latency per tool", ["tool", "status"]
+        )
+        self.requests_total = self.registry.counter(
+            f"{prefix}_requests_total", "Finished agent requests per outcome", ["outcome"]
+        )
+        self.requests_in_flight = self.registry.gauge(
+            f"{prefix}_requests_in_flight", "Agent requests currently streaming"
+        )
+        self.sessions_in_flight = self.registry.gauge(
+            f"{prefix}_sessions_in_flight", "Distinct sessions with a request in flight"
+        )
+        self.tool_cache_total = self.registry.counter(
+            f"{prefix}_tool_cache_total", "Tool result cache lookups per tool and result", ["tool", "result"]
+        )
+        self.model_cache_total = self.registry.counter(
+            f"{prefix}_model_cache_total", "Model response cache lookups per result", ["result"]
+        )
+        self.model_requests_total = self.registry.counter(
+            f"{prefix}_model_requests_total", "Model endpoint requests per model and outcome",
+            ["model", "outcome"],
+        )
+        self._session_refs: Dict[str, int] = {}
+        self._session_lock = threading.Lock()
+
+    def observe_phase(self, phase: str, seconds: float) -> None:
+        """Record the duration of a request phase."""
+        self.phase_seconds.observe(seconds, phase)
+
+    def session_started(self, session_id: str) -> None:
+        """Track a request starting for a session."""
+        with self._session_lock:
+            self._session_refs[session_id] = self._session_refs.get(session_id, 0) + 1
+            self.sessions_in_flight.set(len(self._session_refs))
+        self.requests_in_flight.inc()
+
+    def session_finished(self, session_id: str) -> None:
+        """Track a request finishing for a session."""
+        with self._session_lock:
+            remaining = self._session_refs.get(session_id, 1) - 1
+            if remaining > 0:
+                self._session_refs[session_id] = remaining
+            else:
+                self._session_refs.pop(session_id, None)
+            self.sessions_in_flight.set(len(self._session_refs))
+        self.requests_in_flight.dec()
+
+    def time_phase(self, phase: str) -> "_PhaseTimer":
+        """Context manager timing a block as a request phase."""
+        return _PhaseTimer(self, phase)
+
+    def render(self) -> str:
+        """Render the registry in Prometheus text format."""
+        return self.registry.render()
+
+
+class _PhaseTimer:
+    __slots__ = ("_metrics", "_phase", "_start")
+
+    def __init__(self, metrics: RuntimeMetrics, phase: str):
+        self._metrics = metrics
+        self._phase = phase
+
+    def __enter__(self) -> "_PhaseTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._metrics.observe_phase(self._phase, time.perf_counter() - self._start)
+
+
+class ToolMetricsHook(HookProvider):
+    """Agent hook that times every tool call per tool name."""
+
+    def __init__(self, metrics: RuntimeMetrics):
+        self.metrics = metrics
+        self._started: Dict[str, float] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        self._started[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def _after_tool_call(self, event: AfterToolCallEvent) -> None:
+        started = self._started.pop(event.tool_use["toolUseId"], None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        status = "error" if event.exception is not None else event.result.get("status", "success")
+        self.metrics.tool_seconds.observe(elapsed, event.tool_use["name"], status)
+        self.metrics.observe_phase(RuntimeMetrics.PHASE_TOOL_EXECUTION, elapsed)
+
+
+class RequestProfiler:
+    """Samples one request in ``every_n`` with cProfile.
+
+    Only one request is profiled at a time. cProfile observes the whole thread,
+    so other coroutines running on the event loop during the sampled request
+    show up in its profile as well.
+    """
+
+    def __init__(
+        self,
+        every_n: int,
+        output_dir: Optional[str] = None,
+        on_profile: Optional[Callable[[pstats.Stats, Dict[str, Any]], None]] = None,
+        top_n: int = 25,
+    ):
+        """Initialize the profiler.
+
+        Args:
+            every_n: Profile one request in N (0 disables profiling)
+            output_dir: Directory for ``.prof`` dumps (default: log a summary instead)
+            on_profile: Optional callback receiving the stats and request info
+            top_n: Number of functions in the logged summary
+        """
+        self.every_n = every_n
+        self.output_dir = output_dir
+        self.on_profile = on_profile
+        self.top_n = top_n
+        self._counter = itertools.count(1)
+        self._active = False
+        self._lock = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start profiling if this request is sampled.
+
+        Returns:
+            The running profile, or None if the request is not sampled
+        """
+        if self.every_n <= 0 or next(self._counter) % self.every_n:
+            return None
+        with self._lock:
+            if self._active:
+                return None
+            self._active = True
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already attached to the thread
+            self._active = False
+            return None
+        return profile
+
+    def finish(self, profile: Optional[cProfile.Profile], info: Optional[Dict[str, Any]] = None) -> None:
+        """Stop a profile returned by start() and report it."""
+        if profile is None:
+            return
+        profile.disable()
+        self._active = False
+        info = info or {}
+
+        stats = pstats.Stats(profile)
+        if self.on_profile is not None:
+            self.on_profile(stats, info)
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, f"request-{int(time.time() * 1000)}.prof")
+            stats.dump_stats(path)
+            logger.info(f"Wrote request profile to {path}")
+        elif self.on_profile is None:
+            buffer = io.StringIO()
+            stats.stream = buffer
+            stats.sort_stats("cumulative").print_stats(self.top_n)
+            logger.info(f"Request profile {info}:\n{buffer.getvalue()}")
+
+
+# Process-wide metrics shared by the app and the factory
+RUNTIME_METRICS = RuntimeMetrics()
@@ -0,0 +1,157 @@
+"""Response cache for model calls.
+
+Identical requests, such as regression suites, health probes, FAQ-style
+questions and retries, otherwise pay the full model latency every time. This
+module wraps a Strands model so that a request whose system prompt, tool
+specs, message history and inference parameters were seen before is answered
+by replaying the recorded response stream.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from .metrics import RUNTIME_METRICS, RuntimeMetrics
+from .tool_cache import ToolCachePolicy, ToolResultCache
+
+
+logger = logging.getLogger(__name__)
+
+# Only complete responses are replayed; guardrail interventions and failures are not cached
+CACHEABLE_STOP_REASONS = frozenset(("end_turn", "tool_use", "stop_sequence", "max_tokens"))
+
+
+def _json_default(value: Any) -> Any:
+    # Images and documents are keyed by a digest of their bytes rather than their content
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    return str(value)
+
+
+def model_cache_key(
+    config: Any,
+    messages: Messages,
+    tool_specs: Optional[List[ToolSpec]] = None,
+    system_prompt: Optional[str] = None,
+    **request: Any,
+) -> str:
+    """Build a stable cache key for a model request.
+
+    Args:
+        config: Model configuration, including the model ID and inference parameters
+        messages: Conversation history sent to the model
+        tool_specs: Tool specifications available to the model
+        system_prompt: System prompt
+        **request: Other request fields that change the response, e.g. tool_choice
+
+    Returns:
+        SHA-256 hex digest of the canonical JSON of the request
+    """
+    payload = {
+        "config": config,
+        "messages": messages,
+        "tool_specs": tool_specs,
+        "system_prompt": system_prompt,
+        **request,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CachedModel(Model):
+    """Model wrapper that replays cached response streams for repeated requests.
+
+    The recorded stream events are replayed in order, so agents, callback
+    handlers and the streaming entrypoint see the same events as for a live
+    response. Only responses that complete with a regular stop reason are
+    cached. Storage reuses the tool result store: an in-memory LRU with TTL
+    and an optional directory shared between processes.
+
+    Enable it only for deterministic prompts or where a repeated answer is
+    acceptable, since sampling parameters are part of the key but randomness
+    is not.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        policy: Optional[ToolCachePolicy] = None,
+        metrics: Optional[RuntimeMetrics] = None,
+    ):
+        """Wrap a model.
+
+        Args:
+            model: The model to cache, e.g. a LiteLLMModel
+            policy: Cache policy (ttl, max_entries, disk_dir); key_func and
+                cache_errors are not used
+            metrics: Runtime metrics to count hits and misses in (default: process-wide)
+        """
+        self.model = model
+        self.cache = ToolResultCache("model", policy or ToolCachePolicy(ttl=3600.0))
+        self.metrics = metrics or RUNTIME_METRICS
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Dict[str, Any], None]:
+        return self.model.structured_output(*args, **kwargs)
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: Optional[List[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        try:
+            key = model_cache_key(
+                self.model.get_config(),
+                messages,
+                tool_specs,
+                system_prompt,
+                tool_choice=kwargs.get("tool_choice"),
+                system_prompt_content=kwargs.get("system_prompt_content"),
+            )
+        except Exception as e:
+            logger.debug(f"Not caching model call, request has no cache key: {e}")
+            key = None
+
+        if key is not None:
+            if self.cache.policy.disk_dir:
+                cached = await asyncio.to_thread(self.cache.get, key)
+            else:
+                cached = self.cache.get(key)
+            self.metrics.model_cache_total.inc("hit" if cached is not None else "miss")
+            if cached is not None:
+                logger.debug("Replaying cached model response %s", key[:12])
+                for event in cached["events"]:
+                    yield event
+                return
+
+        events: List[StreamEvent] = []
+        stop_reason = None
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            if key is not None:
+                events.append(event)
+                if "messageStop" in event:
+                    stop_reason = event["messageStop"].get("stopReason")
+            yield event
+
+        if key is not None and stop_reason in CACHEABLE_STOP_REASONS:
+            try:
+                if self.cache.policy.disk_dir:
+                    await asyncio.to_thread(self.cache.put, key, {"events": events})
+                else:
+                    self.cache.put(key, {"events": events})
+            except Exception as e:
+                logger.debug(f"Could not cache model response: {e}")
@@ -0,0 +1,329 @@
+"""Hedged and fallback model requests with per-endpoint circuit breakers.
+
+A stalled upstream stream otherwise holds a request until the client gives
+up. This module spreads a model call over an ordered list of endpoints: when
+the preferred endpoint fails before its first token, the next one is tried,
+and when it produces no token within a deadline, a hedged request is started
+on the next endpoint and whichever answers first wins. Endpoints that keep
+failing are skipped for a while by a circuit breaker.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from .metrics import RUNTIME_METRICS, RuntimeMetrics
+
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and the
+    endpoint is skipped. Once ``reset_timeout`` seconds have passed, one trial
+    request is let through (half-open); its success closes the breaker, its
+    failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial request
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a request may be sent, reserving the trial slot when half-open."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful request and close the breaker."""
+        self.failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the breaker at the threshold."""
+        self.failures += 1
+        self._trial_running = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self._opened_at = self._clock()
+
+    def record_abandoned(self) -> None:
+        """Release the trial slot of a request that was cancelled without an outcome."""
+        self._trial_running = False
+
+
+class HedgedModel(Model):
+    """Model that routes each call over an ordered list of model endpoints.
+
+    The first endpoint with a closed (or half-open) circuit is called first.
+    If it fails before producing its first token, the next endpoint is called
+    right away. If it has not produced a token after ``hedge_after`` seconds,
+    the next endpoint is called in parallel and the first of the two to produce
+    a token wins; the other request is cancelled. Once a response is streaming
+    it is never switched, so an error after the first token is raised as is.
+
+    The first token is the first stream event after ``messageStart``. Models
+    that buffer tool calls until the end of the response produce it late, so
+    ``hedge_after`` should be above the usual time to first token.
+
+    Structured output calls are not hedged, but fail over and update the
+    circuit breakers and metrics the same way.
+    """
+
+    # Stream events buffered between the endpoint requests and the consumer
+    STREAM_BUFFER_SIZE = 64
+
+    def __init__(
+        self,
+        models: Sequence[Model],
+        hedge_after: Optional[float] = None,
+        names: Optional[Sequence[str]] = None,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        metrics: Optional[RuntimeMetrics] = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            models: Endpoints in order of preference
+            hedge_after: Seconds without a first token before a hedged request is
+                started (default: None, only fail over on errors)
+            names: Endpoint names for logs and metrics (default: their model IDs)
+            breaker_factory: Creates the circuit breaker of each endpoint
+            metrics: Runtime metrics to count attempts in (default: process-wide)
+        """
+        if not models:
+            raise ValueError("HedgedModel needs at least one model")
+        self.models = list(models)
+        self.hedge_after = hedge_after
+        self.names = list(names or (self._model_name(m, i) for i, m in enumerate(models)))
+        self.breakers = [breaker_factory() for _ in self.models]
+        self.metrics = metrics or RUNTIME_METRICS
+
+    @staticmethod
+    def _model_name(model: Model, index: int) -> str:
+        config = model.get_config()
+        if isinstance(config, dict) and config.get("model_id"):
+            return str(config["model_id"])
+        return f"model-{index}"
+
+    def update_config(self, **model_config: Any) -> None:
+        for model in self.models:
+            model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.models[0].get_config()
+
+    async def structured_output(
+        self,
+        output_model: Type[BaseModel],
+        prompt: Messages,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        # Not hedged; endpoints are tried in order until one answers
+        candidates = self._candidates()
+        error: Optional[BaseException] = None
+        try:
+            while candidates:
+                index = candidates.pop(0)
+                if error is not None:
+                    logger.info(f"Falling back to {self.names[index]} for structured output")
+                    self.metrics.model_requests_total.inc(self.names[index], "fallback")
+                produced = False
+                try:
+                    async for event in self.models[index].structured_output(
+                        output_model, prompt, system_prompt=system_prompt, **kwargs
+                    ):
+                        produced = True
+                        yield event
+                except Exception as e:
+                    self.breakers[index].record_failure()
+                    self.metrics.model_requests_total.inc(self.names[index], "error")
+                    if produced:
+                        raise
+                    logger.warning(f"Structured output request on {self.names[index]} failed: {e}")
+                    error = e
+                    continue
+                except BaseException:
+                    self.breakers[index].record_abandoned()
+                    self.metrics.model_requests_total.inc(self.names[index], "cancelled")
+                    raise
+                self.breakers[index].record_success()
+                self.metrics.model_requests_total.inc(self.names[index], "success")
+                return
+            raise error or RuntimeError("No model endpoint available")
+        finally:
+            # Half-open trial slots reserved by _candidates for endpoints never called
+            for index in candidates:
+                self.breakers[index].record_abandoned()
+
+    def stats(self) -> Dict[str, str]:
+        """Report the circuit state of every endpoint."""
+        return {name: breaker.state for name, breaker in zip(self.names, self.breakers)}
+
+    def _candidates(self) -> List[int]:
+        candidates = [index for index, breaker in enumerate(self.breakers) if breaker.allow()]
+        if not candidates:
+            # Every circuit is open; trying the preferred endpoint beats failing outright
+            logger.warning("All model endpoints have open circuits, trying the primary")
+            candidates = [0]
+        return candidates
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: Optional[List[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        loop = asyncio.get_running_loop()
+        # Bounded, so a fast endpoint waits for a slow consumer instead of buffering the response
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.STREAM_BUFFER_SIZE)
+        candidates = self._candidates()
+        # Half-open trial slots reserved by _candidates for endpoints never called
+        unused = list(candidates)
+        tasks: Dict[int, asyncio.Task] = {}
+        started: List[asyncio.Task] = []
+        heads: Dict[int, List[StreamEvent]] = {}
+        winner: Optional[int] = None
+        error: Optional[BaseException] = None
+
+        async def pump(index: int) -> None:
+            try:
+                async for event in self.models[index].stream(
+                    messages, tool_specs, system_prompt, **kwargs
+                ):
+                    await queue.put((index, event))
+            except Exception as e:
+                await queue.put((index, e))
+                return
+            await queue.put((index, _END))
+
+        def start_next() -> bool:
+            if not unused:
+                return False
+            index = unused.pop(0)
+            if started:
+                outcome = "hedge" if error is None else "fallback"
+                logger.info(f"Starting {outcome} model request on {self.names[index]}")
+                self.metrics.model_requests_total.inc(self.names[index], outcome)
+            heads[index] = []
+            tasks[index] = asyncio.ensure_future(pump(index))
+            started.append(tasks[index])
+            return True
+
+        def finish(index: int, outcome: str) -> None:
+            tasks.pop(index, None)
+            self.metrics.model_requests_total.inc(self.names[index], outcome)
+
+        start_next()
+        try:
+            # Race the running requests until one produces its first token
+            deadline = loop.time() + self.hedge_after if self.hedge_after is not None else None
+            while winner is None:
+                if not tasks:
+                    if not start_next():
+                        raise error or RuntimeError("No model endpoint available")
+                    if deadline is not None:
+                        deadline = loop.time() + self.hedge_after
+                timeout = None
+                if deadline is not None and unused:
+                    timeout = max(0.0, deadline - loop.time())
+                try:
+                    index, item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    start_next()
+                    deadline = loop.time() + self.hedge_after
+                    continue
+
+                if isinstance(item, BaseException):
+                    logger.warning(f"Model request on {self.names[index]} failed: {item}")
+                    self.breakers[index].record_failure()
+                    finish(index, "error")
+                    error = item
+                    continue
+                if item is not _END and "messageStart" in item:
+                    heads[index].append(item)
+                    continue
+                winner = index
+                heads[index].append(item)
+
+            for index in list(tasks):
+                if index != winner:
+                    tasks[index].cancel()
+                    self.breakers[index].record_abandoned()
+                    finish(index, "cancelled")
+
+            for event in heads[winner]:
+                if event is _END:
+                    break
+                yield event
+            item = heads[winner][-1]
+            while item is not _END:
+                index, item = await queue.get()
+                if index != winner:
+                    continue
+                if isinstance(item, BaseException):
+                    self.breakers[winner].record_failure()
+                    finish(winner, "error")
+                    raise item
+                if item is not _END:
+                    yield item
+
+            self.breakers[winner].record_success()
+            finish(winner, "success")
+        finally:
+            for index, task in list(tasks.items()):
+                task.cancel()
+                self.breakers[index].record_abandoned()
+            for index in unused:
+                self.breakers[index].record_abandoned()
+            await asyncio.gather(*started, return_exceptions=True)
@@ -0,0 +1,239 @@
+"""Warm agent pool for reusing agents across turns of the same session.
+
+This module provides a bounded, in-process pool of ready-to-use agents keyed by
+``(actor_id, session_id)``. Reusing a pooled agent skips rebuilding the agent and
+rehydrating its history from AgentCore Memory on every follow-up turn.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str]
+
+# Rough per-content-block overhead (dict, keys, role) added to the text size estimate
+_BLOCK_OVERHEAD_BYTES = 256
+
+
+def estimate_agent_size(agent: Any) -> int:
+    """Estimate the memory footprint of an agent from its conversation history.
+
+    The estimate walks the message content blocks and sums the length of their text
+    payloads plus a fixed per-block overhead. It is intentionally cheap and only meant
+    to enforce an approximate memory cap, not to measure exact usage.
+
+    Args:
+        agent: The agent whose footprint should be estimated
+
+    Returns:
+        Estimated size in bytes
+    """
+    size = 0
+    for message in getattr(agent, "messages", None) or []:
+        for block in message.get("content", []):
+            size += _BLOCK_OVERHEAD_BYTES
+            text = block.get("text")
+            if text:
+                size += len(text)
+                continue
+            tool_result = block.get("toolResult")
+            if tool_result:
+                for entry in tool_result.get("content", []):
+                    size += len(entry.get("text") or "")
+    return size
+
+
+@dataclass
+class _PoolEntry:
+    agent: Any
+    size: int
+    last_used: float
+
+
+class AgentPool:
+    """Bounded LRU pool of warm agents with idle-TTL and memory-footprint eviction.
+
+    :meth:`get` checks an agent out of the pool and :meth:`put` returns it once
+    its turn is over, so an agent is never handed to two turns at once.
+
+    Entries are evicted when the pool exceeds ``max_size`` (least recently used first),
+    when they have been idle for longer than ``idle_ttl`` seconds, or when the estimated
+    total footprint exceeds ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 128,
+        idle_ttl: Optional[float] = 900.0,
+        max_bytes: Optional[int] = None,
+        size_estimator: Callable[[Any], int] = estimate_agent_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the pool.
+
+        Args:
+            max_size: Maximum number of pooled agents
+            idle_ttl: Seconds an agent may stay unused before eviction (None disables)
+            max_bytes: Cap on the estimated total footprint of pooled agents (None disables)
+            size_estimator: Callable returning the estimated footprint of an agent
+            clock: Monotonic clock used for idle tracking
+        """
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._size_estimator = size_estimator
+        self._clock = clock
+
+        self._entries: "OrderedDict[PoolKey, _PoolEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, actor_id: str, session_id: str) -> Optional[Any]:
+        """Check out the warm agent of a session, if one is pooled.
+
+        The agent leaves the pool until it is returned with :meth:`put`.
+
+        Args:
+            actor_id: The actor ID for the session
+            session_id: The session ID
+
+        Returns:
+            The pooled agent or None on a miss
+        """
+        key = (actor_id, session_id)
+        with self._lock:
+            self._evict_expired_locked()
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._total_bytes -= entry.size
+            return entry.agent
+
+    def put(self, actor_id: str, session_id: str, agent: Any) -> None:
+        """Return a checked-out agent, or add or replace the pooled agent of a session.
+
+        The footprint is estimated here, since the history grows during a turn.
+
+        Args:
+            actor_id: The actor ID for the session
+            session_id: The session ID
+            agent: The agent to keep warm
+        """
+        if self.max_size <= 0:
+            return
+
+        key = (actor_id, session_id)
+        size = self._size_estimator(agent)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+
+            self._entries[key] = _PoolEntry(agent=agent, size=size, last_used=self._clock())
+            self._total_bytes += size
+            self._enforce_limits_locked(keep=key)
+
+    def discard(self, actor_id: str, session_id: str) -> bool:
+        """Remove a session's agent from the pool without counting an eviction.
+
+        Args:
+            actor_id: The actor ID for the session
+            session_id: The session ID
+
+        Returns:
+            True if an agent was removed, False otherwise
+        """
+        with self._lock:
+            entry = self._entries.pop((actor_id, session_id), None)
+            if entry is None:
+                return False
+            self._total_bytes -= entry.size
+            return True
+
+    def evict_expired(self) -> int:
+        """Evict all agents that exceeded the idle TTL.
+
+        Returns:
+            Number of evicted agents
+        """
+        with self._lock:
+            return self._evict_expired_locked()
+
+    def clear(self) -> None:
+        """Drop every pooled agent."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool counters and occupancy.
+
+        Returns:
+            Dictionary with size, estimated bytes, hits, misses, evictions and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: PoolKey) -> bool:
+        return key in self._entries
+
+    def _evict_expired_locked(self) -> int:
+        if self.idle_ttl is None:
+            return 0
+
+        deadline = self._clock() - self.idle_ttl
+        expired = [key for key, entry in self._entries.items() if entry.last_used < deadline]
+        for key in expired:
+            self._evict_locked(key, reason="idle")
+        return len(expired)
+
+    def _enforce_limits_locked(self, keep: Optional[PoolKey] = None) -> None:
+        # Least recently used entries sit at the front of the ordered dict
+        while len(self._entries) > self.max_size:
+            self._evict_locked(next(iter(self._entries)), reason="size")
+
+        if self.max_bytes is None:
+            return
+
+        while self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                if len(self._entries) == 1:
+                    # A single agent larger than the cap is not worth keeping warm
+                    self._evict_locked(key, reason="memory")
+                    return
+                self._entries.move_to_end(key)
+                continue
+            self._evict_locked(key, reason="memory")
+
+    def _evict_locked(self, key: PoolKey, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+        self.evictions += 1
+        logger.debug("Evicted pooled agent for session %s (%s)", key[1], reason)
@@ -0,0 +1,161 @@
+"""Per-session serialization of agent invocations.
+
+Two requests for the same session would otherwise load, run and persist the
+same conversation at the same time, interleaving its history and duplicating
+the memory reads. This module runs the turns of a session one at a time:
+later turns either wait for the running one or are rejected.
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBusy(Exception):
+    """Raised when a turn cannot run because its session is busy."""
+
+
+class _SessionSlot:
+    __slots__ = ("lock", "refs")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Running turn plus waiting turns; the slot is dropped when it reaches zero
+        self.refs = 0
+
+
+class SessionSerializer:
+    """Run the turns of each session one at a time.
+
+    With the "queue" policy, turns of a busy session wait in arrival order,
+    optionally for at most ``wait_timeout`` seconds and with at most
+    ``max_waiting`` waiting turns per session. With the "reject" policy, a turn
+    for a busy session fails immediately.
+
+    Sessions are told apart by actor and session ID, so two actors reusing a
+    session ID do not wait for each other. Lock state exists only while a
+    session has a running or waiting turn, so
+    memory does not grow with the number of sessions ever seen. All methods
+    must be called from the event loop thread.
+    """
+
+    POLICY_QUEUE = "queue"
+    POLICY_REJECT = "reject"
+
+    def __init__(
+        self,
+        policy: str = POLICY_QUEUE,
+        wait_timeout: Optional[float] = None,
+        max_waiting: Optional[int] = None,
+    ):
+        """Initialize the serializer.
+
+        Args:
+            policy: "queue" to wait for the running turn or "reject" to fail fast
+            wait_timeout: Maximum seconds a queued turn waits (default: no limit)
+            max_waiting: Maximum queued turns per session (default: no limit)
+        """
+        if policy not in (self.POLICY_QUEUE, self.POLICY_REJECT):
+            raise ValueError(f"Unknown session policy: {policy}")
+        self.policy = policy
+        self.wait_timeout = wait_timeout
+        self.max_waiting = max_waiting
+        self._slots: Dict[Tuple[str, str], _SessionSlot] = {}
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Report tracked sessions, waiting turns and rejections.
+
+        Returns:
+            Dictionary with sessions, waiting and rejected counts
+        """
+        waiting = sum(slot.refs - 1 for slot in self._slots.values() if slot.lock.locked())
+        return {"sessions": len(self._slots), "waiting": waiting, "rejected": self.rejected}
+
+    def is_busy(self, actor_id: str, session_id: str) -> bool:
+        """Whether a turn of the actor's session is running."""
+        slot = self._slots.get((actor_id, session_id))
+        return slot is not None and slot.lock.locked()
+
+    @contextlib.asynccontextmanager
+    async def hold(self, actor_id: str, session_id: str) -> AsyncIterator[None]:
+        """Hold the session for the duration of a turn.
+
+        Args:
+            actor_id: Actor the session belongs to
+            session_id: Session of the turn; empty IDs are not serialized
+
+        Raises:
+            SessionBusy: If the session is busy and the turn may not wait
+        """
+        await self.acquire(actor_id, session_id)
+        try:
+            yield
+        finally:
+            self.release(actor_id, session_id)
+
+    async def acquire(self, actor_id: str, session_id: str) -> None:
+        """Take the session, waiting for its running turn if the policy allows.
+
+        Every successful call must be paired with :meth:`release`.
+
+        Args:
+            actor_id: Actor the session belongs to
+            session_id: Session of the turn; empty IDs are not serialized
+
+        Raises:
+            SessionBusy: If the session is busy and the policy rejects, the
+                session has too many waiting turns, or the wait timed out
+        """
+        if not session_id:
+            return
+
+        key = (actor_id, session_id)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _SessionSlot()
+
+        if slot.lock.locked():
+            waiting = slot.refs - 1
+            if self.policy == self.POLICY_REJECT or (
+                self.max_waiting is not None and waiting >= self.max_waiting
+            ):
+                self.rejected += 1
+                raise SessionBusy(f"Session {session_id} is busy with another request")
+
+        slot.refs += 1
+        try:
+            async with asyncio.timeout(self.wait_timeout):
+                await slot.lock.acquire()
+        except TimeoutError:
+            self._unref(key, slot)
+            self.rejected += 1
+            raise SessionBusy(
+                f"Session {session_id} is still busy after {self.wait_timeout}s"
+            ) from None
+        except BaseException:
+            self._unref(key, slot)
+            raise
+
+    def release(self, actor_id: str, session_id: str) -> None:
+        """Let the next turn of the session run.
+
+        Args:
+            actor_id: Actor passed to :meth:`acquire`
+            session_id: Session passed to :meth:`acquire`
+        """
+        if not session_id:
+            return
+        key = (actor_id, session_id)
+        slot = self._slots[key]
+        slot.lock.release()
+        self._unref(key, slot)
+
+    def _unref(self, key: Tuple[str, str], slot: _SessionSlot) -> None:
+        slot.refs -= 1
+        if slot.refs == 0:
+            del self._slots[key]
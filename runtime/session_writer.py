@@ -0,0 +1,399 @@
+"""Write-behind persistence for agent sessions.
+
+Strands persists every new message and the agent state from synchronous hooks
+inside the agent loop, so each memory-store round trip adds directly to the
+response time. This module moves those writes to background workers: hooks
+only enqueue the write, and the workers apply it in order per session,
+collapsing redundant agent-state writes when they fall behind.
+"""
+
+import asyncio
+import copy
+import functools
+import logging
+import os
+import threading
+import time
+import weakref
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+from strands.hooks import HookRegistry, MessageAddedEvent
+from strands.types.content import Message
+from strands.types.exceptions import SessionException
+from strands.types.session import SessionAgent, SessionMessage
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Write:
+    session_id: str
+    kind: str
+    func: Callable[..., Any]
+    args: tuple
+
+
+def _start_in_child(ref: "weakref.ref[SessionWriteQueue]") -> None:
+    write_queue = ref()
+    if write_queue is not None:
+        write_queue._start()
+
+
+class SessionWriteQueue:
+    """Bounded background queue that applies session writes in order per session.
+
+    Writes are spread over ``workers`` lanes by session ID. Every lane has one
+    thread and one FIFO queue, so the writes of a session are applied in the
+    order they were submitted while different sessions are written in parallel.
+    A worker takes up to ``batch_size`` queued writes at a time; within a batch
+    only the latest agent-state write of each session is applied, since each
+    one replaces the previous state.
+
+    When a lane is full, :meth:`submit` keeps the session's writes in an
+    overflow list instead of blocking, and :meth:`wait_for_room` moves them
+    into the lane from a worker thread. Agents await it after every message,
+    which pushes back on the agents producing writes instead of dropping them
+    or blocking the event loop. A write that
+    still fails after its retries is dropped, and its session is reported by
+    :meth:`has_failed` until :meth:`clear_failed` is called.
+    """
+
+    KIND_MESSAGE = "message"
+    KIND_AGENT = "agent"
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        batch_size: int = 32,
+        max_retries: int = 2,
+        retry_backoff: float = 0.2,
+    ):
+        """Initialize and start the queue.
+
+        Args:
+            workers: Number of writer threads (lanes)
+            max_queue_size: Maximum queued writes per lane
+            batch_size: Maximum writes a worker takes from its lane at once
+            max_retries: Retries for a failed write before it is dropped
+            retry_backoff: First retry delay in seconds, doubled per retry
+        """
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._workers = max(1, workers)
+        self._max_queue_size = max_queue_size
+        self._closed = False
+
+        # Updated by the lane workers under _pending_cond
+        self.written = 0
+        self.collapsed = 0
+        self.failed = 0
+
+        self._start()
+        # Threads do not survive fork; a forked worker process starts its own
+        os.register_at_fork(after_in_child=functools.partial(_start_in_child, weakref.ref(self)))
+
+    def _start(self) -> None:
+        """Create the lanes and start their worker threads."""
+        self._lanes: List[Queue] = [
+            Queue(maxsize=self._max_queue_size) for _ in range(self._workers)
+        ]
+        self._pending: Dict[str, int] = {}
+        self._failed: Set[str] = set()
+        # Writes of a session that did not fit its lane, in submission order
+        self._overflow: Dict[str, Deque[_Write]] = {}
+        self._pending_cond = threading.Condition()
+        self._lane_locks = [threading.Lock() for _ in self._lanes]
+        self._threads: List[threading.Thread] = []
+        if self._closed:
+            return
+        self._threads = [
+            threading.Thread(target=self._worker, args=(lane,), name=f"session-writer-{index}", daemon=True)
+            for index, lane in enumerate(self._lanes)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def depth(self) -> int:
+        """Number of writes submitted but not yet applied."""
+        with self._pending_cond:
+            return sum(self._pending.values())
+
+    def _lane_index(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode("utf-8")) % len(self._lanes)
+
+    def submit(self, session_id: str, kind: str, func: Callable[..., Any], *args: Any) -> None:
+        """Queue a write for a session without blocking.
+
+        A write that does not fit the session's lane, or that follows one that
+        did not, waits in the session's overflow list for :meth:`wait_for_room`
+        or :meth:`flush`. Falls back to writing synchronously once the queue is
+        closed.
+
+        Args:
+            session_id: Session the write belongs to
+            kind: KIND_MESSAGE or KIND_AGENT
+            func: Callable performing the write
+            *args: Arguments for func
+        """
+        if self._closed:
+            func(*args)
+            return
+
+        lane = self._lanes[self._lane_index(session_id)]
+        write = _Write(session_id, kind, func, args)
+        with self._pending_cond:
+            self._pending[session_id] = self._pending.get(session_id, 0) + 1
+            # A session's writes must not overtake the ones still waiting for room
+            overflow = self._overflow.get(session_id)
+            if overflow is None:
+                try:
+                    lane.put_nowait(write)
+                    return
+                except Full:
+                    logger.warning(f"Session write queue is full, holding writes of {session_id}")
+                    overflow = self._overflow[session_id] = deque()
+            overflow.append(write)
+
+    async def wait_for_room(self, session_id: str) -> None:
+        """Wait, off the event loop, until the overflowed writes of a session are queued.
+
+        Args:
+            session_id: Session whose writes to move into its lane
+        """
+        with self._pending_cond:
+            if session_id not in self._overflow:
+                return
+        await asyncio.to_thread(self._drain_overflow, session_id)
+
+    def _drain_overflow(self, session_id: str) -> None:
+        """Move a session's overflowed writes into its lane, blocking while the lane is full."""
+        index = self._lane_index(session_id)
+        # One drainer per lane, so writes of a session enter the lane in order
+        with self._lane_locks[index]:
+            while True:
+                with self._pending_cond:
+                    overflow = self._overflow.get(session_id)
+                    if not overflow:
+                        self._overflow.pop(session_id, None)
+                        return
+                    write = overflow[0]
+                # Removed only once queued, so new writes keep going to the overflow meanwhile
+                self._lanes[index].put(write)
+                with self._pending_cond:
+                    overflow.popleft()
+
+    def flush(self, session_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Wait until queued writes are applied.
+
+        Args:
+            session_id: Only wait for this session's writes (default: all sessions)
+            timeout: Maximum seconds to wait (default: no limit)
+
+        Returns:
+            True if every awaited write was applied, False on timeout
+        """
+        def _done() -> bool:
+            if session_id is None:
+                return not self._pending
+            return session_id not in self._pending
+
+        with self._pending_cond:
+            overflowed = list(self._overflow) if session_id is None else [session_id]
+        for overflowed_id in overflowed:
+            self._drain_overflow(overflowed_id)
+        with self._pending_cond:
+            return self._pending_cond.wait_for(_done, timeout)
+
+    def has_pending(self, session_id: str) -> bool:
+        """Whether a session has writes that are not applied yet."""
+        with self._pending_cond:
+            return session_id in self._pending
+
+    def has_failed(self, session_id: str) -> bool:
+        """Whether a write of a session was dropped after failing its retries."""
+        with self._pending_cond:
+            return session_id in self._failed
+
+    def clear_failed(self, session_id: str) -> None:
+        """Forget the dropped writes of a session, e.g. once it was reloaded from the store."""
+        with self._pending_cond:
+            self._failed.discard(session_id)
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """Flush queued writes and stop the workers.
+
+        Writes submitted after closing are applied synchronously.
+
+        Args:
+            timeout: Maximum seconds to wait for the flush
+
+        Returns:
+            True if every queued write was applied
+        """
+        flushed = self.flush(timeout=timeout)
+        if not flushed:
+            logger.error(f"Session write queue closed with {self.depth} unwritten writes")
+        self._closed = True
+        for lane in self._lanes:
+            lane.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        return flushed
+
+    def stats(self) -> Dict[str, int]:
+        """Report queue depth and write counters.
+
+        Returns:
+            Dictionary with depth, written, collapsed and failed counts
+        """
+        with self._pending_cond:
+            return {
+                "depth": sum(self._pending.values()),
+                "written": self.written,
+                "collapsed": self.collapsed,
+                "failed": self.failed,
+            }
+
+    def _worker(self, lane: Queue) -> None:
+        while True:
+            first = lane.get()
+            if first is None:
+                return
+
+            batch: Deque[_Write] = deque([first])
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    write = lane.get_nowait()
+                except Empty:
+                    break
+                if write is None:
+                    stop = True
+                    break
+                batch.append(write)
+
+            # Only the newest agent state of each session needs to be written
+            latest_agent: Dict[str, _Write] = {}
+            for write in batch:
+                if write.kind == self.KIND_AGENT:
+                    latest_agent[write.session_id] = write
+
+            for write in batch:
+                if write.kind == self.KIND_AGENT and latest_agent[write.session_id] is not write:
+                    with self._pending_cond:
+                        self.collapsed += 1
+                else:
+                    self._apply(write)
+                self._finish(write.session_id)
+
+            if stop:
+                return
+
+    def _apply(self, write: _Write) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                write.func(*write.args)
+                with self._pending_cond:
+                    self.written += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    with self._pending_cond:
+                        self.failed += 1
+                        self._failed.add(write.session_id)
+                    logger.error(f"Dropping {write.kind} write for session {write.session_id}: {e}")
+                    return
+                time.sleep(self.retry_backoff * 2**attempt)
+
+    def _finish(self, session_id: str) -> None:
+        with self._pending_cond:
+            remaining = self._pending[session_id] - 1
+            if remaining:
+                self._pending[session_id] = remaining
+            else:
+                del self._pending[session_id]
+                self._pending_cond.notify_all()
+
+
+class WriteBehindSessionMixin:
+    """Session manager mixin that persists messages and agent state in the background.
+
+    Combine it with a ``RepositorySessionManager`` subclass. Messages and agent
+    snapshots are taken when the hook fires and written by a shared
+    :class:`SessionWriteQueue`; reads and session setup stay synchronous.
+    Each message is still one write; only agent-state writes are collapsed.
+    Redacting a message is queued behind the write of that message. After every
+    message the agent waits until its session's writes fit the queue.
+    """
+
+    def __init__(self, *args: Any, write_queue: SessionWriteQueue, **kwargs: Any):
+        self.write_queue = write_queue
+        super().__init__(*args, **kwargs)
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        # Registered after the write hooks, so it runs once the message's writes are submitted
+        registry.add_callback(MessageAddedEvent, self._wait_for_write_queue)
+
+    async def _wait_for_write_queue(self, event: MessageAddedEvent) -> None:
+        await self.write_queue.wait_for_room(self.session_id)
+
+    def append_message(self, message: Message, agent: Any, **kwargs: Any) -> None:
+        # Snapshot now, and track it as the latest message before it is written
+        latest = self._latest_agent_message.get(agent.agent_id)
+        next_index = latest.message_id + 1 if latest and isinstance(latest.message_id, int) else 0
+        session_message = SessionMessage.from_message(copy.deepcopy(message), next_index)
+        self._latest_agent_message[agent.agent_id] = session_message
+        self.write_queue.submit(
+            self.session_id,
+            SessionWriteQueue.KIND_MESSAGE,
+            self._create_message,
+            agent.agent_id,
+            session_message,
+        )
+
+    def _create_message(self, agent_id: str, session_message: SessionMessage) -> None:
+        created = self.session_repository.create_message(self.session_id, agent_id, session_message)
+        # AgentCore Memory identifies messages by the ID of the event it created
+        if isinstance(created, dict) and created.get("eventId"):
+            session_message.message_id = created["eventId"]
+
+    def sync_agent(self, agent: Any, **kwargs: Any) -> None:
+        # Snapshot now, the agent keeps changing while the write waits in the queue
+        session_agent = SessionAgent.from_agent(agent)
+        self.write_queue.submit(
+            self.session_id,
+            SessionWriteQueue.KIND_AGENT,
+            self.session_repository.update_agent,
+            self.session_id,
+            session_agent,
+        )
+
+    def redact_latest_message(self, redact_message: Message, agent: Any, **kwargs: Any) -> None:
+        # Strands calls this from the event loop; the lane applies it after the message is created
+        latest = self._latest_agent_message.get(agent.agent_id)
+        if latest is None:
+            raise SessionException("No message to redact.")
+        latest.redact_message = copy.deepcopy(redact_message)
+        self.write_queue.submit(
+            self.session_id,
+            SessionWriteQueue.KIND_MESSAGE,
+            self.session_repository.update_message,
+            self.session_id,
+            agent.agent_id,
+            latest,
+        )
+
+
+class WriteBehindMemorySessionManager(WriteBehindSessionMixin, AgentCoreMemorySessionManager):
+    """AgentCore Memory session manager with write-behind message persistence."""
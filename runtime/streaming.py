@@ -0,0 +1,145 @@
+"""Coalescing of streamed text chunks.
+
+Models stream text a few characters at a time, and every ``data`` event the
+entrypoint yields becomes its own SSE frame with its own serialization and
+socket write. This module batches consecutive text chunks into larger ones,
+trading a bounded amount of latency for far fewer frames under load.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List
+
+
+logger = logging.getLogger(__name__)
+
+# Events that mark a tool boundary or the end of a turn; buffered text is sent before them
+FLUSH_EVENT_KEYS = frozenset(
+    ("current_tool_use", "tool_stream_event", "message", "stop", "result", "force_stop")
+)
+
+_END = object()
+
+
+class StreamCoalescer:
+    """Batch ``data`` events of an agent stream by size and deadline.
+
+    Text chunks are buffered until ``max_bytes`` UTF-8 bytes are collected or the
+    oldest buffered chunk has waited ``max_delay`` seconds, whichever comes first.
+    Buffered text is flushed immediately before tool boundaries and the end of
+    the turn, so text is never reordered relative to messages and results. The
+    first chunk is sent right away by default to keep time to first token low.
+
+    The agent stream is consumed by a single producer task, so the deadline can
+    fire while the model is silent without running the agent's generator across
+    different tasks.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 1024,
+        max_delay: float = 0.05,
+        flush_first: bool = True,
+        queue_size: int = 256,
+    ):
+        """Initialize the coalescer.
+
+        Args:
+            max_bytes: Flush once this many bytes of text are buffered
+            max_delay: Maximum seconds a chunk may wait in the buffer
+            flush_first: Send the first chunk of a stream without buffering
+            queue_size: Events read ahead from the agent stream before it is paused
+        """
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.flush_first = flush_first
+        self.queue_size = queue_size
+
+    async def coalesce(self, events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the events of a stream with consecutive text chunks merged.
+
+        Merged chunks are yielded as ``{"data": text}``. Other events pass through
+        unchanged and in order relative to the text around them, except that
+        events which are not boundaries may overtake text still in the buffer.
+
+        Args:
+            events: Agent stream events, e.g. from ``Agent.stream_async``
+
+        Yields:
+            Stream events with coalesced ``data`` events
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.ensure_future(self._produce(events, queue))
+
+        buffer: List[str] = []
+        buffered_bytes = 0
+        deadline = 0.0
+        first = self.flush_first
+
+        try:
+            while True:
+                if buffer:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        yield {"data": "".join(buffer)}
+                        buffer.clear()
+                        buffered_bytes = 0
+                        continue
+                else:
+                    item = await queue.get()
+
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    # Send the text produced before the failure, then surface the error
+                    if buffer:
+                        yield {"data": "".join(buffer)}
+                    raise item
+
+                text = item.get("data")
+                if isinstance(text, str):
+                    if first:
+                        first = False
+                        yield {"data": text}
+                        continue
+                    if not buffer:
+                        deadline = loop.time() + self.max_delay
+                    buffer.append(text)
+                    buffered_bytes += len(text) if text.isascii() else len(text.encode("utf-8"))
+                    if buffered_bytes >= self.max_bytes:
+                        yield {"data": "".join(buffer)}
+                        buffer.clear()
+                        buffered_bytes = 0
+                    continue
+
+                if buffer and not FLUSH_EVENT_KEYS.isdisjoint(item):
+                    yield {"data": "".join(buffer)}
+                    buffer.clear()
+                    buffered_bytes = 0
+                yield item
+
+            if buffer:
+                yield {"data": "".join(buffer)}
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    # Expected from the producer; a cancellation of this task must propagate
+                    if not producer.cancelled():
+                        raise
+                except Exception as e:
+                    logger.debug(f"Agent stream failed while closing: {e}")
+
+    @staticmethod
+    async def _produce(events: AsyncIterator[Dict[str, Any]], queue: asyncio.Queue) -> None:
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_END)
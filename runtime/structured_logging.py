@@ -0,0 +1,285 @@
+"""Non-blocking, sampled and structured logging for the runtime.
+
+Request handlers should not pay for writing logs. This module routes log
+records through a bounded in-memory queue to a single background listener
+thread that formats and writes them, optionally as one JSON object per line.
+Large values are logged through size-capped previews that are only rendered
+for records that are kept, and chatty loggers can be sampled per logger name.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import reprlib
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+DEFAULT_PREVIEW_CHARS = 512
+
+_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_state_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_preview_chars = DEFAULT_PREVIEW_CHARS
+
+
+class _Preview:
+    """Lazily rendered, size-capped representation of a value."""
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        limit = self.max_chars
+        # reprlib bounds nested containers and strings, so huge payloads are never fully serialized
+        shortener = reprlib.Repr()
+        shortener.maxstring = limit
+        shortener.maxother = limit
+        shortener.maxlevel = 4
+        shortener.maxdict = shortener.maxlist = shortener.maxtuple = 20
+        text = shortener.repr(self.value)
+        if len(text) > limit:
+            text = f"{text[:limit]}...<truncated>"
+        return text
+
+    __repr__ = __str__
+
+
+def preview(value: Any, max_chars: Optional[int] = None) -> _Preview:
+    """Wrap a value so it is logged as a size-capped preview.
+
+    Nothing is rendered when the record is filtered out or sampled away; kept
+    records render it on the logging thread, when the message is merged with
+    its arguments before being queued.
+
+    Args:
+        value: Value to log, e.g. a request payload or an agent result
+        max_chars: Preview length cap (default: the configured preview size)
+
+    Returns:
+        An object whose ``str()`` is the capped preview
+    """
+    return _Preview(value, max_chars or _preview_chars)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records of selected loggers.
+
+    Rates are matched on the longest logger-name prefix, so ``{"strands": 0.1}``
+    also samples ``strands.event_loop``. Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, always_keep_level: int = logging.WARNING):
+        """Initialize the filter.
+
+        Args:
+            rates: Mapping of logger name to the fraction of records to keep (0.0-1.0)
+            always_keep_level: Records at or above this level are never sampled away
+        """
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.always_keep_level = always_keep_level
+        self._resolved: Dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.always_keep_level:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks on the calling thread.
+
+    Like the stdlib handler, the message is merged with its arguments before
+    the record is queued, so arguments mutated after the call (agent state,
+    message lists) are logged as they were. Formatting the line and writing it
+    are left to the listener thread. Request-scoped identifiers are captured
+    at enqueue time because context variables are not visible to the
+    listener. Records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Imported here so configuring logging does not load the AgentCore SDK
+        from bedrock_agentcore.runtime.context import BedrockAgentCoreContext
+
+        # Only kept records get here, so lazy previews are still skipped for filtered ones
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = BedrockAgentCoreContext.get_request_id()
+        record.session_id = BedrockAgentCoreContext.get_session_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["requestId"] = request_id
+        session_id = getattr(record, "session_id", None)
+        if session_id:
+            entry["sessionId"] = session_id
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in ("request_id", "session_id"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["errorType"] = record.exc_info[0].__name__
+            entry["errorMessage"] = str(record.exc_info[1])
+            entry["stackTrace"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(
+    level: int | str = logging.INFO,
+    structured: bool = False,
+    sample_rates: Optional[Dict[str, float]] = None,
+    preview_chars: int = DEFAULT_PREVIEW_CHARS,
+    queue_size: int = 10000,
+    stream: Optional[TextIO] = None,
+) -> logging.handlers.QueueListener:
+    """Route root logging through a bounded queue to a background writer.
+
+    Calling this again replaces the previous configuration.
+
+    Args:
+        level: Root log level
+        structured: Write JSON lines instead of plain text
+        sample_rates: Per-logger fraction of records to keep below WARNING
+        preview_chars: Default size cap for :func:`preview`
+        queue_size: Maximum queued records before new ones are dropped
+        stream: Output stream (default: stderr)
+
+    Returns:
+        The running queue listener
+    """
+    global _listener, _queue_handler, _preview_chars
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(StructuredFormatter() if structured else logging.Formatter(_FORMAT))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    with _state_lock:
+        old_handler, old_listener = _queue_handler, _listener
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            if existing is old_handler or not isinstance(existing, logging.handlers.QueueHandler):
+                root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        _queue_handler = handler
+        _preview_chars = preview_chars
+
+    if old_listener is not None:
+        old_listener.stop()
+    return _listener
+
+
+def route_to_queue(*names: str) -> List[logging.Logger]:
+    """Send loggers that install their own handlers through the log queue.
+
+    Some libraries attach a synchronous stream handler to their logger. This
+    replaces those handlers with the queue handler. It does nothing when
+    :func:`configure_logging` has not been called.
+
+    Args:
+        *names: Logger names
+
+    Returns:
+        The rerouted loggers
+    """
+    loggers = []
+    if _queue_handler is None:
+        return loggers
+    for name in names:
+        target = logging.getLogger(name)
+        target.handlers = [_queue_handler]
+        target.propagate = False
+        loggers.append(target)
+    return loggers
+
+
+def flush_logging() -> None:
+    """Write every queued record and stop the listener thread."""
+    global _listener
+    with _state_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def _restart_in_child() -> None:
+    """Give a forked process its own log queue and listener thread.
+
+    The listener thread of the parent does not exist in the child, so records
+    would pile up in the inherited queue unwritten.
+    """
+    global _state_lock, _listener
+    _state_lock = threading.Lock()
+    if _listener is None or _queue_handler is None:
+        return
+    _queue_handler.queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,342 @@
+"""Asynchronous, batched telemetry export.
+
+Trace delivery should never compete with the request it describes. This
+module records model calls as small in-memory records and exports them in
+batches from a background task: recording only appends to a bounded queue,
+and a slow or unreachable telemetry backend only makes the queue drop its
+oldest records, never delays a response.
+"""
+
+import asyncio
+import base64
+import collections
+import datetime
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from bedrock_agentcore.runtime.context import BedrockAgentCoreContext
+
+
+logger = logging.getLogger(__name__)
+
+TelemetryRecord = Dict[str, Any]
+Sender = Callable[[List[TelemetryRecord]], Awaitable[None]]
+
+
+class TelemetryExporter:
+    """Bounded queue of telemetry records exported in batches by a background task.
+
+    :meth:`submit` never blocks and may be called from any thread. When the
+    queue is full the oldest record is dropped. The export task sends a batch
+    as soon as ``batch_size`` records are queued, or every ``flush_interval``
+    seconds otherwise; one batch is in flight at a time and each send is
+    bounded by ``send_timeout``. A failed batch is counted and dropped, not
+    retried, so a backend outage cannot build up a backlog.
+
+    The task is started by :meth:`start`, or by the first :meth:`submit` made
+    from a running event loop.
+    """
+
+    def __init__(
+        self,
+        send: Sender,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        send_timeout: float = 10.0,
+    ):
+        """Initialize the exporter.
+
+        Args:
+            send: Async function delivering a batch of records to the backend
+            max_queue_size: Maximum queued records before the oldest are dropped
+            batch_size: Maximum records per batch, and the queue size that
+                triggers an export before the interval
+            flush_interval: Maximum seconds a record waits before it is exported
+            send_timeout: Maximum seconds a batch send may take
+        """
+        self.send = send
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.send_timeout = send_timeout
+
+        self._queue: Deque[TelemetryRecord] = collections.deque(maxlen=max(1, max_queue_size))
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.submitted = 0
+        self.dropped = 0
+        self.exported = 0
+        self.failed = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Report queue depth and record counters.
+
+        Returns:
+            Dictionary with depth, submitted, dropped, exported and failed counts
+        """
+        return {
+            "depth": len(self._queue),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "exported": self.exported,
+            "failed": self.failed,
+        }
+
+    def submit(self, record: TelemetryRecord) -> None:
+        """Queue a record for export, dropping the oldest record if the queue is full.
+
+        Args:
+            record: JSON-serializable record
+        """
+        if self._closed:
+            self.dropped += 1
+            return
+        with self._lock:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(record)
+            self.submitted += 1
+            ready = len(self._queue) >= self.batch_size
+
+        if self._task is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self.start()
+        elif ready:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # The loop is closed; the records are exported by close() or not at all
+                pass
+
+    def start(self) -> None:
+        """Start the export task on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run(), name="telemetry-export")
+
+    async def flush(self) -> None:
+        """Export every queued record now."""
+        while self._queue:
+            await self._export_batch()
+
+    async def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """Stop accepting records and export the queued ones.
+
+        Args:
+            timeout: Maximum seconds to spend exporting the queue
+
+        Returns:
+            True if every queued record was exported
+        """
+        self._closed = True
+        try:
+            async with asyncio.timeout(timeout):
+                if self._task is not None:
+                    # The task exports what is left and exits
+                    self._loop.call_soon_threadsafe(self._wakeup.set)
+                    await asyncio.shield(self._task)
+                else:
+                    await self.flush()
+        except TimeoutError:
+            logger.warning(f"Telemetry flush timed out with {len(self._queue)} records left")
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+                self._task = None
+            closer = getattr(self.send, "aclose", None)
+            if closer is not None:
+                await closer()
+        if self._queue:
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            return False
+        return True
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def _export_batch(self) -> None:
+        with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        if not batch:
+            return
+        try:
+            await asyncio.wait_for(self.send(batch), self.send_timeout)
+            self.exported += len(batch)
+        except asyncio.CancelledError:
+            self.failed += len(batch)
+            raise
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning("Telemetry export of %d records failed: %s", len(batch), e)
+
+
+class LangfuseSender:
+    """Send telemetry records to the Langfuse ingestion API.
+
+    Every model call record becomes a trace, grouped by session, with one
+    generation. The request body is serialized in a worker thread, since
+    prompts and responses can be large.
+    """
+
+    def __init__(self, host: str, public_key: str, secret_key: str, timeout: float = 10.0):
+        """Initialize the sender.
+
+        Args:
+            host: Langfuse base URL
+            public_key: Langfuse public key
+            secret_key: Langfuse secret key
+            timeout: HTTP timeout in seconds
+        """
+        self.url = host.rstrip("/") + "/api/public/ingestion"
+        credentials = base64.b64encode(f"{public_key}:{secret_key}".encode()).decode()
+        self.headers = {"Authorization": f"Basic {credentials}", "Content-Type": "application/json"}
+        self.timeout = timeout
+        self._client = None
+
+    async def __call__(self, records: List[TelemetryRecord]) -> None:
+        import httpx
+
+        if self._client is None:
+            # Building the client loads the TLS trust store, which blocks for a while
+            self._client = await asyncio.to_thread(httpx.AsyncClient, timeout=self.timeout)
+        events = [event for record in records for event in self._events(record)]
+        body = await asyncio.to_thread(json.dumps, {"batch": events}, default=str)
+        response = await self._client.post(self.url, content=body, headers=self.headers)
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _events(record: TelemetryRecord) -> List[Dict[str, Any]]:
+        timestamp = record.get("start_time") or _now()
+        trace_id = record.get("trace_id") or record["id"]
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "timestamp": timestamp,
+                "type": "trace-create",
+                "body": {
+                    "id": trace_id,
+                    "name": record.get("name"),
+                    "sessionId": record.get("session_id"),
+                    "timestamp": timestamp,
+                    "metadata": {"request_id": record.get("request_id")},
+                },
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "timestamp": timestamp,
+                "type": "generation-create",
+                "body": {
+                    "id": record["id"],
+                    "traceId": trace_id,
+                    "name": record.get("name"),
+                    "model": record.get("model"),
+                    "startTime": record.get("start_time"),
+                    "endTime": record.get("end_time"),
+                    "completionStartTime": record.get("first_token_time"),
+                    "input": record.get("input"),
+                    "output": record.get("output"),
+                    "usage": record.get("usage"),
+                    "level": "ERROR" if record.get("status") == "error" else "DEFAULT",
+                    "statusMessage": record.get("error"),
+                },
+            },
+        ]
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _isoformat(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = datetime.datetime.fromtimestamp(value, datetime.timezone.utc)
+    return value.isoformat() if isinstance(value, datetime.datetime) else str(value)
+
+
+def litellm_logger(exporter: TelemetryExporter) -> Any:
+    """Build a litellm callback that records every model call into an exporter.
+
+    Register it with ``litellm.callbacks.append(...)``. The callback only
+    builds a record from litellm's standard logging payload and queues it.
+
+    Args:
+        exporter: Exporter receiving the records
+
+    Returns:
+        The litellm callback
+    """
+    from litellm.integrations.custom_logger import CustomLogger
+
+    class TelemetryLogger(CustomLogger):
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, "success")
+
+        def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, "error")
+
+        async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, "success")
+
+        async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, "error")
+
+        @staticmethod
+        def _record(kwargs: Dict[str, Any], status: str) -> None:
+            try:
+                payload = kwargs.get("standard_logging_object") or {}
+                exporter.submit(
+                    {
+                        "id": payload.get("id") or str(uuid.uuid4()),
+                        "name": payload.get("call_type") or "completion",
+                        "model": payload.get("model"),
+                        "start_time": _isoformat(payload.get("startTime")),
+                        "end_time": _isoformat(payload.get("endTime")),
+                        "first_token_time": _isoformat(payload.get("completionStartTime")),
+                        "input": payload.get("messages"),
+                        "output": payload.get("response"),
+                        "usage": {
+                            "input": payload.get("prompt_tokens"),
+                            "output": payload.get("completion_tokens"),
+                            "total": payload.get("total_tokens"),
+                        },
+                        "status": status,
+                        "error": payload.get("error_str"),
+                        "session_id": BedrockAgentCoreContext.get_session_id(),
+                        "request_id": BedrockAgentCoreContext.get_request_id(),
+                        "recorded_at": time.time(),
+                    }
+                )
+            except Exception as e:
+                logger.debug(f"Could not record model call telemetry: {e}")
+
+    return TelemetryLogger()
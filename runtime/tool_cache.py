@@ -0,0 +1,280 @@
+"""Memoizing result cache for pure and idempotent tools.
+
+Tools such as calculators or read-only lookups return the same result for the
+same arguments, yet every session calls them again, often over a network round
+trip to an MCP server. This module wraps such tools so that repeated calls are
+answered from an in-process LRU cache, optionally backed by a directory that
+several processes share.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolResult, ToolSpec, ToolUse
+
+from .metrics import RUNTIME_METRICS, RuntimeMetrics
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_key(tool_input: Any) -> str:
+    """Build a cache key from tool arguments as canonical JSON.
+
+    Args:
+        tool_input: Tool arguments
+
+    Returns:
+        Key string equal for equal arguments regardless of key order
+    """
+    return json.dumps(tool_input, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@dataclass
+class ToolCachePolicy:
+    """How results of a tool are cached.
+
+    Attributes:
+        ttl: Seconds a result stays valid (None keeps results until evicted)
+        max_entries: Maximum results kept in memory per tool (least recently used evicted)
+        key_func: Builds the cache key string from the tool arguments
+            (default: canonical JSON of the arguments)
+        disk_dir: Optional directory shared between processes for cached results
+        cache_errors: Also cache results with an error status
+    """
+
+    ttl: Optional[float] = 300.0
+    max_entries: int = 1024
+    key_func: Optional[Callable[[Dict[str, Any]], str]] = None
+    disk_dir: Optional[str] = None
+    cache_errors: bool = False
+
+
+class ToolResultCache:
+    """LRU + TTL store of one tool's results, with optional on-disk storage.
+
+    Disk entries are written atomically and expire by wall-clock time, so
+    processes sharing ``disk_dir`` can reuse each other's results.
+    """
+
+    def __init__(
+        self,
+        tool_name: str,
+        policy: ToolCachePolicy,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            tool_name: Name of the cached tool
+            policy: Cache policy
+            clock: Wall-clock time source
+        """
+        self.tool_name = tool_name
+        self.policy = policy
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Optional[float], ToolResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, tool_input: Dict[str, Any]) -> str:
+        """Build the cache key for tool arguments."""
+        return (self.policy.key_func or default_cache_key)(tool_input)
+
+    def get(self, key: str) -> Optional[ToolResult]:
+        """Look up a cached result and count the hit or miss.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            A copy of the cached result, or None
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(result)
+                del self._entries[key]
+
+        result = self._load(key, now)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, result[0], result[1])
+        return copy.deepcopy(result[1])
+
+    def put(self, key: str, result: ToolResult) -> None:
+        """Cache a tool result.
+
+        Args:
+            key: Cache key
+            result: Result to cache; its toolUseId is replaced on every hit
+        """
+        ttl = self.policy.ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        stored = copy.deepcopy(result)
+        with self._lock:
+            self._store(key, expires_at, stored)
+        self._save(key, expires_at, stored)
+
+    def clear(self) -> None:
+        """Drop every in-memory result."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache size and hit rate.
+
+        Returns:
+            Dictionary with entries, hits, misses and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: str, expires_at: Optional[float], result: ToolResult) -> None:
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> pathlib.Path:
+        digest = hashlib.sha256(f"{self.tool_name}\0{key}".encode("utf-8")).hexdigest()[:32]
+        return pathlib.Path(self.policy.disk_dir) / f"tool-{digest}.json"
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[Optional[float], ToolResult]]:
+        if not self.policy.disk_dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable tool cache entry for {self.tool_name}: {e}")
+            return None
+
+        # The key is stored to rule out digest collisions between tools and arguments
+        if data.get("tool") != self.tool_name or data.get("key") != key:
+            return None
+        expires_at = data.get("expires_at")
+        if expires_at is not None and expires_at <= now:
+            return None
+        return expires_at, data["result"]
+
+    def _save(self, key: str, expires_at: Optional[float], result: ToolResult) -> None:
+        if not self.policy.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tool-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                entry = {"tool": self.tool_name, "key": key, "expires_at": expires_at, "result": result}
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            # Results with binary content cannot be stored as JSON; they stay in memory only
+            logger.debug(f"Could not write tool cache entry for {self.tool_name}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
+class CachedTool(AgentTool):
+    """Agent tool wrapper that answers repeated calls from a ToolResultCache.
+
+    The wrapped tool's name and spec are exposed unchanged, so the model sees
+    the same tool. Only successful results are cached unless the policy says
+    otherwise; streamed intermediate events are not replayed on a hit.
+    """
+
+    def __init__(
+        self,
+        tool: AgentTool,
+        policy: Optional[ToolCachePolicy] = None,
+        cache: Optional[ToolResultCache] = None,
+        metrics: Optional[RuntimeMetrics] = None,
+    ):
+        """Wrap a tool.
+
+        Args:
+            tool: The tool to cache
+            policy: Cache policy (default: ToolCachePolicy())
+            cache: Existing cache to use, e.g. to keep results across tool reloads
+            metrics: Runtime metrics to count hits and misses in (default: process-wide)
+        """
+        super().__init__()
+        self.tool = tool
+        self.cache = cache or ToolResultCache(tool.tool_name, policy or ToolCachePolicy())
+        self.metrics = metrics or RUNTIME_METRICS
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(
+        self, tool_use: ToolUse, invocation_state: Dict[str, Any], **kwargs: Any
+    ) -> ToolGenerator:
+        try:
+            key = self.cache.key(tool_use.get("input") or {})
+        except Exception as e:
+            logger.debug(f"Not caching {self.tool_name} call, arguments have no cache key: {e}")
+            key = None
+
+        if key is not None:
+            if self.cache.policy.disk_dir:
+                cached = await asyncio.to_thread(self.cache.get, key)
+            else:
+                cached = self.cache.get(key)
+            outcome = "hit" if cached is not None else "miss"
+            self.metrics.tool_cache_total.inc(self.tool_name, outcome)
+            if cached is not None:
+                cached["toolUseId"] = tool_use["toolUseId"]
+                yield ToolResultEvent(cached)
+                return
+
+        async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+            if key is not None and isinstance(event, ToolResultEvent):
+                # Store before yielding, the executor stops reading after the result
+                result = event.tool_result
+                if result.get("status") == "success" or self.cache.policy.cache_errors:
+                    if self.cache.policy.disk_dir:
+                        await asyncio.to_thread(self.cache.put, key, result)
+                    else:
+                        self.cache.put(key, result)
+            yield event
+
@@ -0,0 +1,121 @@
+"""On-disk cache of discovered MCP tool specs.
+
+Discovering MCP tools needs a network round trip to every server before the
+factory can serve traffic. This module persists the discovered tool specs so
+that a fresh process can boot from the local copy immediately and revalidate
+against the server in the background.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+from typing import List, Optional, Sequence
+
+from mcp.types import Tool as MCPTool
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes so old files are ignored instead of misread
+CACHE_VERSION = 1
+
+
+def dump_specs(tools: Sequence[MCPTool]) -> List[dict]:
+    """Serialize MCP tool definitions to comparable JSON specs.
+
+    Args:
+        tools: MCP tool definitions
+
+    Returns:
+        One JSON-compatible dict per tool, in order
+    """
+    return [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools]
+
+
+class ToolCatalogCache:
+    """Versioned cache file for the tool specs of one MCP server and tool filter.
+
+    The cache file name is derived from the server URL, the allow-list and the
+    cache version, so changing any of them never serves a stale catalog. Writes
+    go to a temporary file that is atomically renamed into place.
+    """
+
+    def __init__(self, cache_dir: str, url: str, allowed: Optional[Sequence[str]] = None):
+        """Initialize the cache for a server.
+
+        Args:
+            cache_dir: Directory holding cache files (created on first save)
+            url: MCP server URL
+            allowed: Optional allow-list of tool names applied before caching
+        """
+        self.url = url
+        self.allowed = sorted(allowed) if allowed else None
+
+        key_source = json.dumps({"version": CACHE_VERSION, "url": url, "allowed": self.allowed})
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:16]
+        self.path = pathlib.Path(cache_dir) / f"mcp-tools-{key}.json"
+
+    def load(self) -> Optional[List[MCPTool]]:
+        """Load the cached tool specs.
+
+        Returns:
+            Cached MCP tool definitions, or None if there is no usable cache
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable MCP tool cache {self.path}: {e}")
+            return None
+
+        if data.get("version") != CACHE_VERSION or data.get("url") != self.url:
+            return None
+
+        try:
+            tools = [MCPTool.model_validate(spec) for spec in data.get("tools", [])]
+        except Exception as e:
+            logger.warning(f"Ignoring invalid MCP tool cache {self.path}: {e}")
+            return None
+
+        logger.info(f"Loaded {len(tools)} MCP tool specs for {self.url} from cache")
+        return tools
+
+    def save(self, tools: Sequence[MCPTool]) -> bool:
+        """Persist tool specs if they differ from the cached ones.
+
+        Args:
+            tools: MCP tool definitions to cache
+
+        Returns:
+            True if the cached catalog changed, False if it was already up to date
+        """
+        specs = dump_specs(tools)
+        cached = self.load()
+        if cached is not None and specs == dump_specs(cached):
+            return False
+
+        data = {
+            "version": CACHE_VERSION,
+            "url": self.url,
+            "allowed": self.allowed,
+            "saved_at": time.time(),
+            "tools": specs,
+        }
+        tmp_path = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".mcp-tools-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write MCP tool cache {self.path}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return True
@@ -0,0 +1,396 @@
+"""Tool execution engine: bounded worker pool, per-tool limits and ordered results.
+
+Strands runs synchronous tools through ``asyncio.to_thread``, which shares the
+event loop's default executor with every other blocking call in the process,
+and concurrent tool calls report their results in completion order. This
+module gives synchronous tools their own bounded thread pool, caps the run
+time and concurrency of individual tools, and hands results back to the model
+in the order the calls were made.
+"""
+
+import asyncio
+import contextvars
+import copy
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from importlib.metadata import version
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+
+from strands.tools.executors import ConcurrentToolExecutor
+from strands.types._events import ToolResultEvent, TypedEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolResult, ToolSpec, ToolUse
+
+from .tool_cache import CachedTool
+
+
+logger = logging.getLogger(__name__)
+
+# OrderedToolExecutor schedules ConcurrentToolExecutor._task itself, which is private to
+# Strands; these are its parameters in the pinned strands-agents release
+_TASK_PARAMETERS = (
+    "self",
+    "agent",
+    "tool_use",
+    "tool_results",
+    "cycle_trace",
+    "cycle_span",
+    "invocation_state",
+    "task_id",
+    "task_queue",
+    "task_event",
+    "stop_event",
+    "structured_output_context",
+)
+_TASK_SUPPORTED = (
+    tuple(inspect.signature(ConcurrentToolExecutor._task).parameters) == _TASK_PARAMETERS
+)
+if not _TASK_SUPPORTED:
+    logger.warning(
+        f"strands-agents {version('strands-agents')} changed ConcurrentToolExecutor._task; "
+        "tool calls still running when a turn is closed will not be cancelled"
+    )
+
+
+@dataclass
+class ToolLimits:
+    """Execution limits of a tool.
+
+    Attributes:
+        timeout: Seconds a call may run before it fails with an error result
+        max_concurrency: Calls of the tool that may run at once across all agents
+    """
+
+    timeout: Optional[float] = None
+    max_concurrency: Optional[int] = None
+
+
+class LimitedTool(AgentTool):
+    """Agent tool wrapper that enforces a timeout and a concurrency limit.
+
+    A call that times out returns an error result to the model instead of
+    failing the turn. Synchronous tools keep running in their worker thread
+    after a timeout, since threads cannot be interrupted; only the result is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        tool: AgentTool,
+        limits: ToolLimits,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        """Wrap a tool.
+
+        Args:
+            tool: The tool to limit
+            limits: Timeout and concurrency limit
+            semaphore: Existing semaphore to share, e.g. to keep the limit across tool reloads
+        """
+        super().__init__()
+        self.tool = tool
+        self.limits = limits
+        if semaphore is None and limits.max_concurrency:
+            semaphore = asyncio.Semaphore(limits.max_concurrency)
+        self._semaphore = semaphore
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(
+        self, tool_use: ToolUse, invocation_state: Dict[str, Any], **kwargs: Any
+    ) -> ToolGenerator:
+        if self._semaphore is None:
+            async for event in self._stream_with_timeout(tool_use, invocation_state, **kwargs):
+                yield event
+            return
+
+        async with self._semaphore:
+            async for event in self._stream_with_timeout(tool_use, invocation_state, **kwargs):
+                yield event
+
+    async def _stream_with_timeout(
+        self, tool_use: ToolUse, invocation_state: Dict[str, Any], **kwargs: Any
+    ) -> ToolGenerator:
+        timeout = self.limits.timeout
+        if timeout is None:
+            async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+                yield event
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        events = self.tool.stream(tool_use, invocation_state, **kwargs).__aiter__()
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        event = await events.__anext__()
+                except StopAsyncIteration:
+                    return
+                except TimeoutError:
+                    message = f"Tool {self.tool_name} timed out after {timeout}s"
+                    logger.warning(message)
+                    yield ToolResultEvent(
+                        {
+                            "toolUseId": tool_use["toolUseId"],
+                            "status": "error",
+                            "content": [{"text": message}],
+                        }
+                    )
+                    return
+                yield event
+        finally:
+            await events.aclose()
+
+
+def _has_limits(tool: AgentTool) -> bool:
+    """Whether a tool, or a tool it wraps, is a LimitedTool."""
+    while tool is not None:
+        if isinstance(tool, LimitedTool):
+            return True
+        tool = getattr(tool, "tool", None)
+    return False
+
+
+class OrderedToolExecutor(ConcurrentToolExecutor):
+    """Concurrent tool executor that reports results in the model's call order.
+
+    Tools still run concurrently and stream their events as they happen; only
+    the tool results handed back to the model are reordered to match the order
+    of the tool calls. When the agent stream is closed or cancelled, e.g.
+    because the client disconnected, tool calls still running are cancelled
+    instead of being left to finish in the background.
+
+    Cancellation relies on a private Strands method; if its signature changed,
+    the executor falls back to Strands' own scheduling and only orders results.
+    """
+
+    async def _execute(
+        self,
+        agent: Any,
+        tool_uses: List[ToolUse],
+        tool_results: List[ToolResult],
+        cycle_trace: Any,
+        cycle_span: Any,
+        invocation_state: Dict[str, Any],
+        structured_output_context: Any = None,
+    ) -> AsyncGenerator[TypedEvent, None]:
+        if _TASK_SUPPORTED:
+            events = self._execute_cancellable(
+                agent,
+                tool_uses,
+                tool_results,
+                cycle_trace,
+                cycle_span,
+                invocation_state,
+                structured_output_context,
+            )
+        else:
+            events = super()._execute(
+                agent,
+                tool_uses,
+                tool_results,
+                cycle_trace,
+                cycle_span,
+                invocation_state,
+                structured_output_context,
+            )
+        async for event in events:
+            yield event
+
+        order = {tool_use["toolUseId"]: index for index, tool_use in enumerate(tool_uses)}
+        tool_results.sort(key=lambda result: order.get(result["toolUseId"], len(order)))
+
+    async def _execute_cancellable(
+        self,
+        agent: Any,
+        tool_uses: List[ToolUse],
+        tool_results: List[ToolResult],
+        cycle_trace: Any,
+        cycle_span: Any,
+        invocation_state: Dict[str, Any],
+        structured_output_context: Any,
+    ) -> AsyncGenerator[TypedEvent, None]:
+        # Same scheduling as ConcurrentToolExecutor._execute, which does not cancel its tasks
+        task_queue: asyncio.Queue = asyncio.Queue()
+        task_events = [asyncio.Event() for _ in tool_uses]
+        stop_event = object()
+
+        tasks = [
+            asyncio.create_task(
+                self._task(
+                    agent,
+                    tool_use,
+                    tool_results,
+                    cycle_trace,
+                    cycle_span,
+                    invocation_state,
+                    task_id,
+                    task_queue,
+                    task_events[task_id],
+                    stop_event,
+                    structured_output_context,
+                )
+            )
+            for task_id, tool_use in enumerate(tool_uses)
+        ]
+
+        try:
+            task_count = len(tasks)
+            while task_count:
+                task_id, event = await task_queue.get()
+                if event is stop_event:
+                    task_count -= 1
+                    continue
+
+                yield event
+                task_events[task_id].set()
+        finally:
+            running = [task for task in tasks if not task.done()]
+            for task in running:
+                task.cancel()
+            if running:
+                logger.info("Cancelled %d running tool calls", len(running))
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class ToolExecutionEngine:
+    """Shared tool execution settings for every agent of a factory.
+
+    Owns the bounded thread pool that synchronous tools run on, the per-tool
+    limits, and the ordered concurrent executor given to each agent. The pool
+    only runs tools wrapped by :meth:`wrap`; the event loop's default executor
+    is left alone.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 32,
+        limits: Optional[Dict[str, ToolLimits]] = None,
+        default_limits: Optional[ToolLimits] = None,
+    ):
+        """Initialize the engine.
+
+        Args:
+            max_workers: Threads available to synchronous tools
+            limits: Limits per tool name
+            default_limits: Limits for tools without an entry in ``limits``
+        """
+        self.max_workers = max_workers
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits
+        self.executor = OrderedToolExecutor()
+        self._pool: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tool"
+        )
+        # Kept across tool reloads so a reload never lets extra calls through
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def run_sync(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function on the tool pool, like ``asyncio.to_thread``.
+
+        Context variables, e.g. the request context, are visible to the function.
+        After :meth:`shutdown`, the function runs on the loop's default executor.
+
+        Args:
+            func: Function to run
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's result
+        """
+        pool = self._pool
+        if pool is None:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool once queued work is done."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=False)
+            self._pool = None
+
+    def limits_for(self, tool_name: str) -> Optional[ToolLimits]:
+        """Get the limits that apply to a tool."""
+        return self.limits.get(tool_name, self.default_limits)
+
+    def wrap(self, tools: List[Any]) -> List[Any]:
+        """Run synchronous tools on the tool pool and apply the configured limits.
+
+        Tools already limited (e.g. by ``app.tool``) keep their limits, and
+        tools that are not AgentTool instances are returned unchanged.
+
+        Args:
+            tools: Agent tools
+
+        Returns:
+            Tools with LimitedTool wrappers where limits apply
+        """
+        wrapped = []
+        for tool in tools:
+            if not isinstance(tool, AgentTool):
+                wrapped.append(tool)
+                continue
+            tool = self._on_pool(tool)
+            if _has_limits(tool):
+                wrapped.append(tool)
+                continue
+            limits = self.limits_for(tool.tool_name)
+            if limits is not None and (limits.timeout or limits.max_concurrency):
+                semaphore = None
+                if limits.max_concurrency:
+                    semaphore = self._semaphores.setdefault(
+                        tool.tool_name, asyncio.Semaphore(limits.max_concurrency)
+                    )
+                tool = LimitedTool(tool, limits, semaphore)
+            wrapped.append(tool)
+        return wrapped
+
+    def _on_pool(self, tool: AgentTool) -> AgentTool:
+        """Get a copy of a synchronous function tool that runs on the tool pool.
+
+        Strands calls coroutine functions directly instead of through
+        ``asyncio.to_thread``, so the copy's function is a coroutine function
+        handing the call to :meth:`run_sync`. Limit and cache wrappers are
+        rebuilt around the copy with the same limits and cache. Other tools are
+        returned unchanged.
+        """
+        if isinstance(tool, LimitedTool):
+            inner = self._on_pool(tool.tool)
+            return tool if inner is tool.tool else LimitedTool(inner, tool.limits, tool._semaphore)
+        if isinstance(tool, CachedTool):
+            inner = self._on_pool(tool.tool)
+            if inner is tool.tool:
+                return tool
+            return CachedTool(inner, cache=tool.cache, metrics=tool.metrics)
+
+        func = getattr(tool, "_tool_func", None)
+        if (
+            func is None
+            or not callable(func)
+            or inspect.iscoroutinefunction(func)
+            or inspect.isasyncgenfunction(func)
+        ):
+            return tool
+
+        @functools.wraps(func)
+        async def run_on_pool(*args: Any, **kwargs: Any) -> Any:
+            return await self.run_sync(func, *args, **kwargs)
+
+        pooled = copy.copy(tool)
+        pooled._tool_func = run_on_pool
+        return pooled
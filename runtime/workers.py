@@ -0,0 +1,264 @@
+"""Pre-fork multi-worker serving.
+
+A single process runs every request on one event loop, so CPU-bound phases
+(metadata parsing, JSON serialization, synchronous tool code) cap the whole
+pod. This module serves the app from several worker processes forked from a
+supervisor that has already loaded the read-only state, so the workers share
+it copy-on-write instead of each importing and loading it again. Each worker
+runs its own event loop and opens its own network clients during its
+lifespan, and workers are replaced when they exit or after serving a set
+number of requests.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import uvicorn
+
+from .structured_logging import flush_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """Supervise forked uvicorn workers sharing one listening socket.
+
+    The supervisor binds the socket, runs the preload functions, freezes the
+    garbage collector's view of the loaded objects so collections in the
+    workers do not touch (and copy) their pages, and forks the workers. The
+    kernel spreads incoming connections over the workers accepting on the
+    shared socket.
+
+    Signals to the supervisor:
+        SIGTERM, SIGINT: stop every worker gracefully, then exit
+        SIGHUP: recycle every worker, starting replacements before stopping
+            the old ones so capacity is kept
+
+    State that lives in a process, such as metrics, warm agents, admission
+    counts and per-session serialization, is per worker. Connections are not
+    routed by session, so the app must not keep session state across turns in
+    a worker; ``StitchLabAgentApp.run`` and ``AgentFactory`` turn it off. To
+    scrape the metrics of every worker, give each worker its own port with
+    ``worker_port``: worker ``i`` also serves the app on ``worker_port + i``.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        workers: int,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        preload: Sequence[Callable[[], Any]] = (),
+        max_requests: Optional[int] = None,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+        worker_port: Optional[int] = None,
+        **uvicorn_kwargs: Any,
+    ):
+        """Initialize the supervisor.
+
+        Args:
+            app: ASGI app served by every worker
+            workers: Number of worker processes
+            host: Host to bind to
+            port: Port to bind to
+            preload: Functions run once in the supervisor before forking
+            max_requests: Requests after which a worker exits gracefully and is
+                replaced (default: None, never)
+            max_requests_jitter: Random extra requests per worker, so workers
+                are not all recycled at once
+            graceful_timeout: Seconds a stopping worker gets to finish its
+                requests before it is killed
+            worker_port: First port of the per-worker ports, e.g. for scraping
+                each worker's metrics (default: None, shared port only)
+            **uvicorn_kwargs: Additional uvicorn.Config arguments for the workers
+        """
+        if workers < 1:
+            raise ValueError("PreforkServer needs at least one worker")
+        self.app = app
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.preload = list(preload)
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.worker_port = worker_port
+        self.uvicorn_kwargs = uvicorn_kwargs
+
+        self._socket: Optional[socket.socket] = None
+        # Worker PID -> slot index, for logs
+        self._children: Dict[int, int] = {}
+        self._retiring: Dict[int, float] = {}
+        self._stopping = False
+        self._recycle = False
+        self.spawned = 0
+
+    def run(self) -> int:
+        """Serve until stopped.
+
+        Returns:
+            Exit status for the supervisor process
+        """
+        self._socket = self._bind()
+        for func in self.preload:
+            func()
+        # Everything loaded so far is shared with the workers; keep the GC from writing to it
+        gc.collect()
+        gc.freeze()
+
+        handlers = {
+            sig: signal.signal(sig, self._handle_signal)
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+        }
+        try:
+            logger.info(
+                f"Serving on http://{self.host}:{self.port} with {self.workers} workers "
+                f"(supervisor {os.getpid()})"
+            )
+            for index in range(self.workers):
+                self._spawn(index)
+            while not self._stopping:
+                if self._recycle:
+                    self._recycle = False
+                    self._recycle_workers()
+                self._reap()
+                self._kill_overdue()
+                time.sleep(0.2)
+            self._stop_workers()
+        finally:
+            for sig, handler in handlers.items():
+                signal.signal(sig, handler)
+            gc.unfreeze()
+            self._socket.close()
+        return 0
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.set_inheritable(True)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def _bind_worker_port(self, index: int) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # A replacement worker binds the port while the worker it replaces is still stopping
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.worker_port + index))
+        return sock
+
+    def _handle_signal(self, sig: int, frame: Any) -> None:
+        if sig == signal.SIGHUP:
+            self._recycle = True
+        else:
+            self._stopping = True
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                status = self._serve_worker(index)
+            except BaseException:
+                logger.exception(f"Worker {os.getpid()} crashed")
+            finally:
+                flush_logging()
+                os._exit(status)
+        self._children[pid] = index
+        self.spawned += 1
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def _serve_worker(self, index: int) -> int:
+        # The supervisor's handlers must not run in the worker; returning from a
+        # signal re-raised by uvicorn after its graceful shutdown lets the worker exit cleanly
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *args: None)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+
+        config = uvicorn.Config(
+            self.app,
+            limit_max_requests=self.max_requests,
+            limit_max_requests_jitter=self.max_requests_jitter,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            **self.uvicorn_kwargs,
+        )
+        sockets = [self._socket]
+        if self.worker_port is not None:
+            sockets.append(self._bind_worker_port(index))
+        server = uvicorn.Server(config)
+        server.run(sockets=sockets)
+        return 0 if server.started else 1
+
+    def _reap(self) -> None:
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index = self._children.pop(pid, None)
+            retired = self._retiring.pop(pid, None) is not None
+            if index is None or retired:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self._stopping:
+                continue
+            if code == 0:
+                logger.info(f"Worker {index} (pid {pid}) reached its request limit, replacing it")
+            else:
+                logger.warning(f"Worker {index} (pid {pid}) exited with {code}, replacing it")
+                # Back off a little so a worker failing at startup does not spin the supervisor
+                time.sleep(1.0)
+            self._spawn(index)
+
+    def _recycle_workers(self) -> None:
+        old = [pid for pid in self._children if pid not in self._retiring]
+        logger.info(f"Recycling {len(old)} workers")
+        for pid in old:
+            self._spawn(self._children[pid])
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in old:
+            self._retiring[pid] = deadline
+            self._signal(pid, signal.SIGTERM)
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self._retiring.items()):
+            if now >= deadline and pid in self._children:
+                logger.warning(f"Worker pid {pid} did not stop in time, killing it")
+                self._signal(pid, signal.SIGKILL)
+                self._retiring[pid] = float("inf")
+
+    def _stop_workers(self) -> None:
+        logger.info(f"Stopping {len(self._children)} workers")
+        for pid in list(self._children):
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._children):
+            logger.warning(f"Worker pid {pid} did not stop in {self.graceful_timeout}s, killing it")
+            self._signal(pid, signal.SIGKILL)
+        while self._children:
+            pid, _ = os.waitpid(-1, 0)
+            self._children.pop(pid, None)
+
+    @staticmethod
+    def _signal(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
@@ -26,6 +26,8 @@ class GlobalSettings(BaseSettings):
     LANGFUSE_SECRET_KEY: Optional[str] = os.getenv("LANGFUSE_SECRET_KEY")
     LANGFUSE_HOST: Optional[str] = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
 
+    WORKERS: int = int(os.getenv('WORKERS', '1'))
+
 
 class AppConfig(GlobalConfig[GlobalSettings]):
     pass
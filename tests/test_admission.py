@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from runtime.admission import AdmissionController, Overloaded
+
+
+@pytest.mark.asyncio
+async def test_waiting_requests_run_in_arrival_order():
+    admission = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=None)
+    await admission.acquire()
+    order = []
+
+    async def request(index):
+        await admission.acquire()
+        order.append(index)
+        admission.release()
+
+    waiters = [asyncio.ensure_future(request(index)) for index in range(3)]
+    await asyncio.sleep(0)
+    assert admission.queued == 3
+
+    admission.release()
+    await asyncio.gather(*waiters)
+    assert order == [0, 1, 2]
+    assert admission.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_without_waiting():
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=None)
+    await admission.acquire()
+    waiter = asyncio.ensure_future(admission.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as raised:
+        await admission.acquire()
+    assert raised.value.reason == "queue_full"
+    assert admission.stats()["rejected_queue_full"] == 1
+
+    admission.release()
+    await waiter
+    admission.release()
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_rejects_and_leaves_the_queue():
+    admission = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+    await admission.acquire()
+
+    with pytest.raises(Overloaded) as raised:
+        await admission.acquire()
+    assert raised.value.reason == "timeout"
+    assert admission.stats()["rejected_timeout"] == 1
+    assert admission.queued == 0
+    admission.release()
+
+
+@pytest.mark.asyncio
+async def test_actor_at_its_cap_does_not_block_other_actors():
+    admission = AdmissionController(max_concurrent=4, max_per_actor=1, queue_timeout=None)
+    await admission.acquire("alice")
+    blocked = asyncio.ensure_future(admission.acquire("alice"))
+    await asyncio.sleep(0)
+
+    assert await admission.acquire("bob") == 0.0
+    assert not blocked.done()
+
+    admission.release("alice")
+    await blocked
+    assert admission.active == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    admission = AdmissionController(max_concurrent=1, queue_timeout=None)
+    await admission.acquire()
+    waiter = asyncio.ensure_future(admission.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert admission.queued == 0
+
+    admission.release()
+    assert admission.active == 0
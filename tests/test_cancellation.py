@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.responses import StreamingResponse
+from strands.hooks import HookRegistry, MessageAddedEvent
+
+from runtime.cancellation import INTERRUPTED_TURN_TEXT, DisconnectWatcher, close_interrupted_turn
+
+
+class Client:
+    """ASGI receive and send of a client that may disconnect."""
+
+    def __init__(self):
+        self.gone = asyncio.Event()
+        self.sent = []
+
+    async def receive(self):
+        await self.gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def turn(started, seen):
+    """Streamed turn that stops, like the entrypoint, when the watcher cancels it."""
+
+    async def body():
+        yield "first"
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            seen.append(watcher.caused(task))
+            if not watcher.caused(task):
+                raise
+            task.uncancel()
+
+    watcher = DisconnectWatcher(StreamingResponse(body()))
+    return watcher
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_streaming_turn():
+    client, started, seen = Client(), asyncio.Event(), []
+    watcher = turn(started, seen)
+    serving = asyncio.ensure_future(watcher({"type": "http"}, client.receive, client.send))
+
+    await asyncio.wait_for(started.wait(), 5)
+    client.gone.set()
+    await asyncio.wait_for(serving, 5)
+
+    assert watcher.disconnected
+    assert seen == [True]
+    assert client.sent[1]["body"] == b"first"
+
+
+@pytest.mark.asyncio
+async def test_outside_cancellation_is_not_taken_for_a_disconnect():
+    client, started, seen = Client(), asyncio.Event(), []
+    watcher = turn(started, seen)
+    serving = asyncio.ensure_future(watcher({"type": "http"}, client.receive, client.send))
+
+    await asyncio.wait_for(started.wait(), 5)
+    serving.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await serving
+
+    assert not watcher.disconnected
+    assert seen == [False]
+
+
+def agent(*messages):
+    persisted = []
+    hooks = HookRegistry()
+    hooks.add_callback(MessageAddedEvent, lambda event: persisted.append(event.message))
+    return SimpleNamespace(messages=list(messages), hooks=hooks), persisted
+
+
+@pytest.mark.asyncio
+async def test_unanswered_tool_calls_get_error_results():
+    tool_use = {"toolUse": {"toolUseId": "t1", "name": "lookup", "input": {}}}
+    interrupted, persisted = agent(
+        {"role": "user", "content": [{"text": "question"}]},
+        {"role": "assistant", "content": [tool_use]},
+    )
+
+    added = await close_interrupted_turn(interrupted)
+    assert [message["role"] for message in added] == ["user", "assistant"]
+    result = added[0]["content"][0]["toolResult"]
+    assert result["toolUseId"] == "t1" and result["status"] == "error"
+    assert interrupted.messages[-1]["content"][0]["text"] == INTERRUPTED_TURN_TEXT
+    assert persisted == added
+
+
+@pytest.mark.asyncio
+async def test_trailing_prompt_gets_a_closing_reply():
+    interrupted, persisted = agent({"role": "user", "content": [{"text": "question"}]})
+    added = await close_interrupted_turn(interrupted)
+    assert added == [{"role": "assistant", "content": [{"text": INTERRUPTED_TURN_TEXT}]}]
+    assert len(interrupted.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_finished_turn_is_left_alone():
+    finished, persisted = agent(
+        {"role": "user", "content": [{"text": "question"}]},
+        {"role": "assistant", "content": [{"text": "answer"}]},
+    )
+    assert await close_interrupted_turn(finished) == []
+    assert persisted == []
@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pytest
+
+import runtime.conversation
+from config import GlobalConfig
+from runtime.conversation import (
+    BINARY_BLOCK_TOKENS,
+    MESSAGE_OVERHEAD_TOKENS,
+    TokenBudgetConversationManager,
+    count_message_tokens,
+    count_text_tokens,
+)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def tiktoken_cache():
+    # Use the bundled encoding instead of downloading it
+    GlobalConfig._setup_tiktoken_cache(None)
+
+
+def text(role, value):
+    return {"role": role, "content": [{"text": value}]}
+
+
+def tool_use(tool_use_id):
+    return {
+        "role": "assistant",
+        "content": [{"toolUse": {"toolUseId": tool_use_id, "name": "lookup", "input": {}}}],
+    }
+
+
+def tool_result(tool_use_id):
+    return {
+        "role": "user",
+        "content": [{"toolResult": {"toolUseId": tool_use_id, "content": [{"text": "found"}]}}],
+    }
+
+
+def test_message_tokens_cover_text_and_estimate_binary_blocks():
+    message = text("user", "hello world")
+    assert count_message_tokens(message) == MESSAGE_OVERHEAD_TOKENS + count_text_tokens(
+        "hello world"
+    )
+
+    image = {"role": "user", "content": [{"image": {"format": "png", "source": {"bytes": b""}}}]}
+    assert count_message_tokens(image) == MESSAGE_OVERHEAD_TOKENS + BINARY_BLOCK_TOKENS
+
+
+def test_messages_are_tokenized_once_until_their_content_changes(monkeypatch):
+    calls = []
+
+    def counting(message, encoding_name):
+        calls.append(message["content"][0]["text"])
+        return 10
+
+    monkeypatch.setattr(runtime.conversation, "count_message_tokens", counting)
+    manager = TokenBudgetConversationManager(max_tokens=1000, reserved_tokens=5)
+    messages = [text("user", "a"), text("assistant", "b")]
+
+    assert manager.count_tokens(messages) == 25
+    assert manager.count_tokens(messages + [text("user", "c")]) == 35
+    assert calls == ["a", "b", "c"]
+
+    messages[1]["content"][0]["text"] = "b, truncated"
+    manager.count_tokens(messages)
+    assert calls[-1] == "b, truncated"
+
+
+def test_fit_to_budget_drops_the_oldest_turns():
+    messages = [text("user" if i % 2 == 0 else "assistant", f"turn {i} " * 20) for i in range(8)]
+    per_message = count_message_tokens(messages[0])
+    manager = TokenBudgetConversationManager(max_tokens=per_message * 3 + 10)
+    agent = SimpleNamespace(messages=messages)
+
+    manager.fit_to_budget(agent)
+    assert len(agent.messages) == 2
+    assert agent.messages[0]["content"][0]["text"].startswith("turn 6 ")
+    assert manager.removed_message_count == 6
+
+
+def test_window_never_starts_with_an_orphaned_tool_result():
+    messages = [
+        text("user", "question " * 50),
+        tool_use("t1"),
+        tool_result("t1"),
+        text("assistant", "answer"),
+        text("user", "follow-up"),
+        text("assistant", "reply"),
+    ]
+    manager = TokenBudgetConversationManager(
+        max_tokens=count_message_tokens(messages[0]), min_messages=2
+    )
+    agent = SimpleNamespace(messages=messages)
+
+    manager.fit_to_budget(agent)
+    assert agent.messages == [text("user", "follow-up"), text("assistant", "reply")]
+
+
+def test_conversation_within_the_budget_is_kept():
+    messages = [text("user", "hi"), text("assistant", "hello")]
+    manager = TokenBudgetConversationManager(max_tokens=1000)
+    agent = SimpleNamespace(messages=list(messages))
+
+    manager.fit_to_budget(agent)
+    assert agent.messages == messages
+    assert manager.removed_message_count == 0
+
+
+def test_restores_the_state_of_a_sliding_window_session():
+    manager = TokenBudgetConversationManager(max_tokens=1000)
+    manager.restore_from_session(
+        {"__name__": "SlidingWindowConversationManager", "removed_message_count": 3}
+    )
+    assert manager.removed_message_count == 3
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from runtime.metadata import MetadataCollector, command_key, parse_tool_payload
+
+PAYLOAD = {
+    "rows": [{"id": 1, "name": "a"}, {"id": 2, "name": None}],
+    "metadata": {"commands": [{"type": "open", "target": "doc-1", "focus": True}]},
+}
+
+
+def tool_message(*texts):
+    return {
+        "role": "user",
+        "content": [
+            {"toolResult": {"toolUseId": "t1", "content": [{"text": text} for text in texts]}}
+        ],
+    }
+
+
+@pytest.mark.parametrize("text", [json.dumps(PAYLOAD), str(PAYLOAD), f"  {PAYLOAD}\n"])
+def test_json_and_python_literals_parse_alike(text):
+    assert parse_tool_payload(text) == PAYLOAD
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        json.dumps({"rows": []}),
+        "the metadata is not a dict",
+        "[{'metadata': {}}]",
+        "{'metadata': broken",
+    ],
+)
+def test_texts_without_a_metadata_dict_are_skipped(text):
+    assert parse_tool_payload(text) is None
+
+
+def test_command_keys_keep_types_apart():
+    assert command_key({"focus": True}) != command_key({"focus": 1})
+    assert command_key({"a": 1, "b": 2}) == command_key({"b": 2, "a": 1})
+    assert command_key({"nested": {"a": [1]}}) == command_key({"nested": {"a": [1]}})
+
+
+def test_collector_returns_each_command_once_in_order():
+    first = {"type": "open", "target": "doc-1"}
+    second = {"type": "open", "target": "doc-2"}
+    collector = MetadataCollector()
+
+    new = collector.add_message(tool_message(json.dumps({"metadata": {"commands": [first]}})))
+    assert new == [first]
+    new = collector.add_messages(
+        [
+            {"role": "assistant", "content": [{"text": "no tool result here"}]},
+            tool_message(str({"metadata": {"commands": [first, second]}}), "plain text"),
+        ]
+    )
+    assert new == [second]
+    assert collector.commands == [first, second]
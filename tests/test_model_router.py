@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from strands.models.model import Model
+
+from runtime.metrics import RuntimeMetrics
+from runtime.model_router import CircuitBreaker, HedgedModel
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class FakeModel(Model):
+    """Model streaming a fixed response after a delay, or failing before its first token."""
+
+    def __init__(self, text: str, delay: float = 0.0, fail: bool = False):
+        self.text = text
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        yield {"messageStart": {"role": "assistant"}}
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.text} unavailable")
+        yield {"contentBlockDelta": {"delta": {"text": self.text}}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.text} unavailable")
+        yield {"output": output_model(text=self.text)}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def router(*models, **kwargs):
+    return HedgedModel(
+        models,
+        names=[model.text for model in models],
+        breaker_factory=lambda: CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        metrics=RuntimeMetrics(),
+        **kwargs,
+    )
+
+
+async def response_text(model):
+    events = [event async for event in model.stream([])]
+    deltas = [event["contentBlockDelta"] for event in events if "contentBlockDelta" in event]
+    return "".join(delta["delta"]["text"] for delta in deltas)
+
+
+def test_breaker_opens_at_threshold_and_lets_one_trial_through():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_abandoned_trial_releases_the_slot():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_abandoned()
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_fails_over_before_the_first_token():
+    primary, secondary = FakeModel("primary", fail=True), FakeModel("secondary")
+    model = router(primary, secondary)
+
+    assert await response_text(model) == "secondary"
+    assert model.stats() == {"primary": CircuitBreaker.OPEN, "secondary": CircuitBreaker.CLOSED}
+    assert model.metrics.model_requests_total.value("primary", "error") == 1
+    assert model.metrics.model_requests_total.value("secondary", "fallback") == 1
+
+    # The open circuit skips the primary on the next call
+    assert await response_text(model) == "secondary"
+    assert primary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_a_stalled_endpoint_and_cancels_the_loser():
+    primary, secondary = FakeModel("primary", delay=5), FakeModel("secondary")
+    model = router(primary, secondary, hedge_after=0.05)
+
+    assert await asyncio.wait_for(response_text(model), 2) == "secondary"
+    assert primary.cancelled == 1
+    assert model.metrics.model_requests_total.value("secondary", "hedge") == 1
+    assert model.metrics.model_requests_total.value("primary", "cancelled") == 1
+    # A cancelled request is no failure
+    assert model.breakers[0].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_raises_when_every_endpoint_fails():
+    model = router(FakeModel("primary", fail=True), FakeModel("secondary", fail=True))
+    with pytest.raises(RuntimeError, match="secondary unavailable"):
+        await response_text(model)
+
+
+@pytest.mark.asyncio
+async def test_structured_output_fails_over_and_updates_the_breakers():
+    primary, secondary = FakeModel("primary", fail=True), FakeModel("secondary")
+    model = router(primary, secondary)
+
+    events = [event async for event in model.structured_output(Answer, [])]
+    assert events[-1]["output"] == Answer(text="secondary")
+    assert model.stats()["primary"] == CircuitBreaker.OPEN
+    assert model.metrics.model_requests_total.value("secondary", "success") == 1
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from runtime.pool import AgentPool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def agent(size=0):
+    return SimpleNamespace(size=size)
+
+
+def pool(**kwargs):
+    return AgentPool(size_estimator=lambda agent: agent.size, **kwargs)
+
+
+def test_get_checks_the_agent_out_until_it_is_put_back():
+    agents = pool()
+    warm = agent(10)
+    agents.put("actor", "s", warm)
+
+    assert agents.get("actor", "s") is warm
+    # A concurrent turn of the session gets no agent while it is in use
+    assert agents.get("actor", "s") is None
+    assert agents.stats()["bytes"] == 0
+
+    agents.put("actor", "s", warm)
+    assert agents.get("actor", "s") is warm
+    assert agents.stats()["hits"] == 2
+    assert agents.stats()["misses"] == 1
+
+
+def test_least_recently_used_agent_is_evicted_first():
+    agents = pool(max_size=2)
+    agents.put("actor", "a", agent())
+    agents.put("actor", "b", agent())
+    agents.put("actor", "a", agents.get("actor", "a"))
+    agents.put("actor", "c", agent())
+
+    assert ("actor", "a") in agents
+    assert ("actor", "b") not in agents
+    assert agents.stats()["evictions"] == 1
+
+
+def test_idle_agents_expire():
+    clock = Clock()
+    agents = pool(idle_ttl=10, clock=clock)
+    agents.put("actor", "old", agent())
+    clock.now = 5
+    agents.put("actor", "new", agent())
+
+    clock.now = 12
+    assert agents.get("actor", "old") is None
+    assert agents.get("actor", "new") is not None
+    assert agents.stats()["evictions"] == 1
+
+
+def test_footprint_cap_evicts_other_agents_first():
+    agents = pool(max_bytes=100)
+    agents.put("actor", "a", agent(40))
+    agents.put("actor", "b", agent(40))
+    agents.put("actor", "c", agent(40))
+
+    assert ("actor", "a") not in agents
+    assert agents.stats()["bytes"] == 80
+
+    # An agent larger than the cap on its own is not kept
+    agents.put("actor", "huge", agent(500))
+    assert len(agents) == 0
+    assert agents.stats()["bytes"] == 0
+
+
+def test_size_zero_disables_pooling():
+    agents = pool(max_size=0)
+    agents.put("actor", "s", agent())
+    assert agents.get("actor", "s") is None
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from runtime.session_lock import SessionBusy, SessionSerializer
+
+
+@pytest.mark.asyncio
+async def test_queued_turns_run_one_at_a_time_in_arrival_order():
+    serializer = SessionSerializer()
+    order = []
+
+    async def turn(index):
+        async with serializer.hold("actor", "s"):
+            order.append(("start", index))
+            await asyncio.sleep(0.01)
+            order.append(("end", index))
+
+    await asyncio.gather(*(turn(index) for index in range(3)))
+    assert order == [(event, index) for index in range(3) for event in ("start", "end")]
+
+
+@pytest.mark.asyncio
+async def test_reject_policy_fails_a_turn_of_a_busy_session():
+    serializer = SessionSerializer(policy=SessionSerializer.POLICY_REJECT)
+    await serializer.acquire("actor", "s")
+    assert serializer.is_busy("actor", "s")
+
+    with pytest.raises(SessionBusy):
+        await serializer.acquire("actor", "s")
+    assert serializer.stats()["rejected"] == 1
+
+    serializer.release("actor", "s")
+    await serializer.acquire("actor", "s")
+    serializer.release("actor", "s")
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_keyed_by_actor():
+    serializer = SessionSerializer(policy=SessionSerializer.POLICY_REJECT)
+    await serializer.acquire("alice", "s")
+    # Another actor reusing the session ID does not wait
+    await serializer.acquire("bob", "s")
+    assert serializer.stats()["sessions"] == 2
+    serializer.release("alice", "s")
+    serializer.release("bob", "s")
+
+
+@pytest.mark.asyncio
+async def test_waiting_turns_are_capped_and_time_out():
+    serializer = SessionSerializer(wait_timeout=0.05, max_waiting=1)
+    await serializer.acquire("actor", "s")
+
+    waiter = asyncio.ensure_future(serializer.acquire("actor", "s"))
+    await asyncio.sleep(0)
+    assert serializer.stats()["waiting"] == 1
+    with pytest.raises(SessionBusy, match="busy with another request"):
+        await serializer.acquire("actor", "s")
+
+    with pytest.raises(SessionBusy, match="still busy"):
+        await waiter
+    assert serializer.stats() == {"sessions": 1, "waiting": 0, "rejected": 2}
+    serializer.release("actor", "s")
+
+
+@pytest.mark.asyncio
+async def test_slots_are_dropped_once_a_session_is_idle():
+    serializer = SessionSerializer()
+    for index in range(10):
+        async with serializer.hold("actor", f"s{index}"):
+            pass
+    assert serializer.stats()["sessions"] == 0
+
+    # A cancelled waiter releases its reference too
+    await serializer.acquire("actor", "s")
+    waiter = asyncio.ensure_future(serializer.acquire("actor", "s"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    serializer.release("actor", "s")
+    assert serializer.stats()["sessions"] == 0
+    assert not serializer.is_busy("actor", "s")
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from strands.session.repository_session_manager import RepositorySessionManager
+
+from runtime.session_writer import SessionWriteQueue, WriteBehindSessionMixin
+
+
+class RecordingRepository:
+    """Session repository keeping created messages in memory."""
+
+    def __init__(self, fail_messages: bool = False):
+        self.fail_messages = fail_messages
+        self.sessions = {}
+        self.messages = []
+
+    def read_session(self, session_id, **kwargs):
+        return self.sessions.get(session_id)
+
+    def create_session(self, session, **kwargs):
+        self.sessions[session.session_id] = session
+        return session
+
+    def create_message(self, session_id, agent_id, session_message, **kwargs):
+        if self.fail_messages:
+            raise RuntimeError("store unavailable")
+        self.messages.append(session_message)
+
+    def update_message(self, session_id, agent_id, session_message, **kwargs):
+        self.updated = session_message
+
+
+class WriteBehindManager(WriteBehindSessionMixin, RepositorySessionManager):
+    pass
+
+
+@pytest.fixture
+def write_queue():
+    write_queue = SessionWriteQueue(workers=2, batch_size=32, max_retries=1, retry_backoff=0)
+    yield write_queue
+    write_queue.close(timeout=5)
+
+
+def blocked_lane(write_queue, session_id):
+    """Block the lane of a session until the returned event is set."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    write_queue.submit(session_id, SessionWriteQueue.KIND_MESSAGE, block)
+    assert started.wait(5)
+    return release
+
+
+def test_writes_of_a_session_are_applied_in_order(write_queue):
+    applied = []
+    for index in range(50):
+        for session_id in ("a", "b", "c"):
+            write_queue.submit(
+                session_id, SessionWriteQueue.KIND_MESSAGE, applied.append, (session_id, index)
+            )
+
+    assert write_queue.flush(timeout=5)
+    for session_id in ("a", "b", "c"):
+        assert [i for s, i in applied if s == session_id] == list(range(50))
+    assert write_queue.stats()["written"] == 150
+
+
+def test_only_the_latest_agent_state_of_a_batch_is_written(write_queue):
+    applied = []
+    release = blocked_lane(write_queue, "s")
+    write_queue.submit("s", SessionWriteQueue.KIND_AGENT, applied.append, "state 1")
+    write_queue.submit("s", SessionWriteQueue.KIND_MESSAGE, applied.append, "message")
+    write_queue.submit("s", SessionWriteQueue.KIND_AGENT, applied.append, "state 2")
+    write_queue.submit("s", SessionWriteQueue.KIND_AGENT, applied.append, "state 3")
+    assert write_queue.has_pending("s")
+
+    release.set()
+    assert write_queue.flush("s", timeout=5)
+    assert applied == ["message", "state 3"]
+    assert write_queue.stats()["collapsed"] == 2
+    assert not write_queue.has_pending("s")
+
+
+def test_failed_write_is_dropped_and_reported_for_its_session(write_queue):
+    def fail():
+        raise RuntimeError("store unavailable")
+
+    write_queue.submit("s", SessionWriteQueue.KIND_MESSAGE, fail)
+    assert write_queue.flush(timeout=5)
+    assert write_queue.stats()["failed"] == 1
+    assert write_queue.has_failed("s")
+    assert not write_queue.has_failed("other")
+
+    write_queue.clear_failed("s")
+    assert not write_queue.has_failed("s")
+
+
+def test_writes_after_close_are_applied_synchronously():
+    write_queue = SessionWriteQueue(workers=1)
+    write_queue.close(timeout=5)
+    applied = []
+    write_queue.submit("s", SessionWriteQueue.KIND_MESSAGE, applied.append, "late")
+    assert applied == ["late"]
+
+
+def test_append_message_snapshots_the_message(write_queue):
+    repository = RecordingRepository()
+    manager = WriteBehindManager(
+        session_id="s", session_repository=repository, write_queue=write_queue
+    )
+    agent = SimpleNamespace(agent_id="default")
+    manager._latest_agent_message[agent.agent_id] = None
+
+    release = blocked_lane(write_queue, "s")
+    message = {"role": "user", "content": [{"text": "first"}]}
+    manager.append_message(message, agent)
+    manager.append_message({"role": "assistant", "content": [{"text": "reply"}]}, agent)
+    # Bookkeeping does not wait for the queued writes
+    assert manager._latest_agent_message["default"].message_id == 1
+    message["content"][0]["text"] = "changed while queued"
+
+    release.set()
+    assert write_queue.flush("s", timeout=5)
+    assert [m.message_id for m in repository.messages] == [0, 1]
+    assert repository.messages[0].message["content"][0]["text"] == "first"
+
+
+def test_failed_message_write_marks_the_session(write_queue):
+    repository = RecordingRepository(fail_messages=True)
+    manager = WriteBehindManager(
+        session_id="s", session_repository=repository, write_queue=write_queue
+    )
+    agent = SimpleNamespace(agent_id="default")
+    manager._latest_agent_message[agent.agent_id] = None
+
+    manager.append_message({"role": "user", "content": [{"text": "lost"}]}, agent)
+    assert write_queue.flush("s", timeout=5)
+    assert write_queue.has_failed("s")
+
+
+@pytest.mark.asyncio
+async def test_full_lane_holds_writes_without_blocking_and_keeps_their_order():
+    write_queue = SessionWriteQueue(workers=1, max_queue_size=1, batch_size=1)
+    applied = []
+    release = blocked_lane(write_queue, "s")
+    for index in range(4):
+        # Returns at once although only one write fits the lane
+        write_queue.submit("s", SessionWriteQueue.KIND_MESSAGE, applied.append, index)
+    assert write_queue.depth == 5
+
+    waiter = asyncio.ensure_future(write_queue.wait_for_room("s"))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    release.set()
+    await asyncio.wait_for(waiter, 5)
+    assert write_queue.flush("s", timeout=5)
+    assert applied == [0, 1, 2, 3]
+    write_queue.close(timeout=5)
+
+
+def test_redaction_is_queued_behind_the_message(write_queue):
+    repository = RecordingRepository()
+    manager = WriteBehindManager(
+        session_id="s", session_repository=repository, write_queue=write_queue
+    )
+    agent = SimpleNamespace(agent_id="default")
+    manager._latest_agent_message[agent.agent_id] = None
+
+    release = blocked_lane(write_queue, "s")
+    manager.append_message({"role": "user", "content": [{"text": "secret"}]}, agent)
+    manager.redact_latest_message({"role": "user", "content": [{"text": "[redacted]"}]}, agent)
+    assert not hasattr(repository, "updated")
+
+    release.set()
+    assert write_queue.flush("s", timeout=5)
+    assert repository.updated is repository.messages[0]
+    assert repository.updated.redact_message["content"][0]["text"] == "[redacted]"
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from runtime.streaming import StreamCoalescer
+
+
+async def stream(*events, delay=0.0):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+async def collect(coalescer, events):
+    return [event async for event in coalescer.coalesce(events)]
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_is_sent_at_once_and_the_rest_merged():
+    coalescer = StreamCoalescer(max_bytes=1024, max_delay=10)
+    events = stream(*({"data": c} for c in "abcd"))
+    assert await collect(coalescer, events) == [{"data": "a"}, {"data": "bcd"}]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_flushed_by_size():
+    coalescer = StreamCoalescer(max_bytes=4, max_delay=10, flush_first=False)
+    events = stream(*({"data": "ab"} for _ in range(5)))
+    assert await collect(coalescer, events) == [
+        {"data": "abab"},
+        {"data": "abab"},
+        {"data": "ab"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_flushed_by_deadline_while_the_model_is_silent():
+    coalescer = StreamCoalescer(max_bytes=1024, max_delay=0.02, flush_first=False)
+
+    async def events():
+        yield {"data": "early"}
+        await asyncio.sleep(0.2)
+        yield {"data": "late"}
+
+    received = []
+    async for event in coalescer.coalesce(events()):
+        received.append((event, asyncio.get_running_loop().time()))
+    assert [event for event, _ in received] == [{"data": "early"}, {"data": "late"}]
+    assert received[1][1] - received[0][1] > 0.1
+
+
+@pytest.mark.asyncio
+async def test_text_is_flushed_before_tool_boundaries():
+    coalescer = StreamCoalescer(max_bytes=1024, max_delay=10, flush_first=False)
+    tool_use = {"current_tool_use": {"name": "lookup"}}
+    events = stream({"data": "a"}, {"data": "b"}, tool_use, {"data": "c"}, {"result": "done"})
+    assert await collect(coalescer, events) == [
+        {"data": "ab"},
+        tool_use,
+        {"data": "c"},
+        {"result": "done"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_text_before_a_failure_is_sent_then_the_error_raised():
+    coalescer = StreamCoalescer(max_bytes=1024, max_delay=10, flush_first=False)
+
+    async def events():
+        yield {"data": "partial"}
+        raise RuntimeError("model failed")
+
+    received = []
+    with pytest.raises(RuntimeError, match="model failed"):
+        async for event in coalescer.coalesce(events()):
+            received.append(event)
+    assert received == [{"data": "partial"}]
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_the_producer():
+    coalescer = StreamCoalescer()
+    closed = asyncio.Event()
+
+    async def events():
+        try:
+            while True:
+                yield {"data": "x"}
+                await asyncio.sleep(0.01)
+        finally:
+            closed.set()
+
+    coalesced = coalescer.coalesce(events())
+    assert await coalesced.__anext__() == {"data": "x"}
+    await coalesced.aclose()
+    assert closed.is_set()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from runtime.telemetry import TelemetryExporter
+
+
+class RecordingSender:
+    """Telemetry sender keeping the batches it was given."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+        self.closed = False
+
+    async def __call__(self, records):
+        if self.fail:
+            raise RuntimeError("backend unavailable")
+        self.batches.append([record["id"] for record in records])
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_full_queue_drops_the_oldest_records():
+    exporter = TelemetryExporter(RecordingSender(), max_queue_size=3)
+    for index in range(5):
+        exporter.submit({"id": index})
+
+    assert [record["id"] for record in exporter._queue] == [2, 3, 4]
+    assert exporter.stats()["dropped"] == 2
+    assert exporter.stats()["submitted"] == 5
+
+
+@pytest.mark.asyncio
+async def test_close_exports_queued_records_in_batches():
+    sender = RecordingSender()
+    exporter = TelemetryExporter(sender, batch_size=2, flush_interval=60)
+    exporter.start()
+    for index in range(5):
+        exporter.submit({"id": index})
+
+    assert await exporter.close(timeout=5)
+    assert [i for batch in sender.batches for i in batch] == [0, 1, 2, 3, 4]
+    assert all(len(batch) <= 2 for batch in sender.batches)
+    assert sender.closed
+    assert exporter.stats()["exported"] == 5
+
+    # Records submitted after closing are dropped
+    exporter.submit({"id": 5})
+    assert exporter.stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_exported_before_the_interval():
+    sender = RecordingSender()
+    exporter = TelemetryExporter(sender, batch_size=3, flush_interval=60)
+    for index in range(3):
+        exporter.submit({"id": index})
+
+    for _ in range(100):
+        if sender.batches:
+            break
+        await asyncio.sleep(0.01)
+    assert sender.batches == [[0, 1, 2]]
+    await exporter.close(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_counted_and_not_retried():
+    exporter = TelemetryExporter(RecordingSender(fail=True), batch_size=2)
+    for index in range(3):
+        exporter.submit({"id": index})
+
+    await exporter.flush()
+    assert exporter.stats()["failed"] == 3
+    assert exporter.stats()["depth"] == 0
+    assert await exporter.close(timeout=5)
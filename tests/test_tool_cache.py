@@ -0,0 +1,110 @@
+import pytest
+from strands import tool
+
+from runtime.metrics import RuntimeMetrics
+from runtime.tool_cache import CachedTool, ToolCachePolicy, ToolResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def result(text, status="success"):
+    return {"toolUseId": "t1", "status": status, "content": [{"text": text}]}
+
+
+def test_equal_arguments_share_a_key():
+    cache = ToolResultCache("lookup", ToolCachePolicy())
+    assert cache.key({"a": 1, "b": [2]}) == cache.key({"b": [2], "a": 1})
+    assert cache.key({"a": 1}) != cache.key({"a": "1"})
+
+
+def test_results_expire_after_the_ttl():
+    clock = Clock()
+    cache = ToolResultCache("lookup", ToolCachePolicy(ttl=10), clock=clock)
+    cache.put("k", result("cached"))
+
+    clock.now += 9
+    assert cache.get("k") == result("cached")
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_result_is_evicted():
+    cache = ToolResultCache("lookup", ToolCachePolicy(max_entries=2))
+    cache.put("a", result("a"))
+    cache.put("b", result("b"))
+    cache.get("a")
+    cache.put("c", result("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_cached_results_are_copies():
+    cache = ToolResultCache("lookup", ToolCachePolicy())
+    stored = result("original")
+    cache.put("k", stored)
+    stored["content"][0]["text"] = "changed"
+
+    hit = cache.get("k")
+    hit["toolUseId"] = "t2"
+    assert cache.get("k") == result("original")
+
+
+def test_processes_share_results_through_the_disk(tmp_path):
+    policy = ToolCachePolicy(disk_dir=str(tmp_path))
+    ToolResultCache("lookup", policy).put("k", result("shared"))
+
+    assert ToolResultCache("lookup", policy).get("k") == result("shared")
+    # Entries of another tool with the same arguments are not shared
+    assert ToolResultCache("other", policy).get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_tool_answers_repeated_calls_from_the_cache():
+    calls = []
+
+    @tool
+    def lookup(query: str) -> str:
+        """Look something up."""
+        calls.append(query)
+        return f"found {query}"
+
+    cached = CachedTool(lookup, policy=ToolCachePolicy(), metrics=RuntimeMetrics())
+
+    async def call(tool_use_id, query):
+        tool_use = {"toolUseId": tool_use_id, "name": "lookup", "input": {"query": query}}
+        events = [event async for event in cached.stream(tool_use, {})]
+        return events[-1].tool_result
+
+    first = await call("t1", "x")
+    second = await call("t2", "x")
+    assert calls == ["x"]
+    assert second["toolUseId"] == "t2"
+    assert second["content"] == first["content"]
+    assert cached.metrics.tool_cache_total.value("lookup", "hit") == 1
+    assert cached.tool_spec == lookup.tool_spec
+
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_not_cached():
+    calls = []
+
+    @tool
+    def flaky() -> str:
+        """Fail every time."""
+        calls.append(1)
+        raise RuntimeError("unavailable")
+
+    cached = CachedTool(flaky, policy=ToolCachePolicy(), metrics=RuntimeMetrics())
+    for tool_use_id in ("t1", "t2"):
+        tool_use = {"toolUseId": tool_use_id, "name": "flaky", "input": {}}
+        events = [event async for event in cached.stream(tool_use, {})]
+        assert events[-1].tool_result["status"] == "error"
+    assert len(calls) == 2
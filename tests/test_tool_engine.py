@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+import pytest
+from strands import Agent, tool
+from strands.models.model import Model
+
+from runtime.metrics import RuntimeMetrics
+from runtime.tool_cache import CachedTool, ToolCachePolicy
+from runtime.tool_engine import LimitedTool, ToolExecutionEngine, ToolLimits
+
+
+class ToolCallingModel(Model):
+    """Model calling the given tools in one message, then answering with text."""
+
+    def __init__(self, tool_names):
+        self.tool_names = tool_names
+        self.calls = 0
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        yield {"messageStart": {"role": "assistant"}}
+        if self.calls > 1:
+            yield {"contentBlockDelta": {"delta": {"text": "done"}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            return
+        for index, name in enumerate(self.tool_names):
+            start = {"toolUse": {"toolUseId": f"call-{index}", "name": name}}
+            yield {"contentBlockStart": {"start": start}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": "{}"}}}}
+            yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use"}}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+
+@tool
+async def slow() -> str:
+    """Answer after a while."""
+    await asyncio.sleep(0.05)
+    return "slow"
+
+
+@tool
+async def fast() -> str:
+    """Answer at once."""
+    return "fast"
+
+
+@tool
+def where() -> str:
+    """Report the thread running the tool."""
+    return threading.current_thread().name
+
+
+@pytest.fixture
+def engine():
+    engine = ToolExecutionEngine(max_workers=2)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_tool_results_follow_the_call_order(engine):
+    agent = Agent(
+        model=ToolCallingModel(["slow", "fast"]),
+        tools=engine.wrap([slow, fast]),
+        tool_executor=engine.executor,
+        callback_handler=None,
+    )
+    await agent.invoke_async("go")
+
+    results = [block["toolResult"] for block in agent.messages[2]["content"]]
+    assert [result["toolUseId"] for result in results] == ["call-0", "call-1"]
+    assert [result["content"][0]["text"] for result in results] == ["slow", "fast"]
+
+
+@pytest.mark.asyncio
+async def test_sync_tools_run_on_the_tool_pool(engine):
+    agent = Agent(
+        model=ToolCallingModel(["where"]),
+        tools=engine.wrap([where]),
+        tool_executor=engine.executor,
+        callback_handler=None,
+    )
+    await agent.invoke_async("go")
+
+    result = agent.messages[2]["content"][0]["toolResult"]
+    assert result["content"][0]["text"].startswith("tool")
+
+
+def test_wrappers_are_rebuilt_around_the_pooled_tool(engine):
+    cached = CachedTool(where, policy=ToolCachePolicy(ttl=60), metrics=RuntimeMetrics())
+    limited = LimitedTool(cached, ToolLimits(timeout=5))
+
+    wrapped = engine.wrap([limited])[0]
+    assert isinstance(wrapped, LimitedTool) and wrapped.limits is limited.limits
+    assert isinstance(wrapped.tool, CachedTool) and wrapped.tool.cache is cached.cache
+    assert wrapped.tool.tool is not where
+    assert asyncio.iscoroutinefunction(wrapped.tool.tool._tool_func)